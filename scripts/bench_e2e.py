@@ -0,0 +1,117 @@
+"""
+端到端性能基准（--mode full）
+
+采集层使用HTTP磁带回放，通义千问使用本地替身（src/analyzer/dashscope_stub.py），
+钉钉推送使用本地模拟服务，整个流程不访问外网，结果可复现、可在CI中运行。
+程序在临时工作目录中运行，不会改动仓库内的 data/ 状态文件。
+
+用法:
+    # 仓库自带脱敏的合成磁带 cassettes/baseline（scripts/make_baseline_cassette.py 生成），
+    # 也可以录制一次真实采集响应
+    python src/main.py --mode collect --http-record cassettes/recorded
+    # 回放基准
+    python scripts/bench_e2e.py --cassette cassettes/baseline --latency-ms 50 --jitter-ms 20 --error-rate 0.05
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.reporter.mock_webhook import MockDingTalkServer  # noqa: E402
+from src.utils.http_replay import CASSETTE_FILE  # noqa: E402
+
+
+def run_benchmark(args, workdir: Path) -> dict:
+    """
+    在工作目录中运行一次完整流程
+
+    Returns:
+        基准结果
+    """
+    server = MockDingTalkServer(rate_per_minute=10000, fail_rate=args.webhook_fail_rate).start()
+
+    env = dict(os.environ)
+    env.update({
+        'DASHSCOPE_STUB': '1',
+        'DASHSCOPE_API_KEY': 'stub',
+        'DASHSCOPE_STUB_LATENCY_MS': str(args.llm_latency_ms),
+        'DASHSCOPE_STUB_SLOW_RATE': str(args.llm_slow_rate),
+        'DINGTALK_WEBHOOK_URL': server.url,
+        'DINGTALK_ALERT_WEBHOOK_URL': server.url,
+    })
+    env.pop('DINGTALK_SECRET', None)
+    env.pop('DINGTALK_ALERT_SECRET', None)
+
+    command = [
+        sys.executable, str(PROJECT_ROOT / 'src' / 'main.py'), '--mode', 'full',
+        '--http-replay', str(Path(args.cassette).resolve()),
+        '--replay-jitter-ms', str(args.jitter_ms),
+        '--replay-error-rate', str(args.error_rate),
+    ]
+    if args.latency_ms is not None:
+        command += ['--replay-latency-ms', str(args.latency_ms)]
+
+    start = time.monotonic()
+    proc = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+    elapsed = time.monotonic() - start
+
+    server.stop()
+
+    if proc.returncode != 0:
+        print(proc.stdout[-4000:])
+        print(proc.stderr[-4000:])
+
+    return {
+        'returncode': proc.returncode,
+        'elapsed_seconds': round(elapsed, 2),
+        'dingtalk_messages': len(server.messages),
+        'log_lines': proc.stdout.count('\n'),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='端到端性能基准')
+    parser.add_argument('--cassette', type=str, default='cassettes/baseline', help='HTTP磁带目录')
+    parser.add_argument('--latency-ms', type=float, default=None, help='回放固定延迟，默认使用录制延迟')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='回放延迟抖动')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='回放错误率')
+    parser.add_argument('--llm-latency-ms', type=float, default=200.0, help='通义千问替身调用延迟')
+    parser.add_argument('--llm-slow-rate', type=float, default=0.0, help='通义千问替身慢调用（20倍延迟）的概率')
+    parser.add_argument('--webhook-fail-rate', type=float, default=0.0, help='钉钉模拟服务失败率')
+    parser.add_argument('--budget-seconds', type=float, default=None, help='总耗时上限，超出则返回非0')
+    parser.add_argument('--output', type=str, default=None, help='结果JSON输出路径')
+    args = parser.parse_args()
+
+    if not (Path(args.cassette) / CASSETTE_FILE).exists():
+        print(f"❌ 磁带不存在: {Path(args.cassette) / CASSETTE_FILE}（可用 scripts/make_baseline_cassette.py 生成）")
+        return 1
+
+    with tempfile.TemporaryDirectory(prefix='bench_e2e_') as workdir:
+        result = run_benchmark(args, Path(workdir))
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if result['returncode'] != 0:
+        print("❌ 流程运行失败")
+        return 1
+    if args.budget_seconds and result['elapsed_seconds'] > args.budget_seconds:
+        print(f"❌ 耗时 {result['elapsed_seconds']}s 超出上限 {args.budget_seconds}s")
+        return 1
+
+    print("✅ 端到端基准完成")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
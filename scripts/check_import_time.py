@@ -0,0 +1,81 @@
+"""
+启动导入耗时基准检查
+
+基于 `python -X importtime` 统计 src.main 的导入开销，确保入口模块
+不会在启动时加载采集/分析/推送阶段才需要的重型依赖。
+
+用法:
+    python scripts/check_import_time.py [--budget-ms 300]
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+# 入口模块启动时不允许加载的重型依赖
+FORBIDDEN_MODULES = ['requests', 'bs4', 'dashscope', 'lxml']
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def measure_imports(module: str) -> dict:
+    """
+    在子进程中导入模块并解析 -X importtime 输出
+
+    Args:
+        module: 待导入的模块名
+
+    Returns:
+        {模块名: 累计耗时(微秒)}
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{proc.stderr}")
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        # 格式: import time:  self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = int(cumulative.strip())
+
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='启动导入耗时检查')
+    parser.add_argument('--module', type=str, default='src.main', help='待检查的入口模块')
+    parser.add_argument('--budget-ms', type=float, default=300.0, help='入口模块累计导入耗时上限(毫秒)')
+    args = parser.parse_args()
+
+    timings = measure_imports(args.module)
+
+    loaded = [m for m in FORBIDDEN_MODULES if m in timings]
+    total_ms = timings.get(args.module, 0) / 1000
+
+    print(f"{args.module} 累计导入耗时: {total_ms:.1f} ms (上限 {args.budget_ms:.0f} ms)")
+    for name, us in sorted(timings.items(), key=lambda x: -x[1])[:10]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if loaded:
+        print(f"❌ 启动时加载了重型依赖: {', '.join(loaded)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"❌ 导入耗时超出上限")
+        failed = True
+
+    if not failed:
+        print("✅ 启动导入检查通过")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
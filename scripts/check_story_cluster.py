@@ -0,0 +1,101 @@
+"""
+事件聚类校准检查
+
+用一组样例标题（同一事件的多源改写 + 同车型的不同事件）运行 StoryClusterer，
+检查同一事件的报道并入同一簇、不同事件不被合并，并输出聚类结果。
+不同事件的样例包括同车型、同一类事件词但说的是不同的事（"变速箱顿挫投诉" / "座椅异响投诉"），
+这类误合并会让被并入的本品负面不进入分析与预警，比漏合并（日报多一条）代价大。
+修改 cluster_config 的阈值、加分或事件词表后运行，确认仍能正确合并。
+
+用法:
+    python scripts/check_story_cluster.py [--threshold 0.15] [--event-boost 0.15] [--event-min-similarity 0.03]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.collectors.base_collector import Article  # noqa: E402
+from src.filters.story_cluster import StoryClusterer  # noqa: E402
+
+# (标题, 车型, 匹配到的关键词, 事件编号)：事件编号相同的标题应并入同一簇
+SAMPLES = [
+    ("艾力绅召回2万辆 涉及刹车隐患", "艾力绅", "艾力绅", 1),
+    ("东风本田艾力绅宣布召回，刹车存隐患", "艾力绅", "艾力绅", 1),
+    ("召回！2.1万辆艾力绅因制动系统问题被召回", "艾力绅", "艾力绅", 1),
+    ("艾力绅车主投诉中控屏频繁黑屏", "艾力绅", "艾力绅", 2),
+    ("艾力绅中控黑屏问题集中爆发 车主维权", "艾力绅", "艾力绅", 2),
+    ("艾力绅限时优惠3万元 终端降价促销", "艾力绅", "艾力绅", 3),
+    ("艾力绅混动版油耗实测", "艾力绅", "艾力绅", 4),
+    ("HR-V新款上市 售价13.99万起", "HR-V", "HR-V", 5),
+    ("东风本田新款HR-V正式上市，13.99万元起售", "HR-V", "HR-V", 5),
+    ("HR-V试驾：城市通勤的好选择", "HR-V", "HR-V", 6),
+    ("别克GL8新款上市 售价23.29万起", "别克GL8", "GL8", 7),
+    ("GL8陆上公务舱降价3万 经销商清库存", "别克GL8", "GL8", 8),
+    ("别克GL8终端优惠达3万元", "别克GL8", "GL8", 8),
+    ("Inspire混动版油耗实测 百公里4.2升", "Inspire", "Inspire", 9),
+    ("凯美瑞起火事故调查结果公布", "广汽丰田凯美瑞", "凯美瑞", 10),
+    ("凯美瑞起火事故调查结果出炉 官方回应", "广汽丰田凯美瑞", "凯美瑞", 10),
+    ("广汽丰田凯美瑞自燃 官方回应", "广汽丰田凯美瑞", "凯美瑞", 10),
+    # 同车型、同一类事件词，但是不同的事：不应合并
+    ("艾力绅变速箱顿挫投诉", "艾力绅", "艾力绅", 11),
+    ("艾力绅4S店拒绝维权", "艾力绅", "艾力绅", 12),
+    ("艾力绅后排座椅异响投诉", "艾力绅", "艾力绅", 13),
+    ("艾力绅刹车失灵致追尾", "艾力绅", "艾力绅", 14),
+    ("艾力绅行驶中断轴", "艾力绅", "艾力绅", 15),
+    ("HR-V降价3万", "HR-V", "HR-V", 16),
+    ("HR-V五一送保养优惠", "HR-V", "HR-V", 17),
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='事件聚类校准检查')
+    parser.add_argument('--threshold', type=float, default=0.15, help='相似度阈值')
+    parser.add_argument('--event-boost', type=float, default=0.15, help='事件词加分')
+    parser.add_argument('--event-min-similarity', type=float, default=0.03, help='事件词加分所需的最低文字相似度')
+    args = parser.parse_args()
+
+    articles = []
+    for title, model, keyword, _ in SAMPLES:
+        article = Article(title=title, url=f"https://example.com/{len(articles)}", source=f"来源{len(articles) % 3}")
+        article.category = model
+        article.matched_keywords = [keyword]
+        articles.append(article)
+
+    clusterer = StoryClusterer(similarity_threshold=args.threshold, event_boost=args.event_boost,
+                               event_min_similarity=args.event_min_similarity)
+    clusters = clusterer.cluster(articles)
+
+    cluster_of = {}
+    for cluster in clusters:
+        print(f"[{cluster.cluster_id}] " + " | ".join(a.title for a in cluster.members))
+        for article in cluster.members:
+            cluster_of[id(article)] = cluster.cluster_id
+
+    errors = []
+    for i, (title_a, _, _, event_a) in enumerate(SAMPLES):
+        for j in range(i + 1, len(SAMPLES)):
+            title_b, _, _, event_b = SAMPLES[j]
+            same = cluster_of[id(articles[i])] == cluster_of[id(articles[j])]
+            if event_a == event_b and not same:
+                errors.append(f"未合并: {title_a} / {title_b}")
+            elif event_a != event_b and same:
+                errors.append(f"误合并: {title_a} / {title_b}")
+
+    events = len({event for *_, event in SAMPLES})
+    print(f"\n样例 {len(SAMPLES)} 条，{events} 个事件 → 聚类得到 {len(clusters)} 个簇")
+
+    if errors:
+        print("\n❌ 聚类结果与预期不符:")
+        for error in errors:
+            print(f"   - {error}")
+        return 1
+
+    print("✅ 事件聚类检查通过")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+生成基准用的脱敏HTTP磁带（cassettes/baseline）
+
+不访问外网：以回放模式反复运行 `--mode collect`，把磁带中缺少的请求按端点类型
+补上合成响应（虚构标题、example.com 链接、相对时间），直到一次运行不再出现缺失的请求。
+时间一律写成相对时间或省略，提交到仓库后也不会因时间窗口过期而被全部过滤掉。
+
+标题覆盖基准需要的情形：同一事件的多源报道（事件聚类）、本品负面（实时预警）、
+竞品与无关热点（过滤）。修改数据源或车型配置后重新运行即可。
+
+用法:
+    python scripts/make_baseline_cassette.py [--output cassettes/baseline]
+"""
+import argparse
+import base64
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import zlib
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.http_replay import CASSETTE_FILE  # noqa: E402
+
+MISSING_PATTERN = re.compile(r'HTTP磁带中无此请求: GET (\S+)')
+
+# 热榜标题：同一事件在多个平台以不同措辞出现
+HOT_TITLES = [
+    ("东风本田艾力绅召回公告 涉及部分车辆刹车隐患", "120万"),
+    ("艾力绅召回2万辆，制动系统存隐患", "85万"),
+    ("艾力绅车主投诉中控屏频繁黑屏", "40万"),
+    ("别克GL8终端优惠达3万元", "30万"),
+    ("新款HR-V正式上市 售价13.99万元起", "60万"),
+    ("凯美瑞起火事故调查结果公布", "55万"),
+    ("某地今日迎来降温 注意添衣", "300万"),
+    ("新款手机发布会定档下周", "150万"),
+]
+
+# 科技媒体标题
+TECH_TITLES = [
+    "东风本田艾力绅宣布召回，刹车存隐患",
+    "HR-V试驾：城市通勤的好选择",
+    "GL8陆上公务舱降价3万 经销商清库存",
+    "Inspire混动版油耗实测 百公里4.2升",
+    "广汽丰田凯美瑞自燃 官方回应",
+    "新能源汽车下乡活动启动",
+]
+
+# 新浪搜索：每个关键词的结果模板（{kw} 为搜索词）
+SEARCH_TEMPLATES = [
+    "{kw}召回消息引关注 涉及刹车隐患",
+    "{kw}车主口碑调查：空间与油耗表现",
+    "{kw}终端优惠扩大 部分车型降价",
+]
+
+
+def _entry(url: str, content_type: str, body: str, latency: float = 0.05) -> dict:
+    """一条磁带记录"""
+    return {
+        'key': f"GET {url}",
+        'status': 200,
+        'headers': {'Content-Type': content_type},
+        'encoding': 'utf-8',
+        'body': base64.b64encode(body.encode('utf-8')).decode('ascii'),
+        'latency': latency
+    }
+
+
+def synthesize(url: str) -> dict:
+    """
+    按端点类型合成响应
+
+    Args:
+        url: 请求地址（含查询参数）
+
+    Returns:
+        磁带记录
+    """
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+
+    if 'hotlist' in parsed.path:
+        platform = query.get('type', ['hot'])[0]
+        offset = sum(map(ord, platform)) % len(HOT_TITLES)
+        items = [
+            {'title': title, 'url': f"https://example.com/{platform}/{i}", 'hot': hot}
+            for i, (title, hot) in enumerate(HOT_TITLES[offset:] + HOT_TITLES[:offset])
+        ]
+        return _entry(url, 'application/json', json.dumps({'success': True, 'data': items}, ensure_ascii=False))
+
+    if 'newsflash' in parsed.path:
+        items = [{'id': 1000 + i, 'title': title} for i, title in enumerate(TECH_TITLES)]
+        return _entry(url, 'application/json', json.dumps({'data': {'items': items}}, ensure_ascii=False))
+
+    if parsed.path.endswith('/rss/') or 'rss' in parsed.path:
+        items = ''.join(
+            f"<item><title>{title}</title><link>https://example.com/rss/{i}.htm</link>"
+            f"<pubDate>{i + 1}小时前</pubDate></item>"
+            for i, title in enumerate(TECH_TITLES)
+        )
+        return _entry(url, 'application/xml', f'<?xml version="1.0" encoding="utf-8"?><rss><channel>{items}</channel></rss>')
+
+    if 'search' in parsed.netloc:
+        keyword = query.get('q', [''])[0]
+        results = ''.join(
+            f'<div class="box-result"><h2><a href="https://example.com/search/{zlib.crc32(keyword.encode()) % 10000}/{i}">'
+            f'{template.format(kw=keyword)}</a></h2><span class="fgray_time">{i * 3 + 1}小时前</span></div>'
+            for i, template in enumerate(SEARCH_TEMPLATES)
+        )
+        return _entry(url, 'text/html; charset=utf-8', f"<html><body>{results}</body></html>")
+
+    # 其他端点（正文页等）：简单的新闻页面
+    return _entry(url, 'text/html; charset=utf-8', "<html><body><p>示例页面。</p></body></html>")
+
+
+def missing_requests(cassette_dir: Path) -> list:
+    """以回放模式运行一次采集，返回磁带中缺少的请求地址"""
+    with tempfile.TemporaryDirectory(prefix='cassette_') as workdir:
+        env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+        proc = subprocess.run(
+            [sys.executable, str(PROJECT_ROOT / 'src' / 'main.py'), '--mode', 'collect',
+             '--http-replay', str(cassette_dir.resolve()), '--replay-latency-ms', '0'],
+            cwd=workdir, env=env, capture_output=True, text=True
+        )
+    return sorted(set(MISSING_PATTERN.findall(proc.stdout + proc.stderr)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='生成脱敏基准磁带')
+    parser.add_argument('--output', type=str, default='cassettes/baseline', help='磁带目录')
+    parser.add_argument('--max-rounds', type=int, default=30, help='最多补全轮数（连续失败会触发熔断，每轮只暴露部分缺失请求）')
+    args = parser.parse_args()
+
+    cassette_dir = Path(args.output)
+    cassette_dir.mkdir(parents=True, exist_ok=True)
+    path = cassette_dir / CASSETTE_FILE
+    path.unlink(missing_ok=True)
+
+    entries = {}
+    for round_no in range(1, args.max_rounds + 1):
+        missing = [url for url in missing_requests(cassette_dir) if f"GET {url}" not in entries]
+        if not missing:
+            break
+        print(f"第 {round_no} 轮: 补充 {len(missing)} 个请求")
+        for url in missing:
+            entries[f"GET {url}"] = synthesize(url)
+
+        # mtime=0 使相同内容生成的文件逐字节一致
+        with open(path, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+            for key in sorted(entries):
+                f.write((json.dumps(entries[key], ensure_ascii=False) + '\n').encode('utf-8'))
+    else:
+        print(f"❌ {args.max_rounds} 轮后仍有缺失的请求")
+        return 1
+
+    print(f"✅ 已生成 {path}（{len(entries)} 个请求）")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
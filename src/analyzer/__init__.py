@@ -1,4 +1,6 @@
 """情感分析模块"""
 from .sentiment_analyzer import SentimentAnalyzer
+from .hot_words import HotWordExtractor
+from .budget_governor import BudgetGovernor
 
-__all__ = ['SentimentAnalyzer']
+__all__ = ['SentimentAnalyzer', 'HotWordExtractor', 'BudgetGovernor']
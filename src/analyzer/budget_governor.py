@@ -0,0 +1,261 @@
+"""
+AI分析预算控制 - token/费用上限与按优先级调度
+
+每次调用前用本地估算（中文按字、其他按约4字符一个token）判断剩余预算，
+调用后以API返回的 usage 记账，并用实际值持续校准估算系数。
+每天与每轮运行分别设置token上限与费用上限，按天的用量持久化，跨运行累计；
+预算耗尽后剩余文章由调用方改用规则模式。文章按优先级依次送入分析：
+本品优先，其次为评分器给出的得分（来源权重 × 热度 × 分类 × 时效）。
+"""
+import json
+import math
+import os
+import re
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..collectors.base_collector import Article
+from ..utils.logger import logger
+from ..utils.time_normalize import now_epoch, to_datetime
+
+# 中日韩文字与全角符号：约一个字一个token
+CJK_PATTERN = re.compile(r'[\u3000-\u303f\u3400-\u9fff\uf900-\ufaff\uff00-\uffef]')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    本地估算文本的token数（偏保守）
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的token数
+    """
+    if not text:
+        return 0
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+class BudgetGovernor:
+    """AI分析预算控制器"""
+
+    # 估算系数与输出长度的平滑系数（指数滑动平均）
+    EMA_ALPHA = 0.2
+
+    def __init__(self, state_path: Optional[str] = "data/llm_budget.json",
+                 daily_tokens: Optional[int] = None, run_tokens: Optional[int] = None,
+                 daily_cost: Optional[float] = None, run_cost: Optional[float] = None,
+                 input_price: float = 0.0003, output_price: float = 0.0006,
+                 expected_output_tokens: int = 150, own_brands: Iterable[str] = (),
+                 retention_days: int = 7):
+        """
+        初始化预算控制器
+
+        Args:
+            state_path: 按天用量与估算校准值的持久化文件，None 表示不持久化
+            daily_tokens: 每天token上限，None 表示不限
+            run_tokens: 每轮运行token上限，None 表示不限
+            daily_cost: 每天费用上限（元），None 表示不限
+            run_cost: 每轮运行费用上限（元），None 表示不限
+            input_price: 输入单价（元/千token）
+            output_price: 输出单价（元/千token）
+            expected_output_tokens: 单次调用输出token数的初始估计
+            own_brands: 本品车型名，用于调度优先级
+            retention_days: 按天用量保留天数
+        """
+        self.state_path = Path(state_path) if state_path else None
+        self.daily_tokens = daily_tokens
+        self.run_tokens = run_tokens
+        self.daily_cost = daily_cost
+        self.run_cost = run_cost
+        self.input_price = input_price
+        self.output_price = output_price
+        self.own_brands = [b for b in own_brands if b]
+        self.retention_days = retention_days
+
+        # 估算校准：实际输入token / 本地估算；平均输出token数
+        self.estimate_ratio = 1.0
+        self.expected_output_tokens = float(expected_output_tokens)
+        # days: 日期 → {tokens, cost, calls}
+        self.days: Dict[str, dict] = {}
+        self.run = self._empty_usage()
+        self.skipped = 0
+        self._load()
+
+    @classmethod
+    def from_config(cls, analysis_config: dict, models_config: dict,
+                    state_path: Optional[str] = "data/llm_budget.json") -> 'BudgetGovernor':
+        """从 sources.yaml 的 analysis_config.budget 构建，本品车型取 models.yaml 中 is_own 的车型"""
+        config = analysis_config.get('budget', {})
+        own_brands = []
+        for car in models_config.get('car_models', []):
+            if car.get('is_own', False):
+                own_brands.append(car['name'])
+                own_brands.extend(car.get('aliases', []))
+
+        return cls(
+            state_path=state_path,
+            daily_tokens=config.get('daily_tokens'),
+            run_tokens=config.get('run_tokens'),
+            daily_cost=config.get('daily_cost'),
+            run_cost=config.get('run_cost'),
+            input_price=config.get('input_price', 0.0003),
+            output_price=config.get('output_price', 0.0006),
+            expected_output_tokens=config.get('expected_output_tokens', 150),
+            own_brands=own_brands
+        )
+
+    @staticmethod
+    def _empty_usage() -> dict:
+        """空用量记录"""
+        return {'tokens': 0, 'cost': 0.0, 'calls': 0}
+
+    @staticmethod
+    def _today() -> str:
+        """当天日期（北京时间）"""
+        return to_datetime(now_epoch()).strftime('%Y-%m-%d')
+
+    def _load(self):
+        """加载按天用量与估算校准值"""
+        if not self.state_path or not self.state_path.exists():
+            return
+
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"AI分析预算状态加载失败，从零开始计数: {e}")
+            return
+
+        self.days = state.get('days', {})
+        self.estimate_ratio = state.get('estimate_ratio', self.estimate_ratio)
+        self.expected_output_tokens = state.get('expected_output_tokens', self.expected_output_tokens)
+
+    def save(self):
+        """持久化按天用量（移除过期的天）与估算校准值"""
+        if not self.state_path:
+            return
+
+        oldest = (to_datetime(now_epoch()) - timedelta(days=self.retention_days - 1)).strftime('%Y-%m-%d')
+        self.days = {day: usage for day, usage in self.days.items() if day >= oldest}
+        state = {
+            'days': {day: dict(usage, cost=round(usage['cost'], 6)) for day, usage in self.days.items()},
+            'estimate_ratio': round(self.estimate_ratio, 4),
+            'expected_output_tokens': round(self.expected_output_tokens, 1)
+        }
+
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def start_run(self):
+        """开始新一轮运行（常驻进程每次采集后分析及每期日报前调用），本轮用量清零"""
+        self.run = self._empty_usage()
+        self.skipped = 0
+
+    def today_usage(self) -> dict:
+        """当天用量"""
+        return self.days.setdefault(self._today(), self._empty_usage())
+
+    def _cost(self, input_tokens: float, output_tokens: float) -> float:
+        """按单价计算费用（元）"""
+        return (input_tokens * self.input_price + output_tokens * self.output_price) / 1000
+
+    def estimate(self, prompt: str) -> Tuple[int, float]:
+        """
+        估算一次调用的token数与费用
+
+        Returns:
+            (token数, 费用)
+        """
+        input_tokens = estimate_tokens(prompt) * self.estimate_ratio
+        tokens = input_tokens + self.expected_output_tokens
+        return math.ceil(tokens), self._cost(input_tokens, self.expected_output_tokens)
+
+    def allow(self, prompt: str) -> bool:
+        """
+        预算是否足够再调用一次
+
+        Args:
+            prompt: 提示词
+
+        Returns:
+            调用后不会超出任何一项上限时为True
+        """
+        tokens, cost = self.estimate(prompt)
+        today = self.today_usage()
+
+        limits = (
+            (self.daily_tokens, today['tokens'] + tokens),
+            (self.run_tokens, self.run['tokens'] + tokens),
+            (self.daily_cost, today['cost'] + cost),
+            (self.run_cost, self.run['cost'] + cost),
+        )
+        if all(limit is None or used <= limit for limit, used in limits):
+            return True
+
+        if self.skipped == 0:
+            logger.warning(
+                f"AI分析预算已用尽（本轮 {self.run['tokens']} tokens/{self.run['cost']:.4f} 元，"
+                f"今日 {today['tokens']} tokens/{today['cost']:.4f} 元），剩余文章使用规则模式"
+            )
+        self.skipped += 1
+        return False
+
+    def record(self, prompt: str, response=None):
+        """
+        记账：有 usage 时用实际token数并校准估算，否则按估算计
+
+        Args:
+            prompt: 提示词
+            response: API响应（超时、异常或对冲请求未取得响应时为None）
+        """
+        usage = getattr(response, 'usage', None)
+        input_tokens = getattr(usage, 'input_tokens', None) if usage is not None else None
+        output_tokens = getattr(usage, 'output_tokens', None) if usage is not None else None
+
+        if input_tokens and output_tokens is not None:
+            estimated = estimate_tokens(prompt)
+            if estimated:
+                self.estimate_ratio += self.EMA_ALPHA * (input_tokens / estimated - self.estimate_ratio)
+            self.expected_output_tokens += self.EMA_ALPHA * (output_tokens - self.expected_output_tokens)
+            tokens, cost = input_tokens + output_tokens, self._cost(input_tokens, output_tokens)
+        else:
+            tokens, cost = self.estimate(prompt)
+
+        for usage_entry in (self.today_usage(), self.run):
+            usage_entry['tokens'] += tokens
+            usage_entry['cost'] += cost
+            usage_entry['calls'] += 1
+
+    def summary(self) -> str:
+        """本轮与当天用量摘要"""
+        today = self.today_usage()
+        return (
+            f"本轮 {self.run['calls']} 次/{self.run['tokens']} tokens/{self.run['cost']:.4f} 元, "
+            f"今日 {today['calls']} 次/{today['tokens']} tokens/{today['cost']:.4f} 元, "
+            f"预算不足改用规则 {self.skipped} 条"
+        )
+
+    def priority(self, article: Article) -> Tuple[int, float]:
+        """调度优先级（越大越先分析）：本品优先，其次为评分器得分"""
+        is_own = bool(article.category) and any(brand in article.category for brand in self.own_brands)
+        return int(is_own), article.score or 0.0
+
+    def order(self, articles: List[Article]) -> List[int]:
+        """
+        按优先级排列的下标（同优先级保持原顺序）
+
+        Args:
+            articles: 文章列表
+
+        Returns:
+            下标列表
+        """
+        return sorted(range(len(articles)), key=lambda i: self.priority(articles[i]), reverse=True)
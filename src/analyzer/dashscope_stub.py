@@ -0,0 +1,96 @@
+"""
+本地dashscope替身 - 端到端基准测试时代替通义千问API
+
+设置环境变量 DASHSCOPE_STUB=1 后由情感分析器加载，接口与
+dashscope.Generation.call 的 result_format='message' 返回结构一致，
+根据提示词中的标题生成确定性的JSON结果（system消息要求紧凑格式时输出短键），
+并可模拟调用延迟与错误率：
+    DASHSCOPE_STUB_LATENCY_MS  单次调用延迟（毫秒，默认200）
+    DASHSCOPE_STUB_ERROR_RATE  返回非200状态的概率（默认0）
+    DASHSCOPE_STUB_SLOW_RATE   慢调用（长尾延迟）的概率（默认0）
+    DASHSCOPE_STUB_SLOW_MS     慢调用的延迟（毫秒，默认为常规延迟的20倍）
+"""
+import json
+import os
+import random
+import re
+import time
+from types import SimpleNamespace
+
+api_key = None
+
+TITLE_PATTERN = re.compile(r'(?:新闻)?标题：(.*)')
+CATEGORY_PATTERN = re.compile(r'(?:相关)?车型：(.*)')
+
+NEGATIVE_WORDS = ['召回', '投诉', '质量问题', '缺陷', '故障', '异响', '漏油', '维权']
+POSITIVE_WORDS = ['好评', '优秀', '出色', '领先', '推荐', '满意', '热销']
+OWN_BRANDS = ['艾力绅', 'HR-V', 'Inspire', '英诗派', '缤智']
+
+
+def _fake_result(prompt: str) -> dict:
+    """按标题关键词生成确定性的分析结果"""
+    title_match = TITLE_PATTERN.search(prompt)
+    title = title_match.group(1).strip() if title_match else ''
+    category_match = CATEGORY_PATTERN.search(prompt)
+    models = category_match.group(1).strip() if category_match else ''
+
+    if any(w in title for w in NEGATIVE_WORDS):
+        sentiment, score = 'negative', 0.2
+    elif any(w in title for w in POSITIVE_WORDS):
+        sentiment, score = 'positive', 0.8
+    else:
+        sentiment, score = 'neutral', 0.5
+
+    return {
+        'sentiment': sentiment,
+        'sentiment_score': score,
+        'summary': title[:50],
+        'keywords': [k for k in models.split(',') if k][:3],
+        'category': '负面' if sentiment == 'negative' else '口碑',
+        'is_own_brand_negative': sentiment == 'negative' and any(b in models or b in title for b in OWN_BRANDS)
+    }
+
+
+def _compact(result: dict) -> dict:
+    """转换为短键输出格式"""
+    return {
+        's': {'positive': 1, 'neutral': 0, 'negative': -1}[result['sentiment']],
+        'c': round(result['sentiment_score'] * 10),
+        'm': result['summary'][:30],
+        'k': result['keywords'],
+        't': result['category'],
+        'o': int(result['is_own_brand_negative'])
+    }
+
+
+class Generation:
+    """dashscope.Generation 替身"""
+
+    @staticmethod
+    def call(model: str, prompt: str = '', messages: list = None, result_format: str = 'message', **kwargs):
+        latency_ms = float(os.getenv('DASHSCOPE_STUB_LATENCY_MS', 200))
+        if random.random() < float(os.getenv('DASHSCOPE_STUB_SLOW_RATE', 0)):
+            latency_ms = float(os.getenv('DASHSCOPE_STUB_SLOW_MS', latency_ms * 20))
+        time.sleep(latency_ms / 1000)
+
+        if random.random() < float(os.getenv('DASHSCOPE_STUB_ERROR_RATE', 0)):
+            return SimpleNamespace(status_code=503, code='ServiceUnavailable', message='stub error', output=None)
+
+        system = ''
+        if messages:
+            system = '\n'.join(m['content'] for m in messages if m['role'] == 'system')
+            prompt = '\n'.join(m['content'] for m in messages if m['role'] != 'system')
+
+        result = _fake_result(prompt)
+        if '"s"' in system:
+            result = _compact(result)
+        content = json.dumps(result, ensure_ascii=False, separators=(',', ':'))
+        message = SimpleNamespace(role='assistant', content=content)
+
+        return SimpleNamespace(
+            status_code=200,
+            code='',
+            message='',
+            output=SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason='stop')]),
+            usage=SimpleNamespace(input_tokens=len(system) + len(prompt), output_tokens=len(content))
+        )
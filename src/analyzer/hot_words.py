@@ -0,0 +1,259 @@
+"""
+舆情热词提取 - 本地字符n-gram + 跨天增量文档频率，不依赖LLM
+
+每天的报告语料（每个事件一条代表标题，规范化后）切成字符n-gram，按天累计文档频率并持久化；
+同一事件的多源改写只计一次，片段至少出现在 min_count 个不同事件中才参与排名，
+避免一个事件的几篇转载把标题里跨词的碎片（如"公布引关"）顶成热词。
+历史总量随新增/过期的天数增量维护，计算TF-IDF时无需回扫历史语料。
+当天的词频与历史文档频率对比，天天出现的词（车型名、常见套话）被压低，
+当天突然集中出现的词排在前面。
+"""
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..utils.logger import logger
+from ..utils.text_normalize import normalize_text
+from ..utils.time_normalize import now_epoch, to_datetime
+
+
+def _is_alnum(char: str) -> bool:
+    """是否为ASCII字母或数字"""
+    return char.isascii() and char.isalnum()
+
+
+class HotWordExtractor:
+    """热词提取器"""
+
+    # 较短的n-gram被较长的n-gram覆盖（频次不低于该比例）时只保留较长者
+    SUPERSTRING_RATIO = 0.8
+
+    def __init__(self, state_path: Optional[str] = "data/hot_words.json",
+                 ngram_range: Tuple[int, int] = (2, 4), retention_days: int = 30,
+                 min_count: int = 2, stopwords: Iterable[str] = ()):
+        """
+        初始化热词提取器
+
+        Args:
+            state_path: 文档频率持久化文件，None 表示不持久化
+            ngram_range: 字符n-gram长度范围（含两端）
+            retention_days: 历史文档频率保留天数
+            min_count: 当天至少出现在多少个不同事件中才可成为热词
+            stopwords: 不作为热词的词（车型名、品牌名、常见套话），标题在这些词处切开
+        """
+        self.state_path = Path(state_path) if state_path else None
+        self.min_n, self.max_n = ngram_range
+        self.retention_days = retention_days
+        self.min_count = min_count
+
+        words = sorted({normalize_text(w) for w in stopwords} - {''}, key=len, reverse=True)
+        self.stop_pattern = re.compile('|'.join(map(re.escape, words))) if words else None
+
+        # days: 日期 → {docs: 文档数, seen: 已计入的标题指纹, df: n-gram文档频率}
+        # totals: 保留期内所有天的文档数与文档频率之和
+        self.days: Dict[str, dict] = {}
+        self.totals = {'docs': 0, 'df': Counter()}
+        self._load()
+
+    @classmethod
+    def from_config(cls, sources_config: dict, models_config: dict,
+                    state_path: Optional[str] = "data/hot_words.json") -> 'HotWordExtractor':
+        """从 sources.yaml 的 hot_words_config 与车型配置构建，车型名/别名/品牌自动作为停用词"""
+        config = sources_config.get('hot_words_config', {})
+        stopwords = list(config.get('stopwords', []))
+
+        for car in models_config.get('car_models', []):
+            stopwords.append(car['name'])
+            stopwords.append(car.get('brand', ''))
+            stopwords.extend(car.get('keywords', []))
+            stopwords.extend(car.get('aliases', []))
+
+        return cls(
+            state_path=state_path,
+            ngram_range=tuple(config.get('ngram_range', [2, 4])),
+            retention_days=config.get('retention_days', 30),
+            min_count=config.get('min_count', 2),
+            stopwords=stopwords
+        )
+
+    def _load(self):
+        """加载持久化的文档频率并重建历史总量"""
+        if not self.state_path or not self.state_path.exists():
+            return
+
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"热词文档频率加载失败，从空历史开始: {e}")
+            return
+
+        for day, entry in state.get('days', {}).items():
+            self.days[day] = {
+                'docs': entry.get('docs', 0),
+                'seen': set(entry.get('seen', [])),
+                'df': Counter(entry.get('df', {}))
+            }
+
+        totals = state.get('totals')
+        if totals:
+            self.totals = {'docs': totals.get('docs', 0), 'df': Counter(totals.get('df', {}))}
+        else:
+            for entry in self.days.values():
+                self._add_to_totals(entry['docs'], entry['df'])
+
+    def save(self):
+        """持久化文档频率：非当天的记录去掉只出现一次的n-gram，过期的天整体移除"""
+        if not self.state_path:
+            return
+
+        today = self._today()
+        self._expire(today)
+        for day, entry in self.days.items():
+            if day != today:
+                self._prune_singletons(entry)
+
+        state = {
+            'days': {
+                day: {'docs': entry['docs'], 'seen': sorted(entry['seen']), 'df': dict(entry['df'])}
+                for day, entry in self.days.items()
+            },
+            'totals': {'docs': self.totals['docs'], 'df': dict(self.totals['df'])}
+        }
+
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        os.replace(tmp_path, self.state_path)
+
+    @staticmethod
+    def _today() -> str:
+        """当天日期（北京时间）"""
+        return to_datetime(now_epoch()).strftime('%Y-%m-%d')
+
+    def _add_to_totals(self, docs: int, df: Counter, sign: int = 1):
+        """把一天的统计加入（sign=-1 时移出）历史总量"""
+        self.totals['docs'] += sign * docs
+        total_df = self.totals['df']
+        for gram, count in df.items():
+            total_df[gram] += sign * count
+            if total_df[gram] <= 0:
+                del total_df[gram]
+
+    def _expire(self, today: str):
+        """移除保留期之外的天"""
+        oldest = (to_datetime(now_epoch()) - timedelta(days=self.retention_days - 1)).strftime('%Y-%m-%d')
+        for day in [d for d in self.days if d < oldest and d != today]:
+            entry = self.days.pop(day)
+            self._add_to_totals(entry['docs'], entry['df'], sign=-1)
+
+    def _prune_singletons(self, entry: dict):
+        """去掉一天内只出现一次的n-gram，控制状态文件大小"""
+        singletons = Counter({gram: 1 for gram, count in entry['df'].items() if count == 1})
+        if singletons:
+            for gram in singletons:
+                del entry['df'][gram]
+            self._add_to_totals(0, singletons, sign=-1)
+
+    def _ngrams(self, normalized_title: str) -> Set[str]:
+        """
+        标题在停用词处切开后提取字符n-gram
+
+        纯数字的n-gram不计；字母数字串（如 2025、suv）不从中间切开
+        """
+        segments = self.stop_pattern.split(normalized_title) if self.stop_pattern else [normalized_title]
+        grams = set()
+
+        for segment in segments:
+            # cut[i]: 位置i处可以作为n-gram的边界
+            cut = [True] + [
+                not (_is_alnum(segment[i - 1]) and _is_alnum(segment[i]))
+                for i in range(1, len(segment))
+            ] + [True]
+            for n in range(self.min_n, self.max_n + 1):
+                for i in range(len(segment) - n + 1):
+                    if cut[i] and cut[i + n]:
+                        gram = segment[i:i + n]
+                        if not gram.isdigit():
+                            grams.add(gram)
+
+        return grams
+
+    def extract(self, titles: List[str], top_n: int = 5) -> List[Tuple[str, int]]:
+        """
+        计算一批标题（当天报告语料）的热词，并把它们计入当天的文档频率
+
+        Args:
+            titles: 每个事件一条代表标题（同一事件的多源报道不要重复传入）
+            top_n: 返回的热词数
+
+        Returns:
+            [(热词, 出现的事件数)]，按得分从高到低
+        """
+        today = self._today()
+        day = self.days.setdefault(today, {'docs': 0, 'seen': set(), 'df': Counter()})
+
+        # 当天词频：每个事件一条标题，规范形式相同的标题只计一次，即词频为出现的不同事件数
+        tf = Counter()
+        new_df = Counter()
+        new_docs = 0
+        for normalized in {normalize_text(t) for t in titles} - {''}:
+            grams = self._ngrams(normalized)
+            tf.update(grams)
+
+            fingerprint = hashlib.md5(normalized.encode('utf-8')).hexdigest()[:12]
+            if fingerprint not in day['seen']:
+                day['seen'].add(fingerprint)
+                new_df.update(grams)
+                new_docs += 1
+
+        # 历史文档频率不含当天，当天的词与过去对比
+        history_docs = self.totals['docs'] - day['docs']
+        history_df = self.totals['df']
+        today_df = day['df']
+
+        scores = {}
+        for gram, count in tf.items():
+            if count < self.min_count:
+                continue
+            df = history_df.get(gram, 0) - today_df.get(gram, 0)
+            scores[gram] = count * (math.log((1 + history_docs) / (1 + df)) + 1)
+
+        day['docs'] += new_docs
+        day['df'].update(new_df)
+        self._add_to_totals(new_docs, new_df)
+
+        return self._select(scores, tf, top_n)
+
+    def _select(self, scores: Dict[str, float], tf: Counter, top_n: int) -> List[Tuple[str, int]]:
+        """去掉被较长n-gram覆盖的片段，按得分选出互不包含的TOP N"""
+        dominated = set()
+        for gram in scores:
+            if len(gram) > self.min_n:
+                for part in (gram[:-1], gram[1:]):
+                    if tf[gram] >= self.SUPERSTRING_RATIO * tf[part]:
+                        dominated.add(part)
+
+        # 与已选热词有共同的最短n-gram（包含或部分重叠）则视为同一个词
+        selected = []
+        covered = set()
+        for gram in sorted(scores, key=lambda g: (-scores[g], -len(g), g)):
+            if gram in dominated:
+                continue
+            parts = {gram[i:i + self.min_n] for i in range(len(gram) - self.min_n + 1)}
+            if parts & covered:
+                continue
+            selected.append(gram)
+            covered |= parts
+            if len(selected) == top_n:
+                break
+
+        return [(gram, tf[gram]) for gram in selected]
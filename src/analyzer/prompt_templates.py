@@ -0,0 +1,243 @@
+"""
+提示词模板 - 版本化模板、固定的system消息与紧凑输出格式
+
+固定的说明与输出格式放在system消息里，每次调用完全相同，服务端可以复用前缀缓存；
+user消息只含文章本身。输出使用短键与编码值（如 s=-1/0/1），本地展开为完整字段，
+校验器在模板加载时预先编译，解析时逐字段做类型检查与取值转换。
+模板按版本登记，可通过 analysis_config.prompt_version 切换或回退。
+"""
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..collectors.base_collector import Article
+
+# 分析结果的内容分类
+CATEGORIES = ['试驾', '上市', '评测', '口碑', '对比', '负面', '其他']
+
+SENTIMENTS = {1: 'positive', 0: 'neutral', -1: 'negative'}
+
+
+def _enum(mapping: dict) -> Callable[[Any], Any]:
+    """枚举字段：按映射表取值"""
+    def convert(value):
+        if value not in mapping:
+            raise ValueError(f"取值不在 {list(mapping)} 中: {value!r}")
+        return mapping[value]
+    return convert
+
+
+def _number(low: float, high: float, scale: float = 1.0) -> Callable[[Any], float]:
+    """数值字段：限定范围后按比例换算"""
+    def convert(value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            value = float(value)
+        if not low <= value <= high:
+            raise ValueError(f"超出范围 [{low}, {high}]: {value}")
+        return round(value * scale, 2)
+    return convert
+
+
+def _text(max_len: int) -> Callable[[Any], str]:
+    """文本字段：去空白并截断"""
+    def convert(value):
+        if not isinstance(value, str):
+            raise ValueError(f"不是字符串: {value!r}")
+        return value.strip()[:max_len]
+    return convert
+
+
+def _text_list(max_items: int) -> Callable[[Any], List[str]]:
+    """字符串列表字段：去掉空项并截断"""
+    def convert(value):
+        if not isinstance(value, list):
+            raise ValueError(f"不是列表: {value!r}")
+        return [str(v).strip() for v in value if str(v).strip()][:max_items]
+    return convert
+
+
+def _flag(value) -> bool:
+    """布尔字段：接受 true/false 与 0/1"""
+    if value in (True, False, 0, 1):
+        return bool(value)
+    raise ValueError(f"不是布尔值: {value!r}")
+
+
+class OutputSchema:
+    """预编译的输出校验器：模型输出的键 → (结果字段名, 转换函数)"""
+
+    def __init__(self, fields: Dict[str, Tuple[str, Callable[[Any], Any]]], required: Tuple[str, ...]):
+        """
+        Args:
+            fields: 输出键 → (展开后的字段名, 转换函数，非法时抛出 ValueError)
+            required: 必须出现的输出键
+        """
+        self.fields = fields
+        self.required = required
+
+    def parse(self, content: str) -> Optional[Dict]:
+        """
+        解析并校验模型输出
+
+        Args:
+            content: 模型返回的文本（可带 ```json 代码块）
+
+        Returns:
+            展开后的结果字典，格式不符时为None
+        """
+        text = content.strip()
+        if text.startswith('```'):
+            text = text.strip('`').strip()
+            if text.startswith('json'):
+                text = text[4:]
+
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return None
+        if not isinstance(data, dict) or any(key not in data for key in self.required):
+            return None
+
+        result = {}
+        try:
+            for key, (name, convert) in self.fields.items():
+                if key in data:
+                    result[name] = convert(data[key])
+        except (TypeError, ValueError):
+            return None
+
+        return result
+
+
+class PromptTemplate:
+    """一个版本的提示词模板"""
+
+    def __init__(self, version: str, user: str, schema: OutputSchema,
+                 system: Optional[str] = None, max_tokens: Optional[int] = None,
+                 body: Optional[str] = None, body_chars: int = 300):
+        """
+        Args:
+            version: 模板版本
+            user: user消息模板（str.format，可用 title/source/category）
+            schema: 输出校验器
+            system: system消息（固定不变），None 表示全部放在user消息中
+            max_tokens: 输出token上限，None 表示不限
+            body: 有网页正文时追加到user消息的模板（可用 body），None 表示不使用正文
+            body_chars: 正文摘录的最大字数
+        """
+        self.version = version
+        self.user = user
+        self.schema = schema
+        self.system = system
+        self.max_tokens = max_tokens
+        self.body = body
+        self.body_chars = body_chars
+
+    def build_messages(self, article: Article) -> List[Dict[str, str]]:
+        """
+        构造一篇文章的消息列表
+
+        Args:
+            article: 文章对象
+
+        Returns:
+            [{role, content}]，system消息在前
+        """
+        messages = [{'role': 'system', 'content': self.system}] if self.system else []
+        content = self.user.format(title=article.title, source=article.source, category=article.category)
+        if self.body and article.body:
+            content += self.body.format(body=article.body[:self.body_chars])
+        messages.append({'role': 'user', 'content': content})
+        return messages
+
+    def call_options(self) -> dict:
+        """调用API时附加的参数"""
+        return {'max_tokens': self.max_tokens} if self.max_tokens else {}
+
+
+# v1：原有提示词，说明与完整字段名的输出格式全部在user消息中
+V1_USER = """你是一个汽车行业舆情分析专家。请分析以下汽车新闻的情感倾向和关键信息。
+
+新闻标题：{title}
+新闻来源：{source}
+相关车型：{category}
+
+请按照以下JSON格式输出分析结果：
+{{
+    "sentiment": "positive/negative/neutral",
+    "sentiment_score": 0.0-1.0之间的分数,
+    "summary": "50字以内的摘要，专业、理性、轻度乐观的语气",
+    "keywords": ["关键词1", "关键词2", "关键词3"],
+    "category": "试驾/上市/评测/口碑/对比/负面之一",
+    "is_own_brand_negative": true或false (是否为东风本田负面新闻)
+}}
+
+注意：
+1. 东风本田旗下车型包括：艾力绅、HR-V、Inspire
+2. 负面新闻包括：召回、投诉、质量问题、故障等
+3. 摘要需简洁专业，不超过50字
+4. 关键词提取3-5个最重要的词
+
+只输出JSON，不要其他内容："""
+
+V1_SCHEMA = OutputSchema(
+    fields={
+        'sentiment': ('sentiment', _enum({s: s for s in SENTIMENTS.values()})),
+        'sentiment_score': ('sentiment_score', _number(0, 1)),
+        'summary': ('summary', _text(50)),
+        'keywords': ('keywords', _text_list(5)),
+        'category': ('category', _enum({c: c for c in CATEGORIES})),
+        'is_own_brand_negative': ('is_own_brand_negative', _flag),
+    },
+    required=('sentiment', 'summary')
+)
+
+# v2：固定说明放在system消息，输出短键与编码值
+V2_SYSTEM = """你是汽车行业舆情分析专家。对用户给出的一条汽车新闻，只输出一行JSON，不要其他内容：
+{"s":情感(1正面/0中性/-1负面),"c":情感分0-10,"m":"摘要","k":["关键词"],"t":"分类","o":本品负面(1是/0否)}
+规则：
+- m：30字以内，专业、理性、轻度乐观
+- k：3-5个最重要的词
+- t：试驾/上市/评测/口碑/对比/负面/其他 之一
+- 负面指召回、投诉、质量问题、故障等
+- 本品为东风本田：艾力绅、HR-V、Inspire；o=1 仅当新闻是本品负面
+- 给出正文摘录时结合正文判断，标题含义不明确时以正文为准"""
+
+V2_USER = "标题：{title}\n来源：{source}\n车型：{category}"
+
+# 有网页正文时追加的摘录（标题不明确时据此判断）
+V2_BODY = "\n正文摘录：{body}"
+
+V2_SCHEMA = OutputSchema(
+    fields={
+        's': ('sentiment', _enum(SENTIMENTS)),
+        'c': ('sentiment_score', _number(0, 10, scale=0.1)),
+        'm': ('summary', _text(50)),
+        'k': ('keywords', _text_list(5)),
+        't': ('category', _enum({c: c for c in CATEGORIES})),
+        'o': ('is_own_brand_negative', _flag),
+    },
+    required=('s', 'm')
+)
+
+TEMPLATES: Dict[str, PromptTemplate] = {
+    'v1': PromptTemplate('v1', V1_USER, V1_SCHEMA),
+    'v2': PromptTemplate('v2', V2_USER, V2_SCHEMA, system=V2_SYSTEM, max_tokens=120, body=V2_BODY),
+}
+
+DEFAULT_VERSION = 'v2'
+
+
+def get_template(version: Optional[str] = None) -> PromptTemplate:
+    """
+    按版本取模板
+
+    Args:
+        version: 模板版本，None 表示默认版本
+
+    Raises:
+        ValueError: 版本不存在
+    """
+    version = version or DEFAULT_VERSION
+    if version not in TEMPLATES:
+        raise ValueError(f"未知的提示词模板版本: {version}（可选: {', '.join(TEMPLATES)}）")
+    return TEMPLATES[version]
@@ -2,64 +2,208 @@
 情感分析器 - 通义千问API
 """
 import os
-import json
-from typing import Dict, List, Optional
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
 
 from ..collectors.base_collector import Article
+from ..utils.endpoint_health import EndpointHealth, Deadline
+from .prompt_templates import get_template
 from ..utils.logger import logger
 
-try:
-    import dashscope
-    from dashscope import Generation
-    DASHSCOPE_AVAILABLE = True
-except ImportError:
-    DASHSCOPE_AVAILABLE = False
-    logger.warning("dashscope库未安装，情感分析功能将被禁用")
+# dashscope 导入较重，仅在确实启用AI模式时才加载
+_dashscope = None
+
+
+def _load_dashscope():
+    """
+    按需导入dashscope
+    
+    Returns:
+        dashscope模块，未安装时返回None
+    """
+    global _dashscope
+    if _dashscope is None and os.getenv('DASHSCOPE_STUB') == '1':
+        # 端到端基准测试使用本地替身
+        from . import dashscope_stub
+        _dashscope = dashscope_stub
+    elif _dashscope is None:
+        try:
+            import dashscope
+            from dashscope import Generation  # noqa: F401
+            _dashscope = dashscope
+        except ImportError:
+            _dashscope = False
+    return _dashscope or None
 
 
 class SentimentAnalyzer:
     """情感分析器"""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "qwen-turbo"):
+    # 延迟统计与熔断使用的端点名
+    ENDPOINT = 'dashscope'
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = "qwen-turbo",
+                 cache_size: int = 5000, config: Optional[dict] = None,
+                 health_path: Optional[str] = "data/llm_health.json",
+                 budget=None):
         """
         初始化分析器
         
         Args:
             api_key: 通义千问API Key
             model: 模型名称
+            cache_size: 分析结果缓存条数（按规范化标题+来源，LRU淘汰）
+            config: sources.yaml 的 analysis_config（提示词模板版本、单次调用超时、对冲请求、分析阶段截止时间）
+            health_path: API延迟样本与熔断状态文件，None 表示不持久化
+            budget: BudgetGovernor 预算控制器（token/费用上限与调度优先级），None 表示不限
         """
         self.api_key = api_key or os.getenv('DASHSCOPE_API_KEY')
         self.model = model
+        self.cache_size = cache_size
+        self.result_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self.budget = budget
+        
+        config = config or {}
+        self.template = get_template(config.get('prompt_version'))
+        call_timeout = config.get('call_timeout', 30)
+        # 单次调用超时：样本足够后为 p95 × 系数，不超过 call_timeout
+        self.health = EndpointHealth(
+            state_path=health_path,
+            failure_threshold=config.get('failure_threshold', 5),
+            cooldown_minutes=config.get('cooldown_minutes', 10),
+            default_timeout=call_timeout,
+            min_timeout=config.get('min_timeout', 5),
+            max_timeout=call_timeout,
+            timeout_multiplier=config.get('timeout_multiplier', 3.0)
+        )
+        # 对冲请求：调用超过p95仍未返回时再发一次，取先返回者；对冲次数不超过调用数的一定比例
+        self.hedge_max_ratio = config.get('hedge_max_ratio', 0.1)
+        self.hedge_min_delay = config.get('hedge_min_delay', 1.0)
+        self.run_deadline_seconds = config.get('run_deadline_seconds')
+        self.deadline = Deadline(self.run_deadline_seconds)
+        self.call_stats = {'calls': 0, 'hedges': 0, 'hedge_wins': 0, 'timeouts': 0, 'deadline_skips': 0}
         
         if not self.api_key:
             logger.warning("未设置通义千问API Key，情感分析将使用规则模式")
             self.use_ai = False
-        elif not DASHSCOPE_AVAILABLE:
+        elif _load_dashscope() is None:
             logger.warning("dashscope库未安装，情感分析将使用规则模式")
             self.use_ai = False
         else:
-            dashscope.api_key = self.api_key
+            _load_dashscope().api_key = self.api_key
             self.use_ai = True
-            logger.info(f"通义千问API已初始化: {model}")
+            logger.info(f"通义千问API已初始化: {model} (提示词模板 {self.template.version})")
     
-    def analyze_batch(self, articles: List[Article]) -> List[Dict]:
+    def analyze_batch(self, articles: List[Article],
+                      on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
         """
         批量分析文章情感
         
         Args:
             articles: 文章列表
+            on_result: 单条结果回调（如本品负面实时预警），每分析完一条立即调用
             
         Returns:
             分析结果列表
         """
+        results: List[Optional[Dict]] = [None] * len(articles)
+        
+        # 按优先级分析（预算不足时优先级低的改用规则），结果保持原顺序
+        for index in self._schedule(articles):
+            result = self.analyze_single(articles[index])
+            results[index] = result
+            
+            if on_result:
+                on_result(result)
+        
+        self._finish_run()
+        
+        return results
+    
+    def analyze_clusters(self, clusters: list,
+                         on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        按事件簇分析：每簇只分析代表文章，结果扇出到全部成员
+        
+        Args:
+            clusters: StoryCluster 列表
+            on_result: 代表文章结果回调（每个事件只触发一次）
+            
+        Returns:
+            全部成员的分析结果，附带 cluster_id/cluster_size/cluster_sources/is_representative
+        """
+        representatives = [cluster.representative for cluster in clusters]
+        rep_results: List[Optional[Dict]] = [None] * len(clusters)
+        
+        for index in self._schedule(representatives):
+            cluster = clusters[index]
+            rep_result = self.analyze_single(cluster.representative)
+            cluster_info = {
+                'cluster_id': cluster.cluster_id,
+                'cluster_size': cluster.size,
+                'cluster_sources': cluster.sources
+            }
+            rep_result.update(cluster_info, is_representative=True)
+            
+            rep_results[index] = rep_result
+            
+            if on_result:
+                on_result(rep_result)
+        
         results = []
+        for cluster, rep_result in zip(clusters, rep_results):
+            representative = cluster.representative
+            for member in cluster.members:
+                if member is representative:
+                    results.append(rep_result)
+                    continue
+                
+                member_result = dict(rep_result)
+                member_result.update({
+                    'title': member.title,
+                    'url': member.url,
+                    'source': member.source,
+                    'publish_time': member.publish_time.isoformat() if member.publish_time else None,
+                    'matched_keywords': member.matched_keywords,
+                    'is_representative': False
+                })
+                results.append(member_result)
         
-        for article in articles:
-            result = self.analyze_single(article)
-            results.append(result)
+        logger.info(f"事件级分析: {len(clusters)} 次分析覆盖 {len(results)} 条文章")
+        self._finish_run()
         
         return results
     
+    def start_run(self):
+        """开始新一轮分析（常驻进程每次采集后分析及每期日报前调用），重新计算分析阶段截止时间与本轮预算"""
+        self.deadline = Deadline(self.run_deadline_seconds)
+        if self.budget:
+            self.budget.start_run()
+    
+    def _schedule(self, articles: List[Article]) -> List[int]:
+        """分析顺序：有预算控制器时按优先级，否则按原顺序"""
+        if self.budget and self.use_ai:
+            return self.budget.order(articles)
+        return list(range(len(articles)))
+    
+    def _finish_run(self):
+        """输出本轮API调用统计并保存延迟样本"""
+        stats = self.call_stats
+        if not stats['calls'] and not stats['deadline_skips']:
+            return
+        
+        logger.info(
+            f"API调用 {stats['calls']} 次: 对冲 {stats['hedges']} 次(对冲先返回 {stats['hedge_wins']} 次), "
+            f"超时 {stats['timeouts']} 次, 截止时间后改用规则 {stats['deadline_skips']} 条"
+        )
+        self.health.save()
+        if self.budget:
+            logger.info(f"AI分析用量: {self.budget.summary()}")
+            self.budget.save()
+    
     def analyze_single(self, article: Article) -> Dict:
         """
         分析单篇文章
@@ -70,23 +214,53 @@ class SentimentAnalyzer:
         Returns:
             分析结果字典
         """
+        cache_key = f"{article.source}|{article.normalized_title}"
+        if cache_key in self.result_cache:
+            self.result_cache.move_to_end(cache_key)
+            # 规范形式相同的标题写法可能不同，原始信息取当前文章
+            result = dict(self.result_cache[cache_key])
+            result.update({
+                'title': article.title,
+                'url': article.url,
+                'publish_time': article.publish_time.isoformat() if article.publish_time else None,
+                'matched_keywords': article.matched_keywords
+            })
+            return result
+        
         if self.use_ai:
-            return self._analyze_with_ai(article)
+            result = self._analyze_with_ai(article)
         else:
-            return self._analyze_with_rules(article)
+            result = self._analyze_with_rules(article)
+        
+        self.result_cache[cache_key] = result
+        if len(self.result_cache) > self.cache_size:
+            self.result_cache.popitem(last=False)
+        
+        return dict(result)
     
     def _analyze_with_ai(self, article: Article) -> Dict:
         """使用AI进行情感分析"""
+        # 分析阶段截止时间已到或API熔断中：剩余文章直接使用规则
+        if self.deadline.expired():
+            if self.call_stats['deadline_skips'] == 0:
+                logger.warning("分析阶段截止时间已到，剩余文章使用规则模式")
+            self.call_stats['deadline_skips'] += 1
+            return self._analyze_with_rules(article)
+        if not self.health.allow(self.ENDPOINT):
+            return self._analyze_with_rules(article)
+        
+        # 构造消息：固定的system消息 + 文章信息
+        messages = self.template.build_messages(article)
+        prompt = '\n'.join(m['content'] for m in messages)
+        
+        # 预算不足：剩余文章使用规则
+        if self.budget and not self.budget.allow(prompt):
+            return self._analyze_with_rules(article)
+        
+        response = None
         try:
-            # 构造prompt
-            prompt = self._build_prompt(article)
-            
-            # 调用通义千问API
-            response = Generation.call(
-                model=self.model,
-                prompt=prompt,
-                result_format='message'
-            )
+            # 调用通义千问API（带超时与对冲请求）
+            response = self._call_api(messages)
             
             if response.status_code == 200:
                 content = response.output.choices[0].message.content
@@ -99,59 +273,111 @@ class SentimentAnalyzer:
         except Exception as e:
             logger.error(f"AI分析失败: {e}")
             return self._analyze_with_rules(article)
-    
-    def _build_prompt(self, article: Article) -> str:
-        """构造分析提示词"""
-        prompt = f"""你是一个汽车行业舆情分析专家。请分析以下汽车新闻的情感倾向和关键信息。
-
-新闻标题：{article.title}
-新闻来源：{article.source}
-相关车型：{article.category}
-
-请按照以下JSON格式输出分析结果：
-{{
-    "sentiment": "positive/negative/neutral",
-    "sentiment_score": 0.0-1.0之间的分数,
-    "summary": "50字以内的摘要，专业、理性、轻度乐观的语气",
-    "keywords": ["关键词1", "关键词2", "关键词3"],
-    "category": "试驾/上市/评测/口碑/对比/负面之一",
-    "is_own_brand_negative": true或false (是否为东风本田负面新闻)
-}}
-
-注意：
-1. 东风本田旗下车型包括：艾力绅、HR-V、Inspire
-2. 负面新闻包括：召回、投诉、质量问题、故障等
-3. 摘要需简洁专业，不超过50字
-4. 关键词提取3-5个最重要的词
-
-只输出JSON，不要其他内容："""
         
-        return prompt
+        finally:
+            # 超时、异常时没有usage，按估算记账
+            if self.budget:
+                self.budget.record(prompt, response)
     
-    def _parse_ai_response(self, content: str, article: Article) -> Dict:
-        """解析AI响应"""
-        try:
-            # 尝试解析JSON
-            result = json.loads(content)
+    def _call_api(self, messages: List[Dict[str, str]]):
+        """
+        调用通义千问API，单次调用有超时，慢调用发出对冲请求
+        
+        SDK调用无法中途取消，每次请求在守护线程中执行：超时或被对冲请求抢先后
+        直接放弃等待，不阻塞后续文章，也不阻止进程退出
+        
+        Args:
+            messages: 消息列表
             
-            # 补充原始信息
-            result.update({
-                'title': article.title,
-                'url': article.url,
-                'source': article.source,
-                'publish_time': article.publish_time.isoformat() if article.publish_time else None,
-                'matched_keywords': article.matched_keywords
-            })
+        Returns:
+            先成功返回的响应；均失败时为最后一个失败响应
             
-            return result
+        Raises:
+            TimeoutError: 超时仍未返回
+            Exception: 请求均抛出异常时抛出最后一个异常
+        """
+        timeout = min(self.health.timeout_for(self.ENDPOINT), self.deadline.remaining())
+        p95 = self.health.latency_percentile(self.ENDPOINT)
+        hedge_after = max(p95, self.hedge_min_delay) if p95 is not None else None
+        
+        results: "queue.Queue" = queue.Queue()
+        
+        def attempt(hedge: bool):
+            start = time.monotonic()
+            try:
+                response = _load_dashscope().Generation.call(
+                    model=self.model,
+                    messages=messages,
+                    result_format='message',
+                    **self.template.call_options()
+                )
+                results.put((response, None, time.monotonic() - start, hedge))
+            except Exception as e:
+                results.put((None, e, time.monotonic() - start, hedge))
+        
+        self.call_stats['calls'] += 1
+        start = time.monotonic()
+        threading.Thread(target=attempt, args=(False,), daemon=True).start()
+        pending = 1
+        hedged = False
+        last_response, last_error = None, None
+        
+        while pending:
+            elapsed = time.monotonic() - start
+            can_hedge = (
+                not hedged and hedge_after is not None and elapsed < hedge_after < timeout
+                and self.call_stats['hedges'] + 1 <= self.hedge_max_ratio * self.call_stats['calls']
+            )
+            wait = (hedge_after if can_hedge else timeout) - elapsed
+            if wait <= 0:
+                break
             
-        except json.JSONDecodeError:
+            try:
+                response, error, latency, is_hedge = results.get(timeout=max(wait, 0))
+            except queue.Empty:
+                if can_hedge:
+                    threading.Thread(target=attempt, args=(True,), daemon=True).start()
+                    self.call_stats['hedges'] += 1
+                    # 对冲请求同样消耗token，按估算记账
+                    if self.budget:
+                        self.budget.record('\n'.join(m['content'] for m in messages))
+                    pending += 1
+                    hedged = True
+                continue
+            
+            pending -= 1
+            if error is None and response.status_code == 200:
+                self.health.record_success(self.ENDPOINT, latency)
+                if is_hedge:
+                    self.call_stats['hedge_wins'] += 1
+                return response
+            last_response, last_error = response, error
+        
+        if pending:
+            self.call_stats['timeouts'] += 1
+            self.health.record_failure(self.ENDPOINT)
+            raise TimeoutError(f"通义千问API {timeout:.1f} 秒内未返回")
+        
+        self.health.record_failure(self.ENDPOINT)
+        if last_error is not None:
+            raise last_error
+        return last_response
+    
+    def _parse_ai_response(self, content: str, article: Article) -> Dict:
+        """解析AI响应：按模板的输出格式校验并展开为完整字段"""
+        result = self.template.schema.parse(content)
+        if result is None:
             logger.warning(f"AI响应解析失败，使用规则模式: {content[:100]}")
             return self._analyze_with_rules(article)
+        
+        # 模型未给出的字段用规则结果补齐，再补充原始信息
+        fallback = self._analyze_with_rules(article)
+        fallback.update(result)
+        return fallback
     
     def _analyze_with_rules(self, article: Article) -> Dict:
         """使用规则进行情感分析（备用方案）"""
-        title = article.title.lower()
+        title = article.normalized_title
         
         # 正面关键词
         positive_keywords = ['好评', '优秀', '出色', '领先', '推荐', '值得', '超越', '更好', '满意', '喜欢']
@@ -213,7 +439,7 @@ class SentimentAnalyzer:
             return '评测'
         elif any(kw in title for kw in ['口碑', '车主', '用户']):
             return '口碑'
-        elif any(kw in title for kw in ['对比', 'PK', 'VS', 'vs']):
+        elif any(kw in title for kw in ['对比', 'pk', 'vs']):
             return '对比'
         elif any(kw in title for kw in ['召回', '投诉', '质量问题', '故障']):
             return '负面'
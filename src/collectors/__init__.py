@@ -1,12 +1,29 @@
-"""数据采集器模块"""
-from .base_collector import BaseCollector
-from .sina_collector import SinaCollector
-from .trendradar_collector import TrendRadarCollector
-from .tech_collector import TechCollector
+"""数据采集器模块
+
+各采集器依赖 requests/bs4，按需延迟导入：
+仅使用 base_collector.Article 的模块（过滤器、分析器）不会触发网络库加载。
+"""
+from importlib import import_module
+
+from .base_collector import BaseCollector, CollectionSkipped
+
+_LAZY_COLLECTORS = {
+    'SinaCollector': '.sina_collector',
+    'TrendRadarCollector': '.trendradar_collector',
+    'TechCollector': '.tech_collector',
+}
 
 __all__ = [
     'BaseCollector',
+    'CollectionSkipped',
     'SinaCollector', 
     'TrendRadarCollector',
     'TechCollector'
 ]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_COLLECTORS:
+        module = import_module(_LAZY_COLLECTORS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,21 @@
 """
 基础采集器类
 """
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from typing import List, Optional
 
+from ..utils.rate_controller import PolitenessController
+from ..utils.text_normalize import normalize_text
+from ..utils.time_normalize import epoch_from_datetime, to_datetime
+from ..utils.url_normalize import canonicalize_url
+
+
+class CollectionSkipped(Exception):
+    """端点熔断或采集截止时间已到，跳过请求"""
+
 
 @dataclass
 class Article:
@@ -15,13 +25,45 @@ class Article:
     source: str
     publish_time: Optional[datetime] = None
     content: Optional[str] = None
+    # 网页正文（正文补全阶段抓取，只对重点文章填充）
+    body: Optional[str] = None
     author: Optional[str] = None
     category: Optional[str] = None
     matched_keywords: List[str] = None
+    score: Optional[float] = None
+    # 发布时间的UTC epoch秒，与 publish_time 二者给出其一即可，另一个自动补齐
+    publish_ts: Optional[int] = None
+    # 标题规范形式缓存，首次访问 normalized_title 时计算
+    _normalized_title: Optional[str] = field(default=None, repr=False, compare=False)
+    # 链接规范形式缓存，首次访问 canonical_url 时计算
+    _canonical_url: Optional[str] = field(default=None, repr=False, compare=False)
     
     def __post_init__(self):
         if self.matched_keywords is None:
             self.matched_keywords = []
+        
+        if self.publish_ts is None and self.publish_time is not None:
+            self.publish_ts = epoch_from_datetime(self.publish_time)
+        elif self.publish_time is None and self.publish_ts is not None:
+            self.publish_time = to_datetime(self.publish_ts)
+    
+    @property
+    def normalized_title(self) -> str:
+        """标题规范形式（全角转半角、大小写折叠、去空白标点），供匹配、去重与缓存键使用"""
+        if self._normalized_title is None:
+            self._normalized_title = normalize_text(self.title)
+        return self._normalized_title
+    
+    @property
+    def canonical_url(self) -> str:
+        """链接规范形式（去跟踪参数、展开跳转、统一移动版主机），供精确去重使用"""
+        if self._canonical_url is None:
+            self._canonical_url = canonicalize_url(self.url)
+        return self._canonical_url
+    
+    def copy(self) -> 'Article':
+        """复制文章（matched_keywords 独立），供多套配置分别过滤"""
+        return replace(self, matched_keywords=list(self.matched_keywords))
     
     def to_dict(self) -> dict:
         """转换为字典"""
@@ -31,23 +73,102 @@ class Article:
             'source': self.source,
             'publish_time': self.publish_time.isoformat() if self.publish_time else None,
             'content': self.content,
+            'body': self.body,
             'author': self.author,
             'category': self.category,
-            'matched_keywords': self.matched_keywords
+            'matched_keywords': self.matched_keywords,
+            'score': self.score,
+            'publish_ts': self.publish_ts
         }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Article':
+        """从 to_dict() 的结果还原（publish_ts 为准，publish_time 由其补齐）"""
+        return cls(
+            title=data['title'],
+            url=data.get('url', ''),
+            source=data.get('source', ''),
+            content=data.get('content'),
+            body=data.get('body'),
+            author=data.get('author'),
+            category=data.get('category'),
+            matched_keywords=list(data.get('matched_keywords') or []),
+            score=data.get('score'),
+            publish_ts=data.get('publish_ts')
+        )
 
 
 class BaseCollector(ABC):
     """采集器基类"""
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, health=None, deadline=None, default_timeout: float = 10,
+                 politeness: Optional[PolitenessController] = None):
         """
         初始化采集器
         
         Args:
             config: 配置字典
+            health: 端点健康度跟踪器（EndpointHealth），用于熔断与自适应超时
+            deadline: 采集阶段截止时间（Deadline）
+            default_timeout: 未启用健康度跟踪时的请求超时（秒）
+            politeness: 按主机的请求节奏控制器，未传入时使用不持久化的默认控制器
         """
         self.config = config
+        self.health = health
+        self.deadline = deadline
+        self.default_timeout = default_timeout
+        self.politeness = politeness or PolitenessController()
+        self.session = None
+    
+    def deadline_expired(self) -> bool:
+        """采集阶段截止时间是否已到"""
+        return self.deadline is not None and self.deadline.expired()
+    
+    def _get(self, endpoint: str, url: str, **kwargs):
+        """
+        带熔断、自适应超时与截止时间控制的GET请求
+        
+        Args:
+            endpoint: 端点标识（熔断与延迟统计的粒度）
+            url: 请求地址
+            **kwargs: 透传给 session.get 的参数
+            
+        Returns:
+            响应对象（已校验HTTP状态）
+            
+        Raises:
+            CollectionSkipped: 端点熔断中或截止时间已到
+        """
+        if self.deadline_expired():
+            raise CollectionSkipped("采集截止时间已到")
+        
+        if self.health and not self.health.allow(endpoint):
+            raise CollectionSkipped(f"{endpoint} 熔断中")
+        
+        host = self.politeness.host_of(url)
+        self.politeness.wait(host)
+        
+        timeout = self.health.timeout_for(endpoint) if self.health else self.default_timeout
+        if self.deadline:
+            timeout = min(timeout, self.deadline.remaining())
+        
+        start = time.monotonic()
+        try:
+            response = self.session.get(url, timeout=timeout, **kwargs)
+            response.raise_for_status()
+        except Exception as e:
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            self.politeness.on_failure(host, status)
+            if self.health:
+                self.health.record_failure(endpoint)
+            raise
+        
+        latency = time.monotonic() - start
+        self.politeness.on_success(host, latency)
+        if self.health:
+            self.health.record_success(endpoint, latency)
+        
+        return response
     
     @abstractmethod
     def collect(self, keywords: List[str]) -> List[Article]:
@@ -0,0 +1,323 @@
+"""
+正文补全 - 为重点文章抓取网页正文
+
+只处理优先级最高（本品、得分高）或仅凭标题难以判断的文章：标题过短或含有
+"问题""回应"等指向不明的词。抓取并发按主机限制，每页有字节数与耗时上限，
+提取出的正文写入 Article.body 供AI分析使用。
+
+磁盘缓存分两层：链接规范形式 → 网页内容哈希的索引，以及按内容哈希存放的正文。
+已抓取过的链接不再下载；不同链接返回相同内容时只提取、存储一次。
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .base_collector import Article
+from ..utils.endpoint_health import Deadline
+from ..utils.html_text import decode_html, extract_main_text
+from ..utils.http_replay import create_session
+from ..utils.logger import logger
+from ..utils.time_normalize import now_epoch
+from ..utils.url_normalize import canonicalize_url
+
+
+class ContentEnricher:
+    """正文补全器"""
+
+    # 指向不明、仅凭标题难以判断情感的词
+    DEFAULT_AMBIGUOUS_TERMS = ['问题', '回应', '事件', '真相', '曝光', '怎么了', '到底', '风波', '争议', '背后']
+
+    def __init__(self, cache_dir: Optional[str] = "data/content_cache", top_n: int = 10,
+                 max_pages: int = 30, ambiguous_terms: Iterable[str] = DEFAULT_AMBIGUOUS_TERMS,
+                 min_title_chars: int = 10, max_workers: int = 8, per_host_concurrency: int = 2,
+                 max_bytes: int = 512 * 1024, page_timeout: float = 8.0, stage_deadline_seconds: float = 60,
+                 max_chars: int = 2000, cache_days: int = 7):
+        """
+        初始化正文补全器
+
+        Args:
+            cache_dir: 磁盘缓存目录，None 表示不缓存
+            top_n: 按优先级取前多少条
+            max_pages: 每轮最多补全的文章数（含标题不明确的文章）
+            ambiguous_terms: 指向不明的词，标题含有时补全正文
+            min_title_chars: 规范化标题少于该字数时补全正文
+            max_workers: 抓取线程数
+            per_host_concurrency: 同一主机的最大并发请求数
+            max_bytes: 每页最多读取的字节数
+            page_timeout: 每页最长耗时（秒，含连接与读取）
+            stage_deadline_seconds: 整个补全阶段的时间预算（秒）
+            max_chars: 正文最大字数
+            cache_days: 缓存保留天数
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.top_n = top_n
+        self.max_pages = max_pages
+        self.ambiguous_terms = list(ambiguous_terms)
+        self.min_title_chars = min_title_chars
+        self.max_workers = max_workers
+        self.per_host_concurrency = per_host_concurrency
+        self.max_bytes = max_bytes
+        self.page_timeout = page_timeout
+        self.stage_deadline_seconds = stage_deadline_seconds
+        self.max_chars = max_chars
+        self.cache_days = cache_days
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+        }
+
+        self.session = create_session()
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        # 索引：链接规范形式 → [内容哈希, 抓取时间]；内容哈希为空表示抓取成功但未提取出正文
+        self.index: Dict[str, list] = self._load_index()
+        self.stats = {'cached': 0, 'fetched': 0, 'failed': 0, 'empty': 0}
+
+    @classmethod
+    def from_config(cls, config: dict, cache_dir: Optional[str] = "data/content_cache") -> 'ContentEnricher':
+        """从 sources.yaml 的 enrichment_config 构建"""
+        return cls(
+            cache_dir=cache_dir,
+            top_n=config.get('top_n', 10),
+            max_pages=config.get('max_pages', 30),
+            ambiguous_terms=config.get('ambiguous_terms', cls.DEFAULT_AMBIGUOUS_TERMS),
+            min_title_chars=config.get('min_title_chars', 10),
+            max_workers=config.get('max_workers', 8),
+            per_host_concurrency=config.get('per_host_concurrency', 2),
+            max_bytes=config.get('max_kb', 512) * 1024,
+            page_timeout=config.get('page_timeout', 8.0),
+            stage_deadline_seconds=config.get('stage_deadline_seconds', 60),
+            max_chars=config.get('max_chars', 2000),
+            cache_days=config.get('cache_days', 7)
+        )
+
+    @property
+    def index_path(self) -> Optional[Path]:
+        """链接索引文件"""
+        return self.cache_dir / 'index.json' if self.cache_dir else None
+
+    def _text_path(self, content_hash: str) -> Path:
+        """正文文件：按内容哈希前两位分目录"""
+        return self.cache_dir / content_hash[:2] / f"{content_hash}.txt"
+
+    def _load_index(self) -> Dict[str, list]:
+        """加载链接索引"""
+        if not self.index_path or not self.index_path.exists():
+            return {}
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"正文缓存索引加载失败，重新抓取: {e}")
+            return {}
+
+    def save(self):
+        """持久化链接索引，移除过期条目及不再被引用的正文文件"""
+        if not self.index_path:
+            return
+
+        oldest = now_epoch() - self.cache_days * 86400
+        expired = {key: entry for key, entry in self.index.items() if entry[1] < oldest}
+        self.index = {key: entry for key, entry in self.index.items() if entry[1] >= oldest}
+
+        referenced = {entry[0] for entry in self.index.values()}
+        for content_hash in {entry[0] for entry in expired.values()} - referenced:
+            if content_hash:
+                self._text_path(content_hash).unlink(missing_ok=True)
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+
+    def needs_body(self, article: Article) -> bool:
+        """标题是否不足以判断（过短或含指向不明的词）"""
+        title = article.normalized_title
+        return len(title) < self.min_title_chars or any(term in title for term in self.ambiguous_terms)
+
+    def select(self, articles: List[Article],
+               priority: Optional[Callable[[Article], Tuple]] = None) -> List[Article]:
+        """
+        选出需要补全正文的文章：优先级最高的 top_n 条 + 标题不明确的文章，合计不超过 max_pages
+
+        Args:
+            articles: 候选文章
+            priority: 优先级函数（越大越优先），默认按评分器得分
+        """
+        priority = priority or (lambda a: a.score or 0.0)
+        ranked = sorted(articles, key=priority, reverse=True)
+
+        selected = ranked[:self.top_n]
+        chosen = {id(a) for a in selected}
+        for article in ranked[self.top_n:]:
+            if len(selected) >= self.max_pages:
+                break
+            if id(article) not in chosen and self.needs_body(article):
+                selected.append(article)
+
+        return [a for a in selected[:self.max_pages] if a.url.startswith(('http://', 'https://')) and not a.body]
+
+    def enrich(self, articles: List[Article],
+               priority: Optional[Callable[[Article], Tuple]] = None) -> int:
+        """
+        为选中的文章补全正文（写入 article.body）
+
+        Args:
+            articles: 候选文章
+            priority: 优先级函数，见 select()
+
+        Returns:
+            补全了正文的文章数
+        """
+        selected = self.select(articles, priority)
+        if not selected:
+            return 0
+
+        deadline = Deadline(self.stage_deadline_seconds)
+        pending = []
+        for article in selected:
+            text = self._cached_text(article.canonical_url)
+            if text is None:
+                pending.append(article)
+            elif text:
+                article.body = text
+
+        # 同一链接只抓一次
+        by_url: Dict[str, List[Article]] = {}
+        for article in pending:
+            by_url.setdefault(article.canonical_url, []).append(article)
+
+        if by_url:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(by_url))) as executor:
+                futures = {
+                    key: executor.submit(self._fetch, group[0].url, deadline)
+                    for key, group in by_url.items()
+                }
+                for key, future in futures.items():
+                    text = future.result()
+                    if text:
+                        for article in by_url[key]:
+                            article.body = text
+
+        enriched = sum(1 for a in selected if a.body)
+        logger.info(
+            f"正文补全: 选中 {len(selected)} 条, 补全 {enriched} 条 "
+            f"(缓存命中 {self.stats['cached']}, 下载 {self.stats['fetched']}, "
+            f"无正文 {self.stats['empty']}, 失败 {self.stats['failed']})"
+        )
+        return enriched
+
+    def _cached_text(self, key: str) -> Optional[str]:
+        """
+        缓存中的正文
+
+        Returns:
+            正文；抓取过但无正文时为空字符串；未缓存时为None
+        """
+        entry = self.index.get(key)
+        if entry is None or not self.cache_dir:
+            return None
+        if not entry[0]:
+            self.stats['cached'] += 1
+            return ''
+
+        try:
+            text = self._text_path(entry[0]).read_text(encoding='utf-8')
+        except OSError:
+            return None
+        self.stats['cached'] += 1
+        return text
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """主机的并发名额"""
+        host = url.split('/', 3)[2] if '://' in url else url
+        with self._lock:
+            return self._host_slots.setdefault(host, threading.BoundedSemaphore(self.per_host_concurrency))
+
+    def _fetch(self, url: str, deadline: Deadline) -> str:
+        """
+        抓取一页并提取正文（在线程池中执行），失败时返回空字符串
+
+        Args:
+            url: 文章链接
+            deadline: 补全阶段截止时间
+        """
+        with self._host_slot(url):
+            budget = min(self.page_timeout, deadline.remaining())
+            if budget <= 0:
+                return ''
+
+            try:
+                raw, charset = self._download(url, budget)
+            except Exception as e:
+                logger.debug(f"正文抓取失败 {url}: {e}")
+                with self._lock:
+                    self.stats['failed'] += 1
+                return ''
+
+        content_hash = hashlib.sha1(raw).hexdigest()
+        text = self._stored_text(content_hash)
+        if text is None:
+            text = extract_main_text(decode_html(raw, charset), max_chars=self.max_chars)
+            if text and self.cache_dir:
+                path = self._text_path(content_hash)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(text, encoding='utf-8')
+
+        with self._lock:
+            self.stats['fetched'] += 1
+            if not text:
+                self.stats['empty'] += 1
+            self.index[canonicalize_url(url)] = [content_hash if text else '', now_epoch()]
+
+        return text
+
+    def _stored_text(self, content_hash: str) -> Optional[str]:
+        """按内容哈希取已提取的正文"""
+        if not self.cache_dir:
+            return None
+        path = self._text_path(content_hash)
+        try:
+            return path.read_text(encoding='utf-8')
+        except OSError:
+            return None
+
+    def _download(self, url: str, budget: float) -> Tuple[bytes, Optional[str]]:
+        """
+        流式下载，读满字节上限或耗时上限即停止
+
+        Returns:
+            (网页字节, 响应头声明的编码)
+        """
+        start = time.monotonic()
+        response = self.session.get(url, headers=self.headers, timeout=budget, stream=True)
+        try:
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', '')
+            if content_type and 'html' not in content_type.lower():
+                raise ValueError(f"非网页内容: {content_type}")
+            charset = content_type.lower().split('charset=')[-1].strip() if 'charset=' in content_type.lower() else None
+
+            # 回放会话没有流式接口，直接截取
+            if not hasattr(response, 'iter_content'):
+                return response.content[:self.max_bytes], charset
+
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=16384):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= self.max_bytes or time.monotonic() - start >= budget:
+                    break
+            return b''.join(chunks)[:self.max_bytes], charset
+        finally:
+            close = getattr(response, 'close', None)
+            if close:
+                close()
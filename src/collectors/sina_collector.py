@@ -1,30 +1,32 @@
 """
 新浪搜索采集器
 """
-import re
-import time
-import random
-from datetime import datetime, timedelta
 from typing import List, Optional
 from urllib.parse import quote
 
-import requests
 from bs4 import BeautifulSoup
 
-from .base_collector import BaseCollector, Article
+from ..utils.http_replay import create_session
+from .base_collector import BaseCollector, Article, CollectionSkipped
 from ..utils.logger import logger
+from ..utils.time_normalize import parse_time
 
 
 class SinaCollector(BaseCollector):
     """新浪搜索采集器"""
     
-    def __init__(self, config: dict):
-        super().__init__(config)
+    # 所有关键词共用同一搜索端点，熔断粒度为整个端点
+    ENDPOINT = 'search.sina.com.cn'
+    
+    def __init__(self, config: dict, **kwargs):
+        super().__init__(config, **kwargs)
         self.base_url = config.get('base_url', 'https://search.sina.com.cn')
         self.max_results = config.get('max_results_per_keyword', 5)
         self.headers = {
             'User-Agent': config.get('user_agent', 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)')
         }
+        # 复用连接池，常驻进程中跨轮次保持keep-alive
+        self.session = create_session()
     
     def collect(self, keywords: List[str]) -> List[Article]:
         """
@@ -39,14 +41,18 @@ class SinaCollector(BaseCollector):
         articles = []
         
         for keyword in keywords:
+            if self.deadline_expired():
+                logger.warning(f"[新浪搜索] 采集截止时间已到，跳过剩余关键词")
+                break
+            
             try:
                 logger.info(f"[新浪搜索] 开始搜索: {keyword}")
                 keyword_articles = self._search_keyword(keyword)
                 articles.extend(keyword_articles)
                 
-                # 随机延迟
-                time.sleep(random.uniform(1, 3))
-                
+            except CollectionSkipped as e:
+                logger.warning(f"[新浪搜索] 跳过剩余关键词: {e}")
+                break
             except Exception as e:
                 logger.error(f"[新浪搜索] 搜索失败 {keyword}: {e}")
         
@@ -61,8 +67,7 @@ class SinaCollector(BaseCollector):
         search_url = f"{self.base_url}/?q={quote(keyword)}&range=all&c=news&sort=time"
         
         try:
-            response = requests.get(search_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
+            response = self._get(self.ENDPOINT, search_url, headers=self.headers)
             
             soup = BeautifulSoup(response.text, 'html.parser')
             
@@ -74,6 +79,8 @@ class SinaCollector(BaseCollector):
                 if article:
                     articles.append(article)
             
+        except CollectionSkipped:
+            raise
         except Exception as e:
             logger.error(f"[新浪搜索] 请求失败: {e}")
         
@@ -96,13 +103,13 @@ class SinaCollector(BaseCollector):
             
             # 提取时间
             time_elem = item.find('span', class_='fgray_time')
-            publish_time = self._parse_time(time_elem.get_text(strip=True) if time_elem else '')
+            publish_ts = self._parse_time(time_elem.get_text(strip=True) if time_elem else '')
             
             return Article(
                 title=title,
                 url=url,
                 source=source,
-                publish_time=publish_time,
+                publish_ts=publish_ts,
                 matched_keywords=[keyword]
             )
             
@@ -110,39 +117,13 @@ class SinaCollector(BaseCollector):
             logger.debug(f"[新浪搜索] 解析结果项失败: {e}")
             return None
     
-    def _parse_time(self, time_str: str) -> Optional[datetime]:
+    def _parse_time(self, time_str: str) -> Optional[int]:
         """
-        解析时间字符串
+        解析时间字符串为UTC epoch秒
         支持格式：
         - X小时前
         - X天前
         - 2024年11月15日
         - 2024-11-15
         """
-        now = datetime.now()
-        
-        # X小时前
-        hour_match = re.search(r'(\d+)\s*小时前', time_str)
-        if hour_match:
-            hours = int(hour_match.group(1))
-            return now - timedelta(hours=hours)
-        
-        # X天前
-        day_match = re.search(r'(\d+)\s*天前', time_str)
-        if day_match:
-            days = int(day_match.group(1))
-            return now - timedelta(days=days)
-        
-        # YYYY年MM月DD日
-        date_match = re.search(r'(\d{4})年(\d{1,2})月(\d{1,2})日', time_str)
-        if date_match:
-            year, month, day = map(int, date_match.groups())
-            return datetime(year, month, day)
-        
-        # YYYY-MM-DD
-        date_match2 = re.search(r'(\d{4})-(\d{1,2})-(\d{1,2})', time_str)
-        if date_match2:
-            year, month, day = map(int, date_match2.groups())
-            return datetime(year, month, day)
-        
-        return None
+        return parse_time(time_str)
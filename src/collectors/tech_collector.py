@@ -1,27 +1,27 @@
 """
 科技媒体采集器 (IT之家/36氪)
 """
-import time
-import random
-from datetime import datetime
 from typing import List, Optional
 
-import requests
 from bs4 import BeautifulSoup
 
-from .base_collector import BaseCollector, Article
+from ..utils.http_replay import create_session
+from .base_collector import BaseCollector, Article, CollectionSkipped
 from ..utils.logger import logger
+from ..utils.time_normalize import epoch_from_timestamp, now_epoch, parse_time
 
 
 class TechCollector(BaseCollector):
     """科技媒体采集器"""
     
-    def __init__(self, config: dict):
-        super().__init__(config)
+    def __init__(self, config: dict, **kwargs):
+        super().__init__(config, **kwargs)
         self.media_configs = [m for m in config if m.get('enabled', True)]
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         }
+        # 复用连接池，常驻进程中跨轮次保持keep-alive
+        self.session = create_session()
     
     def collect(self, keywords: List[str]) -> List[Article]:
         """
@@ -38,6 +38,10 @@ class TechCollector(BaseCollector):
         for media in self.media_configs:
             media_name = media['name']
             
+            if self.deadline_expired():
+                logger.warning(f"[科技媒体] 采集截止时间已到，跳过剩余媒体")
+                break
+            
             try:
                 logger.info(f"[科技媒体] 开始采集: {media_name}")
                 
@@ -50,8 +54,9 @@ class TechCollector(BaseCollector):
                     continue
                 
                 articles.extend(media_articles)
-                time.sleep(random.uniform(1, 2))
                 
+            except CollectionSkipped as e:
+                logger.warning(f"[科技媒体] 跳过 {media_name}: {e}")
             except Exception as e:
                 logger.error(f"[科技媒体] 采集失败 {media_name}: {e}")
         
@@ -66,8 +71,7 @@ class TechCollector(BaseCollector):
             # IT之家RSS订阅
             rss_url = config.get('rss_feed', 'https://www.ithome.com/rss/')
             
-            response = requests.get(rss_url, headers=self.headers, timeout=10)
-            response.raise_for_status()
+            response = self._get('IT之家', rss_url, headers=self.headers)
             
             soup = BeautifulSoup(response.content, 'xml')
             items = soup.find_all('item')
@@ -78,19 +82,19 @@ class TechCollector(BaseCollector):
                     url = item.find('link').get_text(strip=True)
                     pub_date_str = item.find('pubDate').get_text(strip=True)
                     
-                    # 解析时间：Mon, 15 Nov 2024 10:30:00 GMT
-                    pub_date = datetime.strptime(pub_date_str, '%a, %d %b %Y %H:%M:%S %Z')
-                    
+                    # 解析时间：Mon, 15 Nov 2024 10:30:00 GMT / +0800
                     articles.append(Article(
                         title=title,
                         url=url,
                         source='IT之家',
-                        publish_time=pub_date
+                        publish_ts=parse_time(pub_date_str)
                     ))
                     
                 except Exception as e:
                     logger.debug(f"[IT之家] 解析RSS项失败: {e}")
             
+        except CollectionSkipped:
+            raise
         except Exception as e:
             logger.error(f"[IT之家] RSS采集失败: {e}")
         
@@ -104,13 +108,12 @@ class TechCollector(BaseCollector):
             # 36氪快讯API
             api_url = config.get('api_endpoint', 'https://36kr.com/api/newsflash')
             
-            response = requests.get(
+            response = self._get(
+                '36氪',
                 api_url,
                 headers=self.headers,
-                params={'per_page': 20},
-                timeout=10
+                params={'per_page': 20}
             )
-            response.raise_for_status()
             
             data = response.json()
             items = data.get('data', {}).get('items', [])
@@ -121,20 +124,21 @@ class TechCollector(BaseCollector):
                     item_id = item.get('id', '')
                     url = f"https://36kr.com/newsflashes/{item_id}"
                     
-                    # 时间戳转datetime
-                    published_at = item.get('published_at', 0)
-                    pub_date = datetime.fromtimestamp(published_at) if published_at else datetime.now()
+                    # 时间戳（秒或毫秒）
+                    published_at = epoch_from_timestamp(item.get('published_at'))
                     
                     articles.append(Article(
                         title=title,
                         url=url,
                         source='36氪',
-                        publish_time=pub_date
+                        publish_ts=published_at or now_epoch()
                     ))
                     
                 except Exception as e:
                     logger.debug(f"[36氪] 解析API项失败: {e}")
             
+        except CollectionSkipped:
+            raise
         except Exception as e:
             logger.error(f"[36氪] API采集失败: {e}")
         
@@ -2,15 +2,12 @@
 TrendRadar平台采集器
 基于开源项目 https://github.com/sansan0/TrendRadar
 """
-import time
-import random
-from datetime import datetime
 from typing import List, Optional
 
-import requests
-
-from .base_collector import BaseCollector, Article
+from ..utils.http_replay import create_session
+from .base_collector import BaseCollector, Article, CollectionSkipped
 from ..utils.logger import logger
+from ..utils.time_normalize import now_epoch
 
 
 class TrendRadarCollector(BaseCollector):
@@ -34,9 +31,11 @@ class TrendRadarCollector(BaseCollector):
         'sspai': '少数派'
     }
     
-    def __init__(self, config: dict):
-        super().__init__(config)
+    def __init__(self, config: dict, **kwargs):
+        super().__init__(config, **kwargs)
         self.platforms = [p for p in config if p.get('enabled', True)]
+        # 所有平台共用同一主机，复用连接池
+        self.session = create_session()
     
     def collect(self, keywords: List[str]) -> List[Article]:
         """
@@ -54,14 +53,17 @@ class TrendRadarCollector(BaseCollector):
             platform_id = platform_config['id']
             platform_name = platform_config.get('name', self.PLATFORMS.get(platform_id, platform_id))
             
+            if self.deadline_expired():
+                logger.warning(f"[TrendRadar] 采集截止时间已到，跳过剩余平台")
+                break
+            
             try:
                 logger.info(f"[TrendRadar] 开始采集: {platform_name}")
                 platform_articles = self._fetch_platform(platform_id, platform_name)
                 articles.extend(platform_articles)
                 
-                # 随机延迟
-                time.sleep(random.uniform(0.5, 1.5))
-                
+            except CollectionSkipped as e:
+                logger.warning(f"[TrendRadar] 跳过 {platform_name}: {e}")
             except Exception as e:
                 logger.error(f"[TrendRadar] 采集失败 {platform_name}: {e}")
         
@@ -75,8 +77,7 @@ class TrendRadarCollector(BaseCollector):
         try:
             # 构造API请求
             url = f"{self.API_BASE}?type={platform_id}"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
+            response = self._get(f"trendradar:{platform_id}", url)
             
             data = response.json()
             
@@ -93,6 +94,8 @@ class TrendRadarCollector(BaseCollector):
                 if article:
                     articles.append(article)
             
+        except CollectionSkipped:
+            raise
         except Exception as e:
             logger.error(f"[TrendRadar] 请求失败 {platform_name}: {e}")
         
@@ -114,7 +117,7 @@ class TrendRadarCollector(BaseCollector):
                 title=title,
                 url=url,
                 source=platform_name,
-                publish_time=datetime.now(),  # TrendRadar热点通常是最新的
+                publish_ts=now_epoch(),  # TrendRadar热点通常是最新的
                 content=hot if hot else None  # 热度值存入content字段
             )
             
@@ -0,0 +1,179 @@
+"""
+常驻进程模式 - 进程内调度采集与日报，热状态常驻内存
+"""
+import signal
+from typing import Dict, List
+
+from src.collectors.base_collector import Article
+from src.utils import logger, DedupCache
+from src.utils.endpoint_health import EndpointHealth, Deadline
+from src.utils.rate_controller import PolitenessController
+from src.utils.scheduler import Scheduler
+from src.utils.time_normalize import now_epoch
+from src.utils.trend_sketch import TrendSketches
+
+
+class MonitorDaemon:
+    """舆情监测常驻进程"""
+
+    def __init__(self, configs: dict, cache: DedupCache, car_keywords: List[str]):
+        """
+        初始化常驻进程，一次性构建所有采集器、过滤器、分析器与推送器
+
+        Args:
+            configs: 配置字典
+            cache: 去重缓存
+            car_keywords: 监测车型关键词
+        """
+        from src.collectors.trendradar_collector import TrendRadarCollector
+        from src.collectors.sina_collector import SinaCollector
+        from src.collectors.tech_collector import TechCollector
+        from src.filters.article_filter import ArticleFilter
+        from src.filters.article_scorer import ArticleScorer
+        from src.filters.story_cluster import StoryClusterer
+        from src.analyzer.sentiment_analyzer import SentimentAnalyzer
+        from src.analyzer.budget_governor import BudgetGovernor
+        from src.collectors.content_enricher import ContentEnricher
+        from src.reporter.alert_pusher import AlertPusher
+        from src.reporter.dingtalk_pusher import DingTalkPusher
+        from src.analyzer.hot_words import HotWordExtractor
+
+        self.configs = configs
+        self.cache = cache
+        self.car_keywords = car_keywords
+        self.daemon_config = configs['sources'].get('daemon_config', {})
+
+        sources = configs['sources']
+        self.collection_config = sources.get('collection_config', {})
+        self.health = EndpointHealth.from_config(self.collection_config)
+        self.politeness = PolitenessController.from_config(self.collection_config)
+        options = {
+            'health': self.health,
+            'default_timeout': self.collection_config.get('request_timeout', 10),
+            'politeness': self.politeness
+        }
+        self.collectors = {
+            'trendradar': TrendRadarCollector(sources['trendradar_platforms'], **options),
+            'sina_search': SinaCollector(sources['sina_search'], **options),
+            'tech_media': TechCollector(sources['tech_media'], **options),
+        }
+
+        self.trends = TrendSketches.from_config(sources, configs['models'])
+        self.article_filter = ArticleFilter(
+            sources['filter_config'], configs['models'], stats_path="data/filter_stats.json",
+            trends=self.trends
+        )
+        self.article_scorer = ArticleScorer(sources, configs['keywords'])
+        self.clusterer = StoryClusterer.from_config(sources)
+        analysis_config = sources.get('analysis_config', {})
+        self.budget = BudgetGovernor.from_config(analysis_config, configs['models'])
+        self.analyzer = SentimentAnalyzer(config=analysis_config, budget=self.budget)
+        # 正文补全（可选），缓存跨轮次复用
+        enrichment_config = sources.get('enrichment_config', {})
+        self.enricher = (
+            ContentEnricher.from_config(enrichment_config)
+            if enrichment_config.get('enabled', False) and self.analyzer.use_ai else None
+        )
+        self.alert_pusher = AlertPusher(
+            cache,
+            debounce_hours=sources.get('alert_config', {}).get('debounce_hours', 6),
+            similarity_threshold=sources['filter_config'].get('similarity_threshold', 0.8)
+        )
+        self.pusher = DingTalkPusher(
+            hot_words=HotWordExtractor.from_config(sources, configs['models']),
+            trends=self.trends
+        )
+
+        # 本期报告的候选语料（已过滤），按标题去重
+        self.corpus: Dict[str, Article] = {}
+        self.time_window_seconds = int(3600 * sources['filter_config'].get(
+            'time_window_hours',
+            sources.get('collection_config', {}).get('time_window_hours', 48)
+        ))
+
+        self.scheduler = Scheduler()
+
+    def collect(self, source_name: str):
+        """采集单个数据源并增量过滤并入语料"""
+        collector = self.collectors[source_name]
+        collector.deadline = Deadline(self.collection_config.get('stage_deadline_seconds'))
+        articles = collector.collect(self.car_keywords)
+        self.health.save()
+        self.politeness.save()
+        new_articles = self.article_filter.filter(articles)
+        self.trends.save()
+
+        for article in new_articles:
+            self.corpus[article.title] = article
+
+        logger.info(f"[常驻] {source_name} 新增 {len(new_articles)} 条, 语料共 {len(self.corpus)} 条")
+
+        # 采集后立即分析本品新文章，负面即时预警；结果进入分析缓存供日报复用
+        if self.daemon_config.get('alert_on_collect', True):
+            own_articles = [
+                a for a in self.article_filter.get_own_brand_articles(new_articles)
+                if not self.cache.exists(a.title)
+            ]
+            if own_articles:
+                # 每次采集后的分析单独计算截止时间，不受常驻运行时长影响
+                self.analyzer.start_run()
+                analyzed = self.analyzer.analyze_batch(own_articles, on_result=self.alert_pusher.handle)
+                # 已分析过的文章写入去重缓存，后续采集不再当作新文章重复分析；
+                # 日报仍使用内存语料，代表文章的分析结果从分析缓存复用
+                for article in analyzed:
+                    self.cache.add(article['title'], article['url'])
+
+    def report(self):
+        """用内存中已有语料生成并推送日报"""
+        cutoff = now_epoch() - self.time_window_seconds
+        articles = [
+            a for a in self.corpus.values()
+            if a.publish_ts is None or a.publish_ts >= cutoff
+        ]
+        logger.info(f"[常驻] 生成日报: 语料 {len(articles)} 条")
+
+        clusters = self.article_scorer.select_clusters(self.clusterer.cluster(articles))
+        if self.enricher:
+            self.enricher.enrich([c.representative for c in clusters], priority=self.budget.priority)
+            self.enricher.save()
+        self.analyzer.start_run()
+        analyzed = self.analyzer.analyze_clusters(clusters, on_result=self.alert_pusher.handle)
+
+        for article in analyzed:
+            self.cache.add(article['title'], article['url'])
+
+        if analyzed:
+            if self.pusher.push_daily_report(analyzed):
+                logger.info("✅ 日报推送成功")
+            else:
+                logger.error("❌ 日报推送失败")
+        else:
+            logger.warning("没有可推送的数据")
+
+        # 开始新一期
+        self.corpus.clear()
+        self.article_filter.reset()
+        self.cache.clean_expired()
+        self.cache.export_segments()
+        self.alert_pusher.recent_alerts = self.cache.get_recent_alerts(self.alert_pusher.debounce_hours)
+
+    def run(self):
+        """注册任务并进入调度循环"""
+        intervals = self.daemon_config.get('collect_intervals_minutes', {})
+
+        for source_name in self.collectors:
+            minutes = intervals.get(source_name)
+            if not minutes:
+                logger.info(f"[常驻] 未配置 {source_name} 采集间隔，跳过")
+                continue
+            self.scheduler.every(minutes, lambda name=source_name: self.collect(name), f"采集-{source_name}")
+
+        self.scheduler.daily(self.daemon_config.get('report_time', '09:00'), self.report, "日报推送")
+
+        # SIGTERM/SIGINT 时在当前任务完成后退出
+        signal.signal(signal.SIGTERM, lambda *_: self.scheduler.stop())
+        signal.signal(signal.SIGINT, lambda *_: self.scheduler.stop())
+
+        logger.info("[常驻] 调度循环已启动")
+        self.scheduler.run_forever()
+        logger.info("[常驻] 已退出")
@@ -1,4 +1,6 @@
 """文章过滤器模块"""
 from .article_filter import ArticleFilter
+from .article_scorer import ArticleScorer
+from .story_cluster import StoryCluster, StoryClusterer
 
-__all__ = ['ArticleFilter']
+__all__ = ['ArticleFilter', 'ArticleScorer', 'StoryCluster', 'StoryClusterer']
@@ -1,28 +1,40 @@
 """
-文章过滤器 - 6层过滤逻辑
+文章过滤器 - 7层过滤逻辑，按实测代价与通过率自适应排序
 """
-import re
-from datetime import datetime, timedelta
-from typing import List, Dict, Set
+import json
+import os
+import time
+from pathlib import Path
+from typing import List, Dict, Optional, Set
 from difflib import SequenceMatcher
 
 from ..collectors.base_collector import Article
 from ..utils.logger import logger
+from ..utils.profiler import profiler
+from ..utils.text_normalize import normalize_text
+from ..utils.time_normalize import now_epoch
 
 
 class ArticleFilter:
     """文章过滤器"""
     
-    def __init__(self, config: dict, models_config: dict):
+    # 统计值的平滑系数（指数加权平均）
+    STATS_ALPHA = 0.3
+    
+    def __init__(self, config: dict, models_config: dict, stats_path: Optional[str] = None,
+                 trends=None):
         """
         初始化过滤器
         
         Args:
             config: 过滤配置
             models_config: 车型配置
+            stats_path: 各层代价/通过率统计文件路径，None 表示不持久化
+            trends: 声量趋势草图（TrendSketches），通过过滤的文章计入其中
         """
         self.config = config
         self.models_config = models_config
+        self.trends = trends
         
         # 提取配置参数
         self.time_window_hours = config.get('time_window_hours', 48)
@@ -33,24 +45,63 @@ class ArticleFilter:
         # 车型关键词映射
         self.car_keywords = self._build_car_keywords()
         
+        # 以下词表均为规范形式，与 Article.normalized_title 比较
         # 黑名单
-        self.global_blacklist = set(models_config.get('global_blacklist', []))
+        self.global_blacklist = self._normalize_words(models_config.get('global_blacklist', []))
         self.special_blacklist = self._build_special_blacklist()
         
         # 汽车领域白名单
-        self.automotive_keywords = set(models_config.get('automotive_keywords', []))
+        self.automotive_keywords = self._normalize_words(models_config.get('automotive_keywords', []))
         
-        # 已处理标题集合（去重）
+        # 已处理标题集合（去重，规范形式）
         self.processed_titles: Set[str] = set()
+        # 已处理的精确键：规范化链接与规范化标题
+        self.seen_keys: Set[str] = set()
+        
+        # 过滤层: (统计键, 层名, 过滤函数, 依赖的层)
+        # 除去重外各层都是逐条判断、互不影响，可任意调整顺序；
+        # 黑名单的车型专属词依赖关键词层写入的 category；去重依赖输入顺序，固定最后执行：
+        # 先按规范化链接/标题做哈希精确去重，剩下的才做两两相似度比较
+        self.layers = [
+            ('keyword', '关键词匹配', self._filter_by_keywords, ()),
+            ('length', '标题长度', self._filter_by_length, ()),
+            ('time', '时间窗口', self._filter_by_time, ()),
+            ('blacklist', '黑名单', self._filter_by_blacklist, ('keyword',)),
+            ('automotive', '汽车关键词', self._filter_by_automotive_keywords, ()),
+        ]
+        self.final_layers = [
+            ('exact', '精确去重', self._filter_by_exact_key, ()),
+            ('dedup', '相似去重', self._filter_by_dedup, ()),
+        ]
+        
+        # 自适应排序：按历史每条耗时与通过率安排执行顺序
+        self.adaptive_order = config.get('adaptive_order', True)
+        self.stats_path = Path(stats_path) if stats_path else None
+        self.layer_stats: Dict[str, dict] = self._load_stats()
+        self.last_plan: List[str] = []
+    
+    def reset(self):
+        """清空去重状态，开始新一期报告"""
+        self.processed_titles.clear()
+        self.seen_keys.clear()
+    
+    @staticmethod
+    def _normalize_words(words: List[str]) -> Set[str]:
+        """词表转为规范形式，丢弃规范化后为空的词"""
+        return {normalize_text(w) for w in words} - {''}
     
-    def _build_car_keywords(self) -> Dict[str, List[str]]:
-        """构建车型关键词映射"""
+    def _build_car_keywords(self) -> Dict[str, List[tuple]]:
+        """构建车型关键词映射：车型 → [(原始关键词, 规范形式)]"""
         keywords_map = {}
         
         for car in self.models_config.get('car_models', []):
             car_name = car['name']
             keywords = car.get('keywords', []) + car.get('aliases', [])
-            keywords_map[car_name] = list(set(keywords))  # 去重
+            keywords_map[car_name] = [
+                (keyword, normalize_text(keyword))
+                for keyword in set(keywords)  # 去重
+                if normalize_text(keyword)
+            ]
         
         return keywords_map
     
@@ -62,13 +113,15 @@ class ArticleFilter:
             car_name = car['name']
             special = car.get('special_blacklist', [])
             if special:
-                blacklist_map[car_name] = set(special)
+                blacklist_map[car_name] = self._normalize_words(special)
         
         return blacklist_map
     
     def filter(self, articles: List[Article]) -> List[Article]:
         """
-        执行6层过滤
+        执行7层过滤
+        
+        开启自适应排序时，前5层按历史统计重新排序（结果与固定顺序一致），第6、7层去重始终最后执行
         
         Args:
             articles: 原始文章列表
@@ -79,67 +132,139 @@ class ArticleFilter:
         logger.info(f"开始过滤: 原始数量 {len(articles)}")
         
         # 统计信息
-        stats = {
-            'original': len(articles),
-            'after_keyword': 0,
-            'after_length': 0,
-            'after_time': 0,
-            'after_blacklist': 0,
-            'after_automotive': 0,
-            'after_dedup': 0
-        }
-        
-        # 第1层：车型关键词匹配
-        articles = self._filter_by_keywords(articles)
-        stats['after_keyword'] = len(articles)
-        logger.info(f"第1层(关键词匹配): 剩余 {len(articles)} 条")
-        
-        # 第2层：标题长度验证
-        articles = self._filter_by_length(articles)
-        stats['after_length'] = len(articles)
-        logger.info(f"第2层(标题长度): 剩余 {len(articles)} 条")
-        
-        # 第3层：时间窗口过滤
-        articles = self._filter_by_time(articles)
-        stats['after_time'] = len(articles)
-        logger.info(f"第3层(时间窗口): 剩余 {len(articles)} 条")
-        
-        # 第4层：黑名单过滤
-        articles = self._filter_by_blacklist(articles)
-        stats['after_blacklist'] = len(articles)
-        logger.info(f"第4层(黑名单): 剩余 {len(articles)} 条")
-        
-        # 第5层：汽车领域关键词验证
-        articles = self._filter_by_automotive_keywords(articles)
-        stats['after_automotive'] = len(articles)
-        logger.info(f"第5层(汽车关键词): 剩余 {len(articles)} 条")
-        
-        # 第6层：去重
-        articles = self._filter_by_dedup(articles)
-        stats['after_dedup'] = len(articles)
-        logger.info(f"第6层(去重): 剩余 {len(articles)} 条")
+        stats = {'original': len(articles)}
+        
+        layers = self.plan() + self.final_layers
+        self.last_plan = [key for key, _, _, _ in layers]
+        logger.info(f"过滤计划: {self.describe_plan(layers)}")
+        
+        for index, (key, label, layer, _) in enumerate(layers, 1):
+            count_in = len(articles)
+            start = time.perf_counter()
+            with profiler.stage(f"filter.{key}"):
+                articles = layer(articles)
+            self._record(key, count_in, len(articles), time.perf_counter() - start)
+            
+            stats[f'after_{key}'] = len(articles)
+            logger.info(f"第{index}层({label}): 剩余 {len(articles)} 条")
+        
+        self.save_stats()
+        
+        if self.trends is not None:
+            with profiler.stage('filter.trends'):
+                self.trends.add(articles)
         
         logger.info(f"过滤完成: {stats}")
         
         return articles
     
+    def _load_stats(self) -> Dict[str, dict]:
+        """加载持久化的各层统计"""
+        if not self.stats_path or not self.stats_path.exists():
+            return {}
+        
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"过滤层统计加载失败，使用默认顺序: {e}")
+            return {}
+    
+    def save_stats(self):
+        """持久化各层统计"""
+        if not self.stats_path:
+            return
+        
+        self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.stats_path.with_suffix('.tmp')
+        
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.layer_stats, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.stats_path)
+    
+    def _record(self, key: str, count_in: int, count_out: int, seconds: float):
+        """记录一层的每条耗时与通过率（指数加权平均）"""
+        if count_in == 0:
+            return
+        
+        cost = seconds / count_in
+        pass_rate = count_out / count_in
+        
+        state = self.layer_stats.get(key)
+        if state is None:
+            self.layer_stats[key] = {'cost': cost, 'pass_rate': pass_rate, 'samples': count_in}
+            return
+        
+        alpha = self.STATS_ALPHA
+        state['cost'] = (1 - alpha) * state['cost'] + alpha * cost
+        state['pass_rate'] = (1 - alpha) * state['pass_rate'] + alpha * pass_rate
+        state['samples'] += count_in
+    
+    def _rank(self, key: str) -> float:
+        """
+        排序指标：每淘汰一条文章的期望代价 = 每条耗时 / (1 - 通过率)
+        
+        越小越应该先执行，即便宜且淘汰率高的层优先
+        """
+        state = self.layer_stats[key]
+        return state['cost'] / max(1.0 - state['pass_rate'], 1e-6)
+    
+    def plan(self) -> List[tuple]:
+        """
+        生成除去重外各层的执行顺序
+        
+        每一步在依赖已满足的层中选排序指标最小者；
+        有层尚无统计时沿用默认顺序
+        
+        Returns:
+            过滤层列表
+        """
+        if not self.adaptive_order or any(key not in self.layer_stats for key, _, _, _ in self.layers):
+            return list(self.layers)
+        
+        pending = list(self.layers)
+        ordered = []
+        done: Set[str] = set()
+        
+        while pending:
+            ready = [layer for layer in pending if set(layer[3]) <= done]
+            best = min(ready, key=lambda layer: self._rank(layer[0]))
+            ordered.append(best)
+            pending.remove(best)
+            done.add(best[0])
+        
+        return ordered
+    
+    def describe_plan(self, layers: List[tuple]) -> str:
+        """描述执行计划：层名(每条耗时, 通过率)"""
+        parts = []
+        for key, label, _, _ in layers:
+            state = self.layer_stats.get(key)
+            if state:
+                parts.append(f"{label}({state['cost'] * 1e6:.1f}μs/条, 通过{state['pass_rate']:.0%})")
+            else:
+                parts.append(label)
+        return ' → '.join(parts)
+    
     def _filter_by_keywords(self, articles: List[Article]) -> List[Article]:
         """第1层：车型关键词匹配"""
         filtered = []
         
         for article in articles:
             matched_cars = []
+            title = article.normalized_title
             
             # 检查标题是否包含任何车型关键词
             for car_name, keywords in self.car_keywords.items():
-                for keyword in keywords:
-                    if keyword.lower() in article.title.lower():
+                for keyword, normalized in keywords:
+                    if normalized in title:
                         matched_cars.append(car_name)
                         article.matched_keywords.append(keyword)
                         break
             
             if matched_cars:
-                article.category = ','.join(set(matched_cars))
+                # 按车型配置顺序拼接（matched_cars 不会重复），多次运行结果一致
+                article.category = ','.join(matched_cars)
                 filtered.append(article)
         
         return filtered
@@ -152,26 +277,21 @@ class ArticleFilter:
         ]
     
     def _filter_by_time(self, articles: List[Article]) -> List[Article]:
-        """第3层：48小时时间窗口"""
-        cutoff_time = datetime.now() - timedelta(hours=self.time_window_hours)
+        """第3层：48小时时间窗口（UTC epoch整数比较，与运行环境时区无关）"""
+        cutoff = now_epoch() - int(self.time_window_hours * 3600)
         
-        filtered = []
-        for article in articles:
-            if article.publish_time is None:
-                # 无法解析时间的，保守处理：保留
-                filtered.append(article)
-            elif article.publish_time >= cutoff_time:
-                filtered.append(article)
-        
-        return filtered
+        # 无法解析时间的，保守处理：保留
+        return [a for a in articles if a.publish_ts is None or a.publish_ts >= cutoff]
     
     def _filter_by_blacklist(self, articles: List[Article]) -> List[Article]:
         """第4层：黑名单过滤"""
         filtered = []
         
         for article in articles:
+            title = article.normalized_title
+            
             # 通用黑名单
-            if any(word in article.title for word in self.global_blacklist):
+            if any(word in title for word in self.global_blacklist):
                 continue
             
             # 车型专属黑名单
@@ -179,7 +299,7 @@ class ArticleFilter:
             if article.category:
                 for car_name in article.category.split(','):
                     special_blacklist = self.special_blacklist.get(car_name, set())
-                    if any(word in article.title for word in special_blacklist):
+                    if any(word in title for word in special_blacklist):
                         skip = True
                         break
             
@@ -194,30 +314,49 @@ class ArticleFilter:
         
         for article in articles:
             # 标题必须包含至少一个汽车相关关键词
-            if any(keyword in article.title for keyword in self.automotive_keywords):
+            if any(keyword in article.normalized_title for keyword in self.automotive_keywords):
                 filtered.append(article)
         
         return filtered
     
+    def _filter_by_exact_key(self, articles: List[Article]) -> List[Article]:
+        """第6层：去重（精确键）——规范化链接或规范化标题已出现过即为重复"""
+        filtered = []
+        
+        for article in articles:
+            keys = {f"title:{article.normalized_title}"}
+            if article.canonical_url:
+                keys.add(f"url:{article.canonical_url}")
+            
+            if keys & self.seen_keys:
+                continue
+            
+            self.seen_keys |= keys
+            filtered.append(article)
+        
+        return filtered
+    
     def _filter_by_dedup(self, articles: List[Article]) -> List[Article]:
-        """第6层：去重"""
+        """第7层：去重（标题相似度）"""
         filtered = []
         
         for article in articles:
+            title = article.normalized_title
+            
             # 检查是否已处理过
-            if article.title in self.processed_titles:
+            if title in self.processed_titles:
                 continue
             
             # 检查相似度
             is_duplicate = False
             for existing_title in self.processed_titles:
-                similarity = SequenceMatcher(None, article.title, existing_title).ratio()
+                similarity = SequenceMatcher(None, title, existing_title).ratio()
                 if similarity >= self.similarity_threshold:
                     is_duplicate = True
                     break
             
             if not is_duplicate:
-                self.processed_titles.add(article.title)
+                self.processed_titles.add(title)
                 filtered.append(article)
         
         return filtered
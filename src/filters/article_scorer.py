@@ -0,0 +1,216 @@
+"""
+文章评分器 - 来源权重/分类权重/热度/时效综合打分，按车型保留TOP K
+"""
+import heapq
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+from ..collectors.base_collector import Article
+from ..utils.logger import logger
+from ..utils.text_normalize import normalize_text
+from ..utils.time_normalize import now_epoch
+
+
+class ArticleScorer:
+    """文章评分器"""
+
+    # 热度值解析：支持 "123456"、"123.4万"、"1.2亿"
+    HOT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(万|亿|w|W)?')
+    HOT_UNITS = {'万': 1e4, 'w': 1e4, 'W': 1e4, '亿': 1e8}
+
+    def __init__(self, sources_config: dict, keywords_config: dict):
+        """
+        初始化评分器
+
+        Args:
+            sources_config: 数据源配置（sources.yaml）
+            keywords_config: 分类关键词配置（keywords.yaml）
+        """
+        filter_config = sources_config.get('filter_config', {})
+
+        # 乘积得分没有固定下限，阈值默认不启用，数量由每车型/每报告TOP K控制
+        self.min_score = filter_config.get('min_score_threshold', 0.0)
+        self.max_per_model = filter_config.get('max_results_per_model', 10)
+        self.max_total = filter_config.get('max_results_per_report', 30)
+
+        # 时效衰减半衰期，默认取时间窗口的一半
+        time_window_hours = filter_config.get(
+            'time_window_hours',
+            sources_config.get('collection_config', {}).get('time_window_hours', 48)
+        )
+        self.freshness_half_life = filter_config.get('freshness_half_life_hours', time_window_hours / 2)
+
+        self.platform_weights = self._build_platform_weights(sources_config)
+        self.rule_weights = self._build_rule_weights(sources_config.get('source_weight_rules', {}))
+        self.category_weights = self._build_category_weights(keywords_config.get('content_categories', {}))
+
+    def _build_platform_weights(self, sources_config: dict) -> Dict[str, float]:
+        """构建平台名称到权重的映射"""
+        weights = {}
+
+        for platform in sources_config.get('trendradar_platforms', []):
+            weights[platform.get('name', platform['id'])] = platform.get('weight', 1.0)
+
+        for media in sources_config.get('tech_media', []):
+            weights[media['name']] = media.get('weight', 1.0)
+
+        sina = sources_config.get('sina_search', {})
+        if sina:
+            weights['新浪新闻'] = sina.get('weight', 1.0)
+
+        return weights
+
+    def _build_rule_weights(self, rules: dict) -> List[Tuple[str, float]]:
+        """构建来源规则（示例名称子串 → 权重）"""
+        rule_weights = []
+
+        for rule in rules.values():
+            weight = rule.get('weight', 1.0)
+            for example in rule.get('examples', []):
+                rule_weights.append((example, weight))
+
+        return rule_weights
+
+    def _build_category_weights(self, categories: dict) -> List[Tuple[str, float]]:
+        """构建分类关键词(规范形式) → 权重映射，按权重降序以便取最高命中"""
+        category_weights = []
+
+        for category in categories.values():
+            weight = category.get('weight', 1.0)
+            for keyword in category.get('keywords', []):
+                if normalize_text(keyword):
+                    category_weights.append((normalize_text(keyword), weight))
+
+        category_weights.sort(key=lambda x: -x[1])
+        return category_weights
+
+    def source_weight(self, article: Article) -> float:
+        """来源权重：平台配置优先，其次来源规则，默认1.0"""
+        if article.source in self.platform_weights:
+            return self.platform_weights[article.source]
+
+        for example, weight in self.rule_weights:
+            if example in article.source:
+                return weight
+
+        return 1.0
+
+    def category_weight(self, article: Article) -> float:
+        """分类权重：取标题命中分类中的最高权重"""
+        title = article.normalized_title
+        for keyword, weight in self.category_weights:
+            if keyword in title:
+                return weight
+
+        return 1.0
+
+    def hot_factor(self, article: Article) -> float:
+        """热度系数：TrendRadar热度值存于content字段，取对数压缩"""
+        hot = self.parse_hot_value(article.content)
+        return 1.0 + math.log10(1.0 + hot) / 8.0
+
+    def freshness_factor(self, article: Article, now: Optional[int] = None) -> float:
+        """时效系数：按半衰期指数衰减，取值 [0.5, 1.0]；时间未知按中位处理"""
+        if article.publish_ts is None or self.freshness_half_life <= 0:
+            return 0.75
+
+        now = now or now_epoch()
+        age_hours = max((now - article.publish_ts) / 3600, 0.0)
+        return 0.5 + 0.5 * math.pow(0.5, age_hours / self.freshness_half_life)
+
+    def parse_hot_value(self, value) -> float:
+        """
+        解析热度值
+
+        Args:
+            value: 热度值（数字或带单位字符串）
+
+        Returns:
+            数值热度，无法解析时为0
+        """
+        if value is None:
+            return 0.0
+        if isinstance(value, (int, float)):
+            return float(value)
+
+        match = self.HOT_PATTERN.search(str(value).replace(',', ''))
+        if not match:
+            return 0.0
+
+        number, unit = match.groups()
+        return float(number) * self.HOT_UNITS.get(unit, 1.0)
+
+    def score(self, article: Article, now: Optional[int] = None) -> float:
+        """计算单篇文章相关度得分"""
+        return (
+            self.source_weight(article)
+            * self.category_weight(article)
+            * self.hot_factor(article)
+            * self.freshness_factor(article, now)
+        )
+
+    def select(self, articles: List[Article]) -> List[Article]:
+        """
+        打分并按车型保留TOP K
+
+        Args:
+            articles: 过滤后的文章列表
+
+        Returns:
+            按得分降序排列的入选文章
+        """
+        now = now_epoch()
+
+        # 每个车型维护一个容量为K的小顶堆
+        heaps: Dict[str, List[Tuple[float, int, Article]]] = {}
+        below_threshold = 0
+
+        for seq, article in enumerate(articles):
+            article.score = self.score(article, now)
+            if article.score < self.min_score:
+                below_threshold += 1
+                continue
+
+            for car_name in (article.category or '').split(','):
+                heap = heaps.setdefault(car_name, [])
+                entry = (article.score, seq, article)
+                if len(heap) < self.max_per_model:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+
+        # 合并各车型入选文章（同一文章可能命中多个车型）
+        selected = {}
+        for heap in heaps.values():
+            for entry in heap:
+                selected[entry[1]] = entry
+
+        top = heapq.nlargest(self.max_total, selected.values())
+
+        logger.info(
+            f"评分筛选: 输入 {len(articles)} 条, 低于阈值 {below_threshold} 条, "
+            f"入选 {len(top)} 条 (每车型≤{self.max_per_model}, 总计≤{self.max_total})"
+        )
+
+        return [entry[2] for entry in top]
+
+    def select_clusters(self, clusters: list) -> list:
+        """
+        按事件簇打分筛选：簇内成员全部打分以确定代表文章，再对代表文章取TOP K
+
+        Args:
+            clusters: StoryCluster 列表
+
+        Returns:
+            入选的事件簇，按代表文章得分降序
+        """
+        now = now_epoch()
+        for cluster in clusters:
+            for article in cluster.members:
+                article.score = self.score(article, now)
+
+        by_representative = {id(c.representative): c for c in clusters}
+        selected = self.select(list(c.representative for c in clusters))
+
+        return [by_representative[id(a)] for a in selected]
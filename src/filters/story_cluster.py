@@ -0,0 +1,213 @@
+"""
+事件聚类 - 字符n-gram TF-IDF + 增量聚类，将同一事件的多源报道归为一簇
+
+同一事件的不同报道措辞差异大（"召回2万辆 涉及刹车隐患" / "宣布召回，刹车存隐患"），
+而车型名在同车型标题间人人都有、没有区分度，所以向量化前先去掉标题中的车型名与匹配到的关键词；
+同车型且含同一类事件词（召回、刹车/制动、起火/自燃等）时在相似度上加分，近义措辞也能并入同一事件。
+事件词只通过加分计入、不参与余弦，且只有去掉车型名与事件词后仍有一定文字重合（event_min_similarity）才加分：
+"变速箱顿挫投诉"与"座椅异响投诉"同属投诉类，但说的是不同的事，不能仅凭事件类别合并，
+否则被合并的本品负面只剩代表文章进入分析与预警。
+"""
+import math
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from ..collectors.base_collector import Article
+from ..utils.logger import logger
+from ..utils.text_normalize import normalize_text
+
+
+@dataclass
+class StoryCluster:
+    """事件簇"""
+    cluster_id: int
+    members: List[Article] = field(default_factory=list)
+    # 成员向量之和，比较时归一化即为质心方向
+    centroid: Dict[str, float] = field(default_factory=dict)
+    # 涉及车型（取自 Article.category）
+    models: Set[str] = field(default_factory=set)
+    # 成员标题中出现的事件类别
+    events: Set[str] = field(default_factory=set)
+
+    @property
+    def representative(self) -> Article:
+        """代表文章：得分最高者，得分相同取最早加入的"""
+        return max(self.members, key=lambda a: a.score or 0.0)
+
+    @property
+    def size(self) -> int:
+        return len(self.members)
+
+    @property
+    def sources(self) -> List[str]:
+        """覆盖的来源（去重，保持顺序）"""
+        return list(dict.fromkeys(a.source for a in self.members))
+
+
+class StoryClusterer:
+    """事件聚类器"""
+
+    # 事件类别 → 事件词（同一类别内的词视为同一事件的不同说法）
+    DEFAULT_EVENT_TERMS = {
+        '召回': ['召回'],
+        '制动': ['刹车', '制动'],
+        '起火': ['起火', '自燃', '火灾', '烧毁'],
+        '黑屏': ['黑屏', '死机', '卡顿'],
+        '异响': ['异响'],
+        '故障': ['故障', '抛锚', '失灵', '断轴'],
+        '漏油': ['漏油', '烧机油'],
+        '事故': ['事故', '车祸', '碰撞'],
+        '投诉': ['投诉', '维权'],
+        '降价': ['降价', '优惠', '促销', '让利', '清库存', '官降'],
+        '上市': ['上市', '首发', '起售'],
+        '停产': ['停产', '停售'],
+    }
+
+    def __init__(self, similarity_threshold: float = 0.15, ngram_sizes: tuple = (2, 3),
+                 event_boost: float = 0.15, event_min_similarity: float = 0.03,
+                 event_terms: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        初始化聚类器
+
+        同一事件必须涉及相同车型，避免"XX新款上市 售价X万起"这类同模板标题误合并
+
+        Args:
+            similarity_threshold: 与簇质心的余弦相似度（含事件词加分）阈值，达到即并入该簇
+            ngram_sizes: 字符n-gram长度
+            event_boost: 同车型且含同一类事件词时相似度的加分
+            event_min_similarity: 加分前要求的最低文字余弦相似度（不含车型名与事件词），
+                低于该值时不加分，避免同类但无关的事件仅凭事件类别合并
+            event_terms: 事件类别 → 事件词，None 表示使用 DEFAULT_EVENT_TERMS
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ngram_sizes = ngram_sizes
+        self.event_boost = event_boost
+        self.event_min_similarity = event_min_similarity
+        event_terms = self.DEFAULT_EVENT_TERMS if event_terms is None else event_terms
+        self.event_terms = {
+            label: [t for t in (normalize_text(term) for term in terms) if t]
+            for label, terms in event_terms.items()
+        }
+        # 长词优先去掉，避免"清库存"先被其中的短词切开
+        self.event_term_list = sorted({t for terms in self.event_terms.values() for t in terms}, key=len, reverse=True)
+
+    @classmethod
+    def from_config(cls, sources_config: dict) -> 'StoryClusterer':
+        """从 sources.yaml 的 cluster_config 构建"""
+        config = sources_config.get('cluster_config', {})
+        return cls(
+            similarity_threshold=config.get('similarity_threshold', 0.15),
+            event_boost=config.get('event_boost', 0.15),
+            event_min_similarity=config.get('event_min_similarity', 0.03),
+            event_terms=config.get('event_terms')
+        )
+
+    @staticmethod
+    def _strip_models(article: Article) -> str:
+        """规范化标题去掉车型名与匹配到的关键词（同车型标题共有，没有区分度）"""
+        text = article.normalized_title
+        names = (article.category or '').split(',') + list(article.matched_keywords or [])
+        for name in sorted({normalize_text(n) for n in names} - {''}, key=len, reverse=True):
+            text = text.replace(name, ' ')
+        return text
+
+    def _strip_events(self, text: str) -> str:
+        """去掉事件词（事件类别已通过加分计入，不再重复计入余弦）"""
+        for term in self.event_term_list:
+            text = text.replace(term, ' ')
+        return text
+
+    def _events(self, title: str) -> Set[str]:
+        """标题中出现的事件类别"""
+        return {label for label, terms in self.event_terms.items() if any(t in title for t in terms)}
+
+    def _ngrams(self, text: str) -> List[str]:
+        """提取字符n-gram（text 为去掉车型名与事件词的规范化标题，空格处为去掉的词的位置，不跨越）"""
+        grams = []
+        for part in text.split():
+            for n in self.ngram_sizes:
+                grams.extend(part[i:i + n] for i in range(len(part) - n + 1))
+        return grams
+
+    def _vectorize(self, grams: List[str], idf: Dict[str, float]) -> Dict[str, float]:
+        """计算L2归一化的TF-IDF向量"""
+        tf = Counter(grams)
+        vector = {g: count * idf[g] for g, count in tf.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {g: v / norm for g, v in vector.items()}
+
+    def cluster(self, articles: List[Article]) -> List[StoryCluster]:
+        """
+        按事件聚类
+
+        Args:
+            articles: 文章列表
+
+        Returns:
+            事件簇列表（按首次出现顺序）
+        """
+        grams_list = [self._ngrams(self._strip_events(self._strip_models(a))) for a in articles]
+
+        # 基于本批文章计算IDF
+        doc_freq = Counter()
+        for grams in grams_list:
+            doc_freq.update(set(grams))
+        total = len(articles)
+        idf = {g: math.log((1 + total) / (1 + df)) + 1.0 for g, df in doc_freq.items()}
+
+        clusters: List[StoryCluster] = []
+        # 倒排索引：n-gram（及 "#事件类别"）→ 包含它的簇，只与有共同n-gram或事件类别的簇比较
+        index: Dict[str, Set[int]] = defaultdict(set)
+
+        for article, grams in zip(articles, grams_list):
+            vector = self._vectorize(grams, idf)
+            models = set(filter(None, (article.category or '').split(',')))
+            events = self._events(article.normalized_title) if models else set()
+
+            candidates = set()
+            for g in vector:
+                candidates.update(index.get(g, ()))
+            for label in events:
+                candidates.update(index.get(f"#{label}", ()))
+
+            best_id, best_sim = None, 0.0
+            for cluster_id in candidates:
+                if models and not (models & clusters[cluster_id].models):
+                    continue
+                sim = self._cosine(vector, clusters[cluster_id].centroid)
+                if sim >= self.event_min_similarity and events & clusters[cluster_id].events:
+                    sim += self.event_boost
+                if sim > best_sim:
+                    best_id, best_sim = cluster_id, sim
+
+            if best_id is not None and best_sim >= self.similarity_threshold:
+                cluster = clusters[best_id]
+            else:
+                cluster = StoryCluster(cluster_id=len(clusters))
+                clusters.append(cluster)
+
+            cluster.members.append(article)
+            cluster.models.update(models)
+            cluster.events.update(events)
+            for label in events:
+                index[f"#{label}"].add(cluster.cluster_id)
+            for g, v in vector.items():
+                cluster.centroid[g] = cluster.centroid.get(g, 0.0) + v
+                index[g].add(cluster.cluster_id)
+
+        multi = sum(1 for c in clusters if c.size > 1)
+        logger.info(f"事件聚类: {len(articles)} 条文章 → {len(clusters)} 个事件 (多源事件 {multi} 个)")
+
+        return clusters
+
+    @staticmethod
+    def _cosine(vector: Dict[str, float], centroid: Dict[str, float]) -> float:
+        """向量与质心的余弦相似度（vector已归一化）"""
+        if len(vector) > len(centroid):
+            small, large = centroid, vector
+        else:
+            small, large = vector, centroid
+        dot = sum(v * large.get(g, 0.0) for g, v in small.items())
+        norm = math.sqrt(sum(v * v for v in centroid.values())) or 1.0
+        return dot / norm
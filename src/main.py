@@ -1,21 +1,26 @@
 """
 东风舆情监测日报系统 - 主程序
 """
+import gzip
+import hashlib
+import json
 import os
 import sys
+import time
 import yaml
 import argparse
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.collectors import SinaCollector, TrendRadarCollector, TechCollector
-from src.filters.article_filter import ArticleFilter
-from src.analyzer.sentiment_analyzer import SentimentAnalyzer
-from src.reporter.dingtalk_pusher import DingTalkPusher
+# 注意：采集器、过滤器、分析器、推送器均在各阶段内按需导入，
+# 避免 push/analyze 等短流程在启动时加载 requests/bs4/dashscope
 from src.utils import logger, DedupCache
+from src.utils.logger import configure_logging, log_sampling_summary
+from src.utils.profiler import profiler
 
 
 def load_config(config_dir: Path) -> dict:
@@ -37,109 +42,422 @@ def load_config(config_dir: Path) -> dict:
     return configs
 
 
-def extract_car_keywords(models_config: dict) -> list:
-    """提取所有车型关键词"""
+def extract_car_keywords(models_config: dict, own_only: bool = False) -> list:
+    """提取车型关键词，own_only=True 时仅提取本品车型"""
     keywords = []
     
     for car in models_config.get('car_models', []):
+        if own_only and not car.get('is_own', False):
+            continue
         keywords.extend(car.get('keywords', []))
         keywords.extend(car.get('aliases', []))
     
     return list(set(keywords))  # 去重
 
 
-def main():
-    """主函数"""
-    parser = argparse.ArgumentParser(description='东风舆情监测日报系统')
-    parser.add_argument('--config-dir', type=str, default='config', help='配置文件目录')
-    parser.add_argument('--mode', type=str, default='full', 
-                       choices=['collect', 'analyze', 'push', 'full'],
-                       help='运行模式: collect(仅采集) analyze(仅分析) push(仅推送) full(完整流程)')
-    args = parser.parse_args()
+def run_watch_cycle(configs: dict, cache: DedupCache, alert_pusher) -> int:
+    """
+    执行一轮本品负面实时监测：仅采集高权重平台的本品车型，发现负面立即预警
     
-    # 记录开始时间
-    start_time = datetime.now()
-    logger.info(f"{'='*60}")
-    logger.info(f"东风舆情监测日报系统启动")
-    logger.info(f"运行模式: {args.mode}")
-    logger.info(f"开始时间: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info(f"{'='*60}")
+    Returns:
+        本轮推送的预警数
+    """
+    from src.collectors.trendradar_collector import TrendRadarCollector
+    from src.collectors.sina_collector import SinaCollector
+    from src.filters.article_filter import ArticleFilter
+    from src.analyzer.sentiment_analyzer import SentimentAnalyzer
+    from src.analyzer.budget_governor import BudgetGovernor
     
-    # 加载配置
-    config_dir = Path(__file__).parent.parent / args.config_dir
-    logger.info(f"加载配置文件: {config_dir}")
-    configs = load_config(config_dir)
+    alert_config = configs['sources'].get('alert_config', {})
+    min_weight = alert_config.get('min_platform_weight', 1.5)
     
-    # 初始化去重缓存
-    cache = DedupCache()
-    cache.clean_expired()
+    own_keywords = extract_car_keywords(configs['models'], own_only=True)
+    options = build_collector_options(configs['sources'].get('collection_config', {}))
+    articles = []
     
-    # 提取车型关键词
-    car_keywords = extract_car_keywords(configs['models'])
-    logger.info(f"监测车型关键词: {len(car_keywords)} 个")
+    # 仅重新采集高权重平台
+    platforms = [
+        p for p in configs['sources']['trendradar_platforms']
+        if p.get('weight', 1.0) >= min_weight
+    ]
+    if platforms:
+        articles.extend(TrendRadarCollector(platforms, **options).collect(own_keywords))
     
-    # ========== 第一阶段：数据采集 ==========
-    all_articles = []
+    sina_config = configs['sources'].get('sina_search', {})
+    if sina_config.get('enabled', True) and sina_config.get('weight', 1.0) >= min_weight:
+        articles.extend(SinaCollector(sina_config, **options).collect(own_keywords))
     
-    if args.mode in ['collect', 'full']:
-        logger.info("\n" + "="*60)
-        logger.info("阶段1: 数据采集")
-        logger.info("="*60)
+    options['health'].save()
+    options['politeness'].save()
+    
+    article_filter = ArticleFilter(
+        configs['sources']['filter_config'], configs['models'], stats_path="data/filter_stats.json"
+    )
+    own_articles = article_filter.get_own_brand_articles(article_filter.filter(articles))
+    
+    # 已处理过的文章不再送入分析
+    new_articles = [a for a in own_articles if not cache.exists(a.title)]
+    logger.info(f"[实时预警] 本品相关 {len(own_articles)} 条, 新增 {len(new_articles)} 条")
+    
+    if not new_articles:
+        return 0
+    
+    alerts_before = alert_pusher.alert_count
+    analysis_config = configs['sources'].get('analysis_config', {})
+    analyzer = SentimentAnalyzer(
+        config=analysis_config, budget=BudgetGovernor.from_config(analysis_config, configs['models'])
+    )
+    analyzed = analyzer.analyze_batch(new_articles, on_result=alert_pusher.handle)
+    
+    for article in analyzed:
+        cache.add(article['title'], article['url'])
+    
+    return alert_pusher.alert_count - alerts_before
+
+
+def run_watch(configs: dict, cache: DedupCache, interval_minutes: float, once: bool = False):
+    """本品负面实时监测轮询循环"""
+    from src.reporter.alert_pusher import AlertPusher
+    
+    alert_config = configs['sources'].get('alert_config', {})
+    alert_pusher = AlertPusher(
+        cache,
+        debounce_hours=alert_config.get('debounce_hours', 6),
+        similarity_threshold=configs['sources']['filter_config'].get('similarity_threshold', 0.8)
+    )
+    
+    # 先重放上次未送达的预警
+    if alert_pusher.delivery:
+        alert_pusher.delivery.flush_outbox()
+    
+    while True:
+        cycle_start = time.monotonic()
+        try:
+            alerts = run_watch_cycle(configs, cache, alert_pusher)
+            cache.export_segments()
+            logger.info(f"[实时预警] 本轮完成: 推送 {alerts} 条, 耗时 {time.monotonic() - cycle_start:.1f} 秒")
+        except Exception as e:
+            logger.error(f"[实时预警] 本轮执行失败: {e}")
         
-        # 1. TrendRadar采集器（主力）
-        logger.info("\n[1/3] TrendRadar平台采集...")
-        trendradar_collector = TrendRadarCollector(
-            configs['sources']['trendradar_platforms']
-        )
-        trendradar_articles = trendradar_collector.collect(car_keywords)
-        all_articles.extend(trendradar_articles)
+        if once:
+            break
+        
+        time.sleep(max(interval_minutes * 60 - (time.monotonic() - cycle_start), 0))
+
+
+def merge_collection_sources(config_sets: dict) -> dict:
+    """
+    合并多套配置的数据源，使各配置共享同一次采集
+    
+    Args:
+        config_sets: {配置名: 配置字典}
+        
+    Returns:
+        合并后的数据源配置（平台按id、科技媒体按名称取并集）
+    """
+    all_sources = [c['sources'] for c in config_sets.values()]
+    
+    platforms = {}
+    tech_media = {}
+    for sources in all_sources:
+        for platform in sources.get('trendradar_platforms', []):
+            if platform.get('enabled', True):
+                platforms.setdefault(platform['id'], platform)
+        for media in sources.get('tech_media', []):
+            if media.get('enabled', True):
+                tech_media.setdefault(media['name'], media)
+    
+    sina_search = dict(all_sources[0].get('sina_search', {}))
+    sina_search['enabled'] = any(s.get('sina_search', {}).get('enabled', True) for s in all_sources)
+    
+    return {
+        'trendradar_platforms': list(platforms.values()),
+        'sina_search': sina_search,
+        'tech_media': list(tech_media.values())
+    }
+
+
+def shard_of(key: str, shard_count: int) -> int:
+    """工作单元所属分片：按名称的稳定哈希取模，新增单元不会打乱已有单元的归属"""
+    return int(hashlib.md5(key.encode('utf-8')).hexdigest()[:8], 16) % shard_count
+
+
+def shard_collection_sources(sources: dict, car_keywords: list, shard_index: int, shard_count: int) -> tuple:
+    """
+    按分片划分采集工作：TrendRadar平台、新浪搜索关键词、科技媒体各自独立分配
+    
+    Args:
+        sources: merge_collection_sources() 的结果
+        car_keywords: 监测车型关键词
+        shard_index: 分片序号（从0开始）
+        shard_count: 分片总数
         
-        # 2. 新浪搜索采集器（补充）
+    Returns:
+        (本分片的数据源配置, 本分片的新浪搜索关键词)
+    """
+    def mine(key: str) -> bool:
+        return shard_of(key, shard_count) == shard_index
+    
+    shard_sources = {
+        'trendradar_platforms': [p for p in sources['trendradar_platforms'] if mine(f"trendradar:{p['id']}")],
+        'sina_search': sources['sina_search'],
+        'tech_media': [m for m in sources['tech_media'] if mine(f"tech:{m['name']}")]
+    }
+    search_keywords = [k for k in car_keywords if mine(f"sina:{k}")]
+    
+    logger.info(
+        f"分片 {shard_index}/{shard_count}: TrendRadar平台 {len(shard_sources['trendradar_platforms'])} 个, "
+        f"新浪关键词 {len(search_keywords)} 个, 科技媒体 {len(shard_sources['tech_media'])} 个"
+    )
+    return shard_sources, search_keywords
+
+
+def write_shard_output(articles: list, shard_dir: str, shard_index: int, shard_count: int) -> Path:
+    """
+    写出分片采集结果（gzip压缩的JSON Lines，每行一篇文章）
+    
+    Returns:
+        输出文件路径
+    """
+    path = Path(shard_dir) / f"collect-{shard_index}-of-{shard_count}.jsonl.gz"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        for article in articles:
+            f.write(json.dumps(article.to_dict(), ensure_ascii=False) + '\n')
+    os.replace(tmp_path, path)
+    
+    logger.info(f"分片采集结果已写出: {path} ({len(articles)} 条)")
+    return path
+
+
+def load_shard_outputs(shard_dir: str) -> list:
+    """
+    读取并合并全部分片采集结果，按规范化链接与标题去重
+    
+    Returns:
+        合并后的文章列表（按分片序号、分片内原始顺序）
+    """
+    from src.collectors.base_collector import Article
+    
+    paths = sorted(
+        Path(shard_dir).glob('collect-*-of-*.jsonl.gz'),
+        key=lambda p: int(p.name.split('-')[1])
+    )
+    if not paths:
+        logger.warning(f"未找到分片采集结果: {shard_dir}")
+        return []
+    
+    shard_count = int(paths[0].name.split('-of-')[1].split('.')[0])
+    found = {int(p.name.split('-')[1]) for p in paths}
+    missing = sorted(set(range(shard_count)) - found)
+    if missing:
+        logger.warning(f"缺少分片 {missing}（共 {shard_count} 个），对应数据源本次无数据")
+    
+    articles = []
+    seen = set()
+    total = 0
+    for path in paths:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                article = Article.from_dict(json.loads(line))
+                total += 1
+                keys = {f"title:{article.normalized_title}"}
+                if article.canonical_url:
+                    keys.add(f"url:{article.canonical_url}")
+                if keys & seen:
+                    continue
+                seen |= keys
+                articles.append(article)
+    
+    logger.info(f"合并 {len(paths)} 个分片: 共 {total} 条, 去重后 {len(articles)} 条")
+    return articles
+
+
+def build_collector_options(collection_config: dict) -> dict:
+    """
+    构建采集器公共参数：跨运行持久化的端点健康度与请求节奏 + 本次采集阶段截止时间
+    
+    回放HTTP磁带时没有真实服务端：不做请求节奏等待，也不改写持久化的状态文件
+    
+    Returns:
+        可直接传给采集器构造函数的关键字参数
+    """
+    from src.utils.endpoint_health import EndpointHealth, Deadline
+    from src.utils.rate_controller import PolitenessController
+    from src.utils.http_replay import is_replaying
+    
+    if is_replaying():
+        health = EndpointHealth.from_config(collection_config, state_path=None)
+        politeness = PolitenessController.from_config(collection_config, state_path=None)
+        politeness.pacing = False
+    else:
+        health = EndpointHealth.from_config(collection_config)
+        politeness = PolitenessController.from_config(collection_config)
+    
+    return {
+        'health': health,
+        'deadline': Deadline(collection_config.get('stage_deadline_seconds')),
+        'default_timeout': collection_config.get('request_timeout', 10),
+        'politeness': politeness
+    }
+
+
+def collect_articles(sources: dict, car_keywords: list, collection_config: dict,
+                     search_keywords: Optional[list] = None) -> list:
+    """
+    阶段1：从所有数据源采集原始文章
+    
+    Args:
+        sources: 数据源配置
+        car_keywords: 监测车型关键词
+        collection_config: 采集配置
+        search_keywords: 新浪搜索的关键词，默认与 car_keywords 相同（分片采集时只搜本分片的关键词）
+    """
+    from src.collectors.trendradar_collector import TrendRadarCollector
+    from src.collectors.sina_collector import SinaCollector
+    from src.collectors.tech_collector import TechCollector
+    
+    options = build_collector_options(collection_config)
+    all_articles = []
+    
+    # 1. TrendRadar采集器（主力）
+    logger.info("\n[1/3] TrendRadar平台采集...")
+    trendradar_collector = TrendRadarCollector(sources['trendradar_platforms'], **options)
+    with profiler.stage('collect.trendradar'):
+        trendradar_articles = trendradar_collector.collect(car_keywords)
+    all_articles.extend(trendradar_articles)
+    
+    # 2. 新浪搜索采集器（补充）
+    if search_keywords is None:
+        search_keywords = car_keywords
+    if sources['sina_search'].get('enabled', True) and search_keywords:
         logger.info("\n[2/3] 新浪搜索采集...")
-        sina_collector = SinaCollector(configs['sources']['sina_search'])
-        sina_articles = sina_collector.collect(car_keywords)
+        sina_collector = SinaCollector(sources['sina_search'], **options)
+        with profiler.stage('collect.sina'):
+            sina_articles = sina_collector.collect(search_keywords)
         all_articles.extend(sina_articles)
-        
-        # 3. 科技媒体采集器（边缘补充）
-        logger.info("\n[3/3] 科技媒体采集...")
-        tech_collector = TechCollector(configs['sources']['tech_media'])
+    
+    # 3. 科技媒体采集器（边缘补充）
+    logger.info("\n[3/3] 科技媒体采集...")
+    tech_collector = TechCollector(sources['tech_media'], **options)
+    with profiler.stage('collect.tech'):
         tech_articles = tech_collector.collect(car_keywords)
-        all_articles.extend(tech_articles)
-        
-        logger.info(f"\n数据采集完成: 共采集 {len(all_articles)} 条原始数据")
+    all_articles.extend(tech_articles)
+    
+    options['health'].save()
+    options['politeness'].save()
+    
+    return all_articles
+
+
+def run_pipeline(name: str, configs: dict, raw_articles: list, cache: DedupCache,
+                 mode: str, outbox_suffix: str = ''):
+    """
+    对共享语料执行单套配置的过滤、分析与推送
+    
+    Args:
+        name: 配置名称（用于日志）
+        configs: 该套配置
+        raw_articles: 共享的原始文章（不会被修改）
+        cache: 去重缓存
+        mode: 运行模式
+        outbox_suffix: 推送outbox文件后缀，多配置时按配置区分
+    
+    Returns:
+        分析结果列表（由调用方在全部配置处理完后写入去重缓存）
+    """
+    # 过滤器会写入 category/matched_keywords，各配置使用独立副本
+    all_articles = [a.copy() for a in raw_articles]
+    story_clusters = []
+    trends = None
     
     # ========== 第二阶段：过滤筛选 ==========
-    if args.mode in ['collect', 'analyze', 'full']:
+    if mode in ['collect', 'analyze', 'full']:
         logger.info("\n" + "="*60)
-        logger.info("阶段2: 过滤筛选")
+        logger.info(f"阶段2: 过滤筛选 [{name}]")
         logger.info("="*60)
         
+        from src.filters.article_filter import ArticleFilter
+        from src.filters.article_scorer import ArticleScorer
+        from src.filters.story_cluster import StoryClusterer
+        
+        from src.utils.trend_sketch import TrendSketches
+        
+        # 通过过滤的文章计入长期声量趋势
+        trends = TrendSketches.from_config(
+            configs['sources'], configs['models'], state_dir=f"state/trend_sketches{outbox_suffix}",
+            legacy_path=f"data/trend_sketches{outbox_suffix}.json.gz"
+        )
+        
         # 初始化过滤器
         article_filter = ArticleFilter(
             configs['sources']['filter_config'],
-            configs['models']
+            configs['models'],
+            stats_path=f"data/filter_stats{outbox_suffix}.json",
+            trends=trends
         )
         
-        # 执行6层过滤
-        filtered_articles = article_filter.filter(all_articles)
+        # 执行7层过滤
+        with profiler.stage('filter'):
+            filtered_articles = article_filter.filter(all_articles)
+        trends.save()
         
         logger.info(f"\n过滤完成: 保留 {len(filtered_articles)} 条有效数据")
         logger.info(f"过滤率: {(1 - len(filtered_articles)/max(len(all_articles), 1))*100:.1f}%")
+        
+        # 事件聚类：同一事件的多源报道归为一簇，只分析代表文章
+        clusterer = StoryClusterer.from_config(configs['sources'])
+        with profiler.stage('cluster'):
+            story_clusters = clusterer.cluster(filtered_articles)
+        
+        # 相关度打分，按车型保留TOP K事件，控制送入AI分析的数量
+        article_scorer = ArticleScorer(configs['sources'], configs['keywords'])
+        with profiler.stage('score'):
+            story_clusters = article_scorer.select_clusters(story_clusters)
     
     # ========== 第三阶段：AI分析 ==========
     analyzed_articles = []
+    dingtalk_config = configs['sources'].get('dingtalk_config', {})
     
-    if args.mode in ['analyze', 'full']:
+    if mode in ['analyze', 'full']:
         logger.info("\n" + "="*60)
-        logger.info("阶段3: AI情感分析")
+        logger.info(f"阶段3: AI情感分析 [{name}]")
         logger.info("="*60)
         
-        # 初始化情感分析器
-        analyzer = SentimentAnalyzer()
+        from src.analyzer.sentiment_analyzer import SentimentAnalyzer
+        from src.analyzer.budget_governor import BudgetGovernor
+        from src.reporter.alert_pusher import AlertPusher
+        
+        # 初始化情感分析器（token/费用预算按天累计，多配置共享同一API Key故共用一份用量）
+        analysis_config = configs['sources'].get('analysis_config', {})
+        budget = BudgetGovernor.from_config(analysis_config, configs['models'])
+        analyzer = SentimentAnalyzer(config=analysis_config, budget=budget)
+        
+        # 正文补全：优先级最高与标题不明确的事件抓取网页正文，供AI判断（规则模式不使用正文）
+        enrichment_config = configs['sources'].get('enrichment_config', {})
+        if enrichment_config.get('enabled', False) and analyzer.use_ai:
+            from src.collectors.content_enricher import ContentEnricher
+            
+            enricher = ContentEnricher.from_config(enrichment_config)
+            with profiler.stage('enrich'):
+                enricher.enrich([c.representative for c in story_clusters], priority=budget.priority)
+            enricher.save()
+        
+        # 本品负面在分析出结果时立即预警，不等日报
+        alert_pusher = AlertPusher(
+            cache,
+            webhook_url=os.getenv(dingtalk_config.get('alert_webhook_env', 'DINGTALK_ALERT_WEBHOOK_URL')),
+            secret=os.getenv(dingtalk_config.get('alert_secret_env', 'DINGTALK_ALERT_SECRET')),
+            debounce_hours=configs['sources'].get('alert_config', {}).get('debounce_hours', 6),
+            outbox_path=f"data/alert_outbox{outbox_suffix}.jsonl"
+        )
         
         # 批量分析
         logger.info("开始AI分析...")
-        analyzed_articles = analyzer.analyze_batch(filtered_articles)
+        with profiler.stage('analyze'):
+            analyzed_articles = analyzer.analyze_clusters(story_clusters, on_result=alert_pusher.handle)
         
         # 统计分析结果
         sentiments = {'positive': 0, 'negative': 0, 'neutral': 0}
@@ -157,36 +475,226 @@ def main():
         logger.info(f"  中性: {sentiments['neutral']} 条")
         logger.info(f"  负面: {sentiments['negative']} 条")
         logger.info(f"  本品负面: {own_negatives} 条 {'⚠️' if own_negatives > 0 else '✅'}")
-        
-        # 更新缓存
-        for article in analyzed_articles:
-            cache.add(article['title'], article['url'])
     
     # ========== 第四阶段：推送日报 ==========
-    if args.mode in ['push', 'full']:
+    if mode in ['push', 'full']:
         logger.info("\n" + "="*60)
-        logger.info("阶段4: 推送日报")
+        logger.info(f"阶段4: 推送日报 [{name}]")
         logger.info("="*60)
         
         if not analyzed_articles:
             logger.warning("没有可推送的数据")
         else:
+            from src.reporter.dingtalk_pusher import DingTalkPusher
+            from src.analyzer.hot_words import HotWordExtractor
+            
             # 初始化钉钉推送器
-            pusher = DingTalkPusher()
+            pusher = DingTalkPusher(
+                webhook_url=os.getenv(dingtalk_config.get('webhook_env', 'DINGTALK_WEBHOOK_URL')),
+                secret=os.getenv(dingtalk_config.get('secret_env', 'DINGTALK_SECRET')),
+                outbox_path=f"data/dingtalk_outbox{outbox_suffix}.jsonl",
+                hot_words=HotWordExtractor.from_config(
+                    configs['sources'], configs['models'], state_path=f"data/hot_words{outbox_suffix}.json"
+                ),
+                trends=trends
+            )
             
             # 推送日报
             logger.info(f"准备推送 {len(analyzed_articles)} 条舆情信息...")
-            success = pusher.push_daily_report(analyzed_articles)
+            with profiler.stage('report.push'):
+                success = pusher.push_daily_report(analyzed_articles)
             
             if success:
                 logger.info("✅ 日报推送成功")
             else:
                 logger.error("❌ 日报推送失败")
     
+    return analyzed_articles
+
+
+def parse_shard(value: str) -> tuple:
+    """解析 --shard i/N"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"分片格式应为 i/N: {value}")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"分片序号应满足 0 <= i < N: {value}")
+    return index, count
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='东风舆情监测日报系统')
+    parser.add_argument('--config-dir', type=str, nargs='+', default=['config'],
+                        help='配置文件目录，可指定多个（共享一次采集，分别过滤/分析/推送）')
+    parser.add_argument('--mode', type=str, default='full', 
+                       choices=['collect', 'analyze', 'push', 'full', 'watch', 'daemon', 'merge'],
+                       help='运行模式: collect(仅采集) analyze(仅分析) push(仅推送) full(完整流程) '
+                            'watch(本品负面实时监测) daemon(常驻进程，内置调度) '
+                            'merge(合并分片采集结果后执行过滤/分析/推送)')
+    parser.add_argument('--shard', type=parse_shard, default=None, metavar='i/N',
+                        help='collect模式分片采集：只采集第i个分片（从0开始，共N个），结果写入 --shard-dir')
+    parser.add_argument('--shard-dir', type=str, default='artifacts/shards',
+                        help='分片采集结果目录（collect --shard 写出，merge 读取）')
+    parser.add_argument('--interval', type=float, default=None, help='watch模式轮询间隔（分钟）')
+    parser.add_argument('--once', action='store_true', help='watch模式仅执行一轮')
+    parser.add_argument('--http-record', type=str, default=None, metavar='DIR',
+                        help='录制采集HTTP响应到磁带目录')
+    parser.add_argument('--http-replay', type=str, default=None, metavar='DIR',
+                        help='从磁带目录回放采集HTTP响应（离线复现/基准测试）')
+    parser.add_argument('--replay-latency-ms', type=float, default=None,
+                        help='回放固定延迟（毫秒），默认使用录制时的真实延迟')
+    parser.add_argument('--replay-jitter-ms', type=float, default=0.0, help='回放延迟随机抖动（毫秒）')
+    parser.add_argument('--replay-error-rate', type=float, default=0.0, help='回放时随机返回503的概率')
+    parser.add_argument('--profile', type=str, nargs='?', const='artifacts/profile', default=None, metavar='DIR',
+                        help='分阶段性能剖析（pstats + 内存峰值），结果写入DIR，默认 artifacts/profile')
+    parser.add_argument('--log-jsonl', type=str, default=None, metavar='PATH',
+                        help='同时输出JSON Lines格式日志到文件（覆盖 logging_config.jsonl_path）')
+    parser.add_argument('--profile-no-memory', action='store_true', help='剖析时不跟踪内存（减小剖析开销）')
+    args = parser.parse_args()
+    
+    # 启动日志也写入JSON Lines文件；加载配置后按 logging_config 再配置一次（文件追加写）
+    if args.log_jsonl:
+        configure_logging(jsonl_path=args.log_jsonl)
+    
+    if args.profile:
+        profiler.enable(args.profile, memory=not args.profile_no_memory)
+    
+    # HTTP录制/回放（按需导入，避免启动时加载requests）
+    if args.http_record or args.http_replay:
+        from src.utils import http_replay
+        http_replay.configure(
+            'record' if args.http_record else 'replay',
+            args.http_record or args.http_replay,
+            latency_ms=args.replay_latency_ms,
+            jitter_ms=args.replay_jitter_ms,
+            error_rate=args.replay_error_rate
+        )
+    elif os.getenv('HTTP_CASSETTE_MODE'):
+        from src.utils import http_replay
+        http_replay.configure_from_env()
+    
+    # 记录开始时间
+    start_time = datetime.now()
+    logger.info(f"{'='*60}")
+    logger.info(f"东风舆情监测日报系统启动")
+    logger.info(f"运行模式: {args.mode}")
+    logger.info(f"开始时间: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info(f"{'='*60}")
+    
+    # 加载配置
+    config_sets = {}
+    for config_dir_arg in args.config_dir:
+        config_dir = Path(__file__).parent.parent / config_dir_arg
+        logger.info(f"加载配置文件: {config_dir}")
+        config_sets[config_dir.name] = load_config(config_dir)
+    
+    # watch/daemon 模式只使用第一套配置
+    configs = next(iter(config_sets.values()))
+    
+    # 日志级别、按阶段级别与JSON Lines输出取第一套配置
+    configure_logging(configs['sources'].get('logging_config'), jsonl_path=args.log_jsonl)
+    
+    # 标题规范化：可选繁体转简体
+    from src.utils.text_normalize import set_traditional_conversion
+    set_traditional_conversion(configs['sources'].get('filter_config', {}).get('normalize_traditional', False))
+    if args.mode in ['watch', 'daemon'] and len(config_sets) > 1:
+        logger.warning(f"{args.mode} 模式仅使用第一套配置: {args.config_dir[0]}")
+    
+    # 初始化去重缓存：dedup.db 只是本地缓存，以 state/ 下的文本分片为准
+    with profiler.stage('cache.load'):
+        cache = DedupCache()
+        cache.import_segments()
+        cache.clean_expired()
+    
+    if args.mode == 'watch':
+        interval = args.interval or configs['sources'].get('alert_config', {}).get('poll_interval_minutes', 5)
+        logger.info(f"本品负面实时监测: 每 {interval} 分钟轮询")
+        run_watch(configs, cache, interval, once=args.once)
+        log_sampling_summary()
+        profiler.write_summary()
+        return
+    
+    # 提取车型关键词（多套配置取并集）
+    car_keywords = sorted({
+        keyword
+        for c in config_sets.values()
+        for keyword in extract_car_keywords(c['models'])
+    })
+    logger.info(f"监测车型关键词: {len(car_keywords)} 个")
+    
+    if args.mode == 'daemon':
+        from src.daemon import MonitorDaemon
+        MonitorDaemon(configs, cache, car_keywords).run()
+        log_sampling_summary()
+        profiler.write_summary()
+        return
+    
+    if args.shard and args.mode != 'collect':
+        logger.warning("--shard 仅在 collect 模式下生效，已忽略")
+    
+    # ========== 第一阶段：数据采集（所有配置共享） ==========
+    all_articles = []
+    
+    if args.mode in ['collect', 'full']:
+        logger.info("\n" + "="*60)
+        logger.info("阶段1: 数据采集")
+        logger.info("="*60)
+        
+        sources = merge_collection_sources(config_sets)
+        search_keywords = None
+        if args.shard and args.mode == 'collect':
+            sources, search_keywords = shard_collection_sources(sources, car_keywords, *args.shard)
+        
+        all_articles = collect_articles(
+            sources,
+            car_keywords,
+            configs['sources'].get('collection_config', {}),
+            search_keywords=search_keywords
+        )
+        
+        logger.info(f"\n数据采集完成: 共采集 {len(all_articles)} 条原始数据")
+    
+    # 分片采集只写出结果，过滤/分析/推送由 merge 阶段统一执行
+    if args.shard and args.mode == 'collect':
+        write_shard_output(all_articles, args.shard_dir, *args.shard)
+        log_sampling_summary()
+        profiler.write_summary()
+        return
+    
+    if args.mode == 'merge':
+        logger.info("\n" + "="*60)
+        logger.info("阶段1: 合并分片采集结果")
+        logger.info("="*60)
+        
+        all_articles = load_shard_outputs(args.shard_dir)
+    
+    # ========== 第二~四阶段：各配置分别处理 ==========
+    multi = len(config_sets) > 1
+    pipeline_mode = 'full' if args.mode == 'merge' else args.mode
+    analyzed_articles = []
+    for name, config_set in config_sets.items():
+        analyzed_articles.extend(run_pipeline(
+            name, config_set, all_articles, cache, pipeline_mode,
+            outbox_suffix=f"_{name}" if multi else ''
+        ))
+    
+    # 全部配置处理完再写入缓存：同一文章在一套配置中已分析，不影响另一套配置对它的本品预警
+    with profiler.stage('cache.add'):
+        for article in analyzed_articles:
+            cache.add(article['title'], article['url'])
+    
     # 打印缓存统计
     stats = cache.get_stats()
     logger.info(f"\n缓存统计: 总计 {stats['total_cached']} 条, 今日新增 {stats['cached_today']} 条")
     
+    with profiler.stage('cache.export'):
+        cache.export_segments()
+    
+    log_sampling_summary()
+    profiler.write_summary()
+    
     # 记录结束时间
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
@@ -1,4 +1,16 @@
 """报告推送模块"""
-from .dingtalk_pusher import DingTalkPusher
+from importlib import import_module
 
-__all__ = ['DingTalkPusher']
+# 推送器依赖 requests，按需延迟导入
+_LAZY_PUSHERS = {
+    'DingTalkPusher': '.dingtalk_pusher',
+    'AlertPusher': '.alert_pusher',
+}
+
+__all__ = ['DingTalkPusher', 'AlertPusher']
+
+
+def __getattr__(name: str):
+    if name in _LAZY_PUSHERS:
+        return getattr(import_module(_LAZY_PUSHERS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,140 @@
+"""
+本品负面实时预警推送
+"""
+import os
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional
+
+from .dingtalk_delivery import DingTalkDelivery
+from ..utils.cache import DedupCache
+from ..utils.logger import logger
+from ..utils.text_normalize import normalize_text
+
+
+class AlertPusher:
+    """本品负面实时预警推送器"""
+
+    ALERT_TITLE = "⚠️ 本品负面实时预警"
+
+    def __init__(
+        self,
+        cache: DedupCache,
+        webhook_url: Optional[str] = None,
+        secret: Optional[str] = None,
+        debounce_hours: float = 6,
+        similarity_threshold: float = 0.8,
+        outbox_path: str = "data/alert_outbox.jsonl"
+    ):
+        """
+        初始化预警推送器
+
+        Args:
+            cache: 去重缓存（已处理文章与预警记录）
+            webhook_url: 预警专用钉钉Webhook，未设置时回退到日报Webhook
+            secret: 预警机器人加签密钥
+            debounce_hours: 同一事件防抖时长（小时）
+            similarity_threshold: 判定为同一事件的标题相似度阈值
+            outbox_path: 推送失败消息暂存文件
+        """
+        self.cache = cache
+        self.debounce_hours = debounce_hours
+        self.similarity_threshold = similarity_threshold
+
+        self.webhook_url = webhook_url or os.getenv('DINGTALK_ALERT_WEBHOOK_URL')
+        self.secret = secret or os.getenv('DINGTALK_ALERT_SECRET')
+
+        if not self.webhook_url:
+            self.webhook_url = os.getenv('DINGTALK_WEBHOOK_URL')
+            self.secret = self.secret or os.getenv('DINGTALK_SECRET')
+            if self.webhook_url:
+                logger.warning("未设置预警专用Webhook，预警将推送至日报群")
+
+        self.delivery = None
+        if self.webhook_url:
+            self.delivery = DingTalkDelivery(
+                self.webhook_url,
+                secret=self.secret,
+                outbox_path=outbox_path
+            )
+        else:
+            logger.warning("未设置钉钉Webhook URL，实时预警不可用")
+
+        # 近期已预警标题，启动时从缓存加载，本进程内增量维护
+        self.recent_alerts: List[str] = cache.get_recent_alerts(debounce_hours)
+        self.alert_count = 0
+
+    def handle(self, result: Dict) -> bool:
+        """
+        处理单条分析结果，本品负面立即推送
+
+        可直接作为 SentimentAnalyzer.analyze_batch 的 on_result 回调
+
+        Args:
+            result: 分析结果字典
+
+        Returns:
+            是否推送了预警
+        """
+        if not result.get('is_own_brand_negative', False):
+            return False
+
+        title = result.get('title', '')
+
+        if self.cache.exists(title):
+            logger.info(f"[实时预警] 已处理过，跳过: {title}")
+            return False
+
+        if self._is_debounced(title):
+            logger.info(f"[实时预警] 同一事件防抖期内，跳过: {title}")
+            return False
+
+        if not self.delivery:
+            return False
+
+        markdown = self._format_alert(result)
+        success = self.delivery.send_markdown(self.ALERT_TITLE, markdown)
+
+        # 推送失败的消息已进入outbox（不可重试的已丢弃并记录错误），同样视为已预警，避免重复
+        self.cache.add_alert(title)
+        self.recent_alerts.append(title)
+        self.alert_count += 1
+
+        if success:
+            logger.info(f"[实时预警] 推送成功: {title}")
+        else:
+            logger.error(f"[实时预警] 推送失败，已暂存: {title}")
+
+        return True
+
+    def _is_debounced(self, title: str) -> bool:
+        """是否与防抖期内已预警的事件相似（比较规范化标题）"""
+        title = normalize_text(title)
+        for alerted_title in self.recent_alerts:
+            alerted_title = normalize_text(alerted_title)
+            if alerted_title == title:
+                return True
+            if SequenceMatcher(None, title, alerted_title).ratio() >= self.similarity_threshold:
+                return True
+        return False
+
+    def _format_alert(self, result: Dict) -> str:
+        """格式化预警消息"""
+        title = result.get('title', '无标题')
+        url = result.get('url', '#')
+        source = result.get('source', '未知来源')
+        summary = result.get('summary', title[:50])
+        keywords = '、'.join(result.get('matched_keywords', []))
+
+        return f"""## {self.ALERT_TITLE}
+
+**{title}**
+
+> {summary}
+
+- **相关车型**: {keywords or '未知'}
+- **来源**: {source}
+- **发现时间**: {datetime.now().strftime('%Y-%m-%d %H:%M')}
+
+[查看详情]({url})
+"""
@@ -0,0 +1,354 @@
+"""
+钉钉消息投递模块 - 分片、签名、限流、重试与失败重放
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+import urllib.parse
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import requests
+
+from ..utils.logger import logger
+
+
+# 钉钉markdown消息体上限约20000字节，预留余量给标题和分页标记
+DEFAULT_MAX_BYTES = 18000
+
+# 钉钉机器人限流：每分钟最多20条
+DEFAULT_RATE_PER_MINUTE = 20
+
+# 可重试的钉钉错误码（130101: 发送速度太快而限流）
+RETRYABLE_ERRCODES = {130101, -1}
+
+
+def split_markdown(text: str, max_bytes: int = DEFAULT_MAX_BYTES) -> List[str]:
+    """
+    按字节上限切分Markdown，优先在分隔线和段落处断开
+
+    Args:
+        text: Markdown文本
+        max_bytes: 单片最大UTF-8字节数
+
+    Returns:
+        分片列表
+    """
+    if len(text.encode('utf-8')) <= max_bytes:
+        return [text]
+
+    chunks = []
+    current = ''
+
+    for block in _split_blocks(text):
+        if len((current + block).encode('utf-8')) <= max_bytes:
+            current += block
+            continue
+
+        if current:
+            chunks.append(current)
+            current = ''
+
+        # 单个块本身超限时按行、再按字符硬切
+        while len(block.encode('utf-8')) > max_bytes:
+            head, block = _cut_by_bytes(block, max_bytes)
+            chunks.append(head)
+        current = block
+
+    if current.strip():
+        chunks.append(current)
+
+    return chunks
+
+
+def _split_blocks(text: str) -> List[str]:
+    """按空行切分段落，保留分隔符"""
+    parts = text.split('\n\n')
+    return [part + '\n\n' for part in parts[:-1]] + [parts[-1]]
+
+
+def _cut_by_bytes(block: str, max_bytes: int) -> tuple:
+    """在不超过字节上限的最后一个换行处切开，找不到换行则按字符切"""
+    encoded = block.encode('utf-8')[:max_bytes]
+    head = encoded.decode('utf-8', errors='ignore')
+
+    newline = head.rfind('\n')
+    if newline > 0:
+        head = head[:newline + 1]
+
+    return head, block[len(head):]
+
+
+class RateLimiter:
+    """滑动窗口限流器"""
+
+    def __init__(self, max_calls: int, period: float = 60.0):
+        """
+        初始化限流器
+
+        Args:
+            max_calls: 窗口内最多调用次数
+            period: 窗口长度（秒）
+        """
+        self.max_calls = max_calls
+        self.period = period
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """获取一次调用许可，必要时阻塞等待"""
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] >= self.period:
+                self._calls.popleft()
+
+            if len(self._calls) >= self.max_calls:
+                wait = self.period - (now - self._calls[0])
+                logger.info(f"钉钉限流: 等待 {wait:.1f} 秒")
+                time.sleep(wait)
+                self._calls.popleft()
+
+            self._calls.append(time.monotonic())
+
+
+class DingTalkDelivery:
+    """钉钉消息投递器"""
+
+    def __init__(
+        self,
+        webhook_url: str,
+        secret: Optional[str] = None,
+        outbox_path: str = "data/dingtalk_outbox.jsonl",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        rate_per_minute: int = DEFAULT_RATE_PER_MINUTE,
+        retry_times: int = 3,
+        backoff_base: float = 2.0,
+        timeout: float = 10.0,
+        outbox_max_attempts: int = 5,
+        outbox_ttl_hours: float = 24
+    ):
+        """
+        初始化投递器
+
+        Args:
+            webhook_url: 钉钉Webhook地址
+            secret: 加签密钥（机器人安全设置为"加签"时必填）
+            outbox_path: 失败消息暂存文件
+            max_bytes: 单条消息最大字节数
+            rate_per_minute: 每分钟最多发送条数
+            retry_times: 单条消息最大重试次数
+            backoff_base: 退避基数（秒），第n次重试等待 base**n
+            timeout: 单次请求超时（秒）
+            outbox_max_attempts: outbox消息最多投递轮数（含首次发送），超过后丢弃
+            outbox_ttl_hours: outbox消息有效期（小时），过期的日报/预警不再补发
+        """
+        self.webhook_url = webhook_url
+        self.secret = secret
+        self.outbox_path = Path(outbox_path)
+        self.max_bytes = max_bytes
+        self.retry_times = retry_times
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.outbox_max_attempts = outbox_max_attempts
+        self.outbox_ttl_hours = outbox_ttl_hours
+        self.rate_limiter = RateLimiter(rate_per_minute)
+        self.session = requests.Session()
+
+    @staticmethod
+    def compute_sign(secret: str, timestamp: str) -> str:
+        """计算钉钉加签：HmacSHA256(timestamp + "\\n" + secret) 后Base64"""
+        string_to_sign = f"{timestamp}\n{secret}"
+        digest = hmac.new(
+            secret.encode('utf-8'),
+            string_to_sign.encode('utf-8'),
+            digestmod=hashlib.sha256
+        ).digest()
+        return base64.b64encode(digest).decode('utf-8')
+
+    def _signed_url(self) -> str:
+        """生成带签名的Webhook地址"""
+        if not self.secret:
+            return self.webhook_url
+
+        timestamp = str(round(time.time() * 1000))
+        sign = urllib.parse.quote_plus(self.compute_sign(self.secret, timestamp))
+
+        separator = '&' if '?' in self.webhook_url else '?'
+        return f"{self.webhook_url}{separator}timestamp={timestamp}&sign={sign}"
+
+    def send_markdown(self, title: str, text: str) -> bool:
+        """
+        发送Markdown消息，超长时自动分片
+
+        Args:
+            title: 消息标题
+            text: Markdown正文
+
+        Returns:
+            是否全部分片发送成功（可重试的失败分片已写入outbox）
+        """
+        chunks = split_markdown(text, self.max_bytes)
+        total = len(chunks)
+
+        if total > 1:
+            logger.info(f"钉钉消息超长，拆分为 {total} 条发送")
+
+        success = True
+        for i, chunk in enumerate(chunks, 1):
+            chunk_title = f"{title} ({i}/{total})" if total > 1 else title
+            if total > 1 and i > 1:
+                chunk = f"**{chunk_title}**\n\n{chunk}"
+
+            message = {
+                "msgtype": "markdown",
+                "markdown": {
+                    "title": chunk_title,
+                    "text": chunk
+                }
+            }
+
+            sent, retryable = self._send_with_retry(message)
+            if not sent:
+                if retryable:
+                    self._save_to_outbox(message)
+                else:
+                    logger.error(f"钉钉消息不可重试，已丢弃: {chunk_title}")
+                success = False
+
+        return success
+
+    def _send_with_retry(self, message: dict) -> Tuple[bool, bool]:
+        """
+        带退避重试的单条发送
+
+        Returns:
+            (是否发送成功, 失败时是否值得稍后重放)；签名错误、关键词不匹配、
+            Webhook无效等配置问题重放也不会成功
+        """
+        for attempt in range(self.retry_times + 1):
+            if attempt > 0:
+                wait = self.backoff_base ** attempt
+                logger.info(f"钉钉推送第 {attempt} 次重试，等待 {wait:.0f} 秒")
+                time.sleep(wait)
+
+            self.rate_limiter.acquire()
+
+            try:
+                response = self.session.post(
+                    self._signed_url(),
+                    json=message,
+                    headers={'Content-Type': 'application/json'},
+                    timeout=self.timeout
+                )
+
+                if response.status_code == 429 or response.status_code >= 500:
+                    logger.warning(f"钉钉推送HTTP {response.status_code}，准备重试")
+                    continue
+
+                if response.status_code >= 400:
+                    logger.error(f"钉钉推送HTTP {response.status_code}，Webhook地址无效或无权限")
+                    return False, False
+
+                result = response.json()
+
+                errcode = result.get('errcode')
+                if errcode == 0:
+                    return True, False
+
+                if errcode in RETRYABLE_ERRCODES:
+                    logger.warning(f"钉钉推送暂时失败: {result}")
+                    continue
+
+                # 签名错误、关键词不匹配等不可重试
+                logger.error(f"钉钉推送失败: {result}")
+                return False, False
+
+            except Exception as e:
+                logger.warning(f"钉钉推送异常: {e}")
+
+        logger.error(f"钉钉推送重试 {self.retry_times} 次后仍失败")
+        return False, True
+
+    def _save_to_outbox(self, message: dict):
+        """失败消息写入outbox，等待下次运行重放"""
+        self.outbox_path.parent.mkdir(parents=True, exist_ok=True)
+
+        record = {
+            'created_at': datetime.now().isoformat(),
+            'attempts': 1,
+            'message': message
+        }
+
+        with open(self.outbox_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        logger.warning(f"钉钉消息已暂存至outbox: {self.outbox_path}")
+
+    def _outbox_expired(self, record: dict) -> bool:
+        """outbox消息是否已过期或已达到最多投递轮数"""
+        if record.get('attempts', 1) >= self.outbox_max_attempts:
+            return True
+
+        created_at = record.get('created_at') or record.get('queued_at')
+        try:
+            age_hours = (datetime.now() - datetime.fromisoformat(created_at)).total_seconds() / 3600
+        except (TypeError, ValueError):
+            return True
+        return age_hours > self.outbox_ttl_hours
+
+    def flush_outbox(self) -> int:
+        """
+        重放outbox中的历史失败消息
+
+        过期（超过 outbox_ttl_hours）或已达到 outbox_max_attempts 轮的消息直接丢弃，
+        重放时遇到不可重试的错误也丢弃，其余失败消息投递轮数加一后保留
+
+        Returns:
+            成功重放的条数
+        """
+        if not self.outbox_path.exists():
+            return 0
+
+        with open(self.outbox_path, 'r', encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+        if not records:
+            self.outbox_path.unlink()
+            return 0
+
+        logger.info(f"重放outbox中的 {len(records)} 条钉钉消息")
+
+        remaining = []
+        delivered = 0
+        dropped = 0
+        for record in records:
+            if self._outbox_expired(record):
+                dropped += 1
+                continue
+
+            sent, retryable = self._send_with_retry(record['message'])
+            if sent:
+                delivered += 1
+            elif retryable:
+                record['attempts'] = record.get('attempts', 1) + 1
+                remaining.append(record)
+            else:
+                dropped += 1
+
+        if remaining:
+            tmp_path = self.outbox_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in remaining:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.outbox_path)
+        else:
+            self.outbox_path.unlink()
+
+        logger.info(f"outbox重放完成: 成功 {delivered} 条, 丢弃 {dropped} 条（过期/超过重试轮数/不可重试）, 剩余 {len(remaining)} 条")
+        return delivered
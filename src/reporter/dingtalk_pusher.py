@@ -7,25 +7,48 @@ from datetime import datetime
 from typing import List, Dict, Optional
 from collections import Counter
 
-import requests
-
+from .dingtalk_delivery import DingTalkDelivery
 from ..utils.logger import logger
+from ..utils.profiler import profiler
 
 
 class DingTalkPusher:
     """钉钉推送器"""
     
-    def __init__(self, webhook_url: Optional[str] = None):
+    REPORT_TITLE = "🚗 东风舆情监测日报"
+    
+    # 声量趋势展示的车型数，今日提及达到此前日均该倍数视为异动；
+    # 历史不足若干天或此前没有提及时日均没有参考意义，不标记异动
+    TREND_MODELS = 6
+    TREND_SPIKE_RATIO = 2.0
+    TREND_SPIKE_MIN_HISTORY_DAYS = 7
+    
+    def __init__(self, webhook_url: Optional[str] = None, secret: Optional[str] = None,
+                 outbox_path: str = "data/dingtalk_outbox.jsonl", hot_words=None, trends=None):
         """
         初始化推送器
         
         Args:
             webhook_url: 钉钉Webhook地址
+            secret: 钉钉加签密钥
+            outbox_path: 推送失败消息暂存文件
+            hot_words: 热词提取器（HotWordExtractor），不提供时按分析结果的关键词计数
+            trends: 声量趋势草图（TrendSketches），提供时日报附带车型声量趋势
         """
         self.webhook_url = webhook_url or os.getenv('DINGTALK_WEBHOOK_URL')
+        self.secret = secret or os.getenv('DINGTALK_SECRET')
+        self.hot_words = hot_words
+        self.trends = trends
+        self.delivery = None
         
         if not self.webhook_url:
             logger.warning("未设置钉钉Webhook URL")
+        else:
+            self.delivery = DingTalkDelivery(
+                self.webhook_url,
+                secret=self.secret,
+                outbox_path=outbox_path
+            )
     
     def push_daily_report(self, analyzed_articles: List[Dict]) -> bool:
         """
@@ -41,49 +64,29 @@ class DingTalkPusher:
             logger.error("钉钉Webhook URL未设置，无法推送")
             return False
         
+        # 先重放上次运行失败的消息
+        self.delivery.flush_outbox()
+        
         # 生成报告内容
         markdown = self._generate_report_markdown(analyzed_articles)
         
-        # 构造钉钉消息
-        message = {
-            "msgtype": "markdown",
-            "markdown": {
-                "title": "🚗 东风舆情监测日报",
-                "text": markdown
-            }
-        }
+        # 分片、限流、重试发送，失败分片进入outbox
+        if self.delivery.send_markdown(self.REPORT_TITLE, markdown):
+            logger.info("钉钉推送成功")
+            return True
         
-        try:
-            response = requests.post(
-                self.webhook_url,
-                json=message,
-                headers={'Content-Type': 'application/json'},
-                timeout=10
-            )
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            if result.get('errcode') == 0:
-                logger.info("钉钉推送成功")
-                return True
-            else:
-                logger.error(f"钉钉推送失败: {result}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"钉钉推送异常: {e}")
-            return False
+        logger.error("钉钉推送失败，未送达分片将在下次运行时重放")
+        return False
     
     def _generate_report_markdown(self, articles: List[Dict]) -> str:
         """生成报告Markdown内容"""
         # 报告头部
         now = datetime.now()
-        markdown = f"""# 🚗 东风舆情监测日报
+        markdown = f"""# {self.REPORT_TITLE}
 
 **监测时间**: {now.strftime('%Y年%m月%d日 %H:%M')}  
 **监测车型**: 艾力绅、HR-V、Inspire 及竞品  
-**今日动态**: 共发现 {len(articles)} 条相关信息
+**今日动态**: 共发现 {len(articles)} 条相关信息，涉及 {self._count_stories(articles)} 个事件
 
 ---
 
@@ -97,13 +100,20 @@ class DingTalkPusher:
         keywords = self._extract_top_keywords(articles, top_n=5)
         markdown += self._format_keywords_section(keywords)
         
+        # 车型声量趋势（30/90天）
+        if self.trends:
+            markdown += self._format_trend_section(self.trends.summary())
+        
+        # 同一事件只展示代表文章
+        stories = [a for a in articles if a.get('is_representative', True)]
+        
         # 本品负面预警
-        own_negatives = [a for a in articles if a.get('is_own_brand_negative', False)]
+        own_negatives = [a for a in stories if a.get('is_own_brand_negative', False)]
         if own_negatives:
             markdown += self._format_negative_section(own_negatives)
         
         # 竞品动态
-        competitor_articles = [a for a in articles if not a.get('is_own_brand_negative', False)]
+        competitor_articles = [a for a in stories if not a.get('is_own_brand_negative', False)]
         markdown += self._format_competitor_section(competitor_articles)
         
         # 报告尾部
@@ -117,6 +127,18 @@ class DingTalkPusher:
         
         return markdown
     
+    def _count_stories(self, articles: List[Dict]) -> int:
+        """统计事件数（未聚类时每条文章视为一个事件）"""
+        return sum(1 for a in articles if a.get('is_representative', True))
+    
+    def _format_coverage(self, article: Dict) -> str:
+        """格式化多源报道标记"""
+        size = article.get('cluster_size', 1)
+        if size <= 1:
+            return ""
+        sources = '、'.join(article.get('cluster_sources', [])[:3])
+        return f" | 📡 {size}条报道 ({sources})"
+    
     def _calculate_stats(self, articles: List[Dict]) -> Dict:
         """计算统计信息"""
         stats = {
@@ -163,7 +185,16 @@ class DingTalkPusher:
         return markdown
     
     def _extract_top_keywords(self, articles: List[Dict], top_n: int = 5) -> List[tuple]:
-        """提取TOP N关键词"""
+        """提取TOP N热词：优先使用本地热词提取，无结果时回退到关键词计数"""
+        if self.hot_words:
+            with profiler.stage('report.hot_words'):
+                # 每个事件只取代表文章的标题，同一事件的多源改写不重复计数
+                titles = [a['title'] for a in articles if a.get('is_representative', True)]
+                hot_words = self.hot_words.extract(titles, top_n=top_n)
+                self.hot_words.save()
+            if hot_words:
+                return hot_words
+        
         all_keywords = []
         
         for article in articles:
@@ -187,6 +218,31 @@ class DingTalkPusher:
         
         return markdown
     
+    def _format_trend_section(self, rows: List[Dict]) -> str:
+        """格式化车型声量趋势：今日提及相对此前日均明显放大时标记异动"""
+        if not rows:
+            return ""
+        
+        markdown = "## 📈 声量趋势\n\n"
+        
+        for row in rows[:self.TREND_MODELS]:
+            spike = ""
+            if (row['history_days'] >= self.TREND_SPIKE_MIN_HISTORY_DAYS and row['baseline'] > 0
+                    and row['today'] >= 3 and row['today'] >= self.TREND_SPIKE_RATIO * row['baseline']):
+                spike = f" 🔺异动（日均 {row['baseline']:.1f}）"
+            terms = "、".join(f"{term}({count})" for term, count in row['terms'])
+            
+            markdown += (
+                f"- **{row['model']}**: 今日 {row['today']} · 近30天 {row['last_30']} · "
+                f"近90天 {row['last_90']}{spike}\n"
+            )
+            if terms:
+                markdown += f"  - 近30天高频: {terms}\n"
+        
+        markdown += "\n---\n\n"
+        
+        return markdown
+    
     def _format_negative_section(self, articles: List[Dict]) -> str:
         """格式化本品负面预警"""
         if not articles:
@@ -204,7 +260,7 @@ class DingTalkPusher:
 
 > {summary}
 
-来源: {source} | [查看详情]({url})
+来源: {source}{self._format_coverage(article)} | [查看详情]({url})
 
 """
         
@@ -262,7 +318,7 @@ class DingTalkPusher:
 
 > {summary}
 
-来源: {source} | [查看详情]({url})
+来源: {source}{self._format_coverage(article)} | [查看详情]({url})
 
 """
                 shown_count += 1
@@ -0,0 +1,152 @@
+"""
+本地钉钉Webhook模拟服务 - 用于联调推送、限流与重试
+
+用法:
+    python -m src.reporter.mock_webhook --port 8765 --fail-rate 0.2 --rate-per-minute 20
+    DINGTALK_WEBHOOK_URL=http://127.0.0.1:8765/robot/send?access_token=test python src/main.py --mode full
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+# 钉钉markdown消息体上限
+MAX_MESSAGE_BYTES = 20000
+
+
+class MockDingTalkServer:
+    """钉钉Webhook模拟服务"""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        fail_rate: float = 0.0,
+        rate_per_minute: int = 20,
+        secret: Optional[str] = None
+    ):
+        """
+        初始化模拟服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示随机分配
+            fail_rate: 随机返回HTTP 500的概率
+            rate_per_minute: 每分钟允许的消息数，超出返回errcode 130101
+            secret: 设置后校验请求中的timestamp/sign参数
+        """
+        self.fail_rate = fail_rate
+        self.rate_per_minute = rate_per_minute
+        self.secret = secret
+        self.messages: List[dict] = []
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Webhook地址"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/robot/send?access_token=mock"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                status, result = server.handle(self.path, body)
+
+                payload = json.dumps(result, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def handle(self, path: str, body: bytes) -> tuple:
+        """处理一次推送请求，返回 (HTTP状态码, 响应JSON)"""
+        if random.random() < self.fail_rate:
+            return 500, {'errcode': -1, 'errmsg': 'mock server error'}
+
+        if self.secret and not self._check_sign(path):
+            return 200, {'errcode': 310000, 'errmsg': 'sign not match'}
+
+        if len(body) > MAX_MESSAGE_BYTES:
+            return 200, {'errcode': 460101, 'errmsg': 'message too long'}
+
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 60:
+                self._recent.popleft()
+
+            if len(self._recent) >= self.rate_per_minute:
+                return 200, {'errcode': 130101, 'errmsg': 'send too fast'}
+
+            self._recent.append(now)
+            self.messages.append(json.loads(body.decode('utf-8')))
+
+        return 200, {'errcode': 0, 'errmsg': 'ok'}
+
+    def _check_sign(self, path: str) -> bool:
+        """校验钉钉加签参数"""
+        from urllib.parse import parse_qs, urlparse
+        from .dingtalk_delivery import DingTalkDelivery
+
+        params = parse_qs(urlparse(path).query)
+        timestamp = params.get('timestamp', [''])[0]
+        sign = params.get('sign', [''])[0]
+        if not timestamp or not sign:
+            return False
+
+        expected = DingTalkDelivery.compute_sign(self.secret, timestamp)
+        return sign == expected
+
+    def start(self) -> 'MockDingTalkServer':
+        """后台线程启动服务"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def serve_forever(self):
+        """前台运行服务"""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地钉钉Webhook模拟服务')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='监听地址')
+    parser.add_argument('--port', type=int, default=8765, help='监听端口')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='随机失败概率')
+    parser.add_argument('--rate-per-minute', type=int, default=20, help='每分钟允许消息数')
+    parser.add_argument('--secret', type=str, default=None, help='加签密钥')
+    args = parser.parse_args()
+
+    server = MockDingTalkServer(args.host, args.port, args.fail_rate, args.rate_per_minute, args.secret)
+    print(f"钉钉模拟服务已启动: {server.url}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
 """工具函数模块"""
-from .logger import logger, setup_logger
+from .logger import logger, setup_logger, configure_logging
 from .cache import DedupCache
 
-__all__ = ['logger', 'setup_logger', 'DedupCache']
+__all__ = ['logger', 'setup_logger', 'configure_logging', 'DedupCache']
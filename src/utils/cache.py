@@ -4,10 +4,12 @@
 import hashlib
 import json
 import sqlite3
+from collections import defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
+from .cuckoo_filter import ScalableCuckooFilter
 from .logger import logger
 
 
@@ -26,6 +28,11 @@ class DedupCache:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.expire_days = expire_days
         self._init_db()
+        
+        # article_cache 的内存前置过滤器：未命中即确定不存在，不查SQLite
+        self.filter_path = self.db_path.with_suffix('.filter')
+        self.filter: Optional[ScalableCuckooFilter] = None
+        self._load_filter()
     
     def _init_db(self):
         """初始化数据库表"""
@@ -41,6 +48,15 @@ class DedupCache:
             )
         ''')
         
+        # 实时预警推送记录（用于同一事件的防抖）
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS alert_history (
+                hash TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
         conn.commit()
         conn.close()
         logger.info(f"缓存数据库初始化完成: {self.db_path}")
@@ -49,6 +65,58 @@ class DedupCache:
         """生成文本哈希值"""
         return hashlib.md5(text.encode('utf-8')).hexdigest()
     
+    # ========== 前置过滤器 ==========
+    # 过滤器与 article_cache 的对应关系用 (行数, 最大rowid) 校验：
+    # 加载后只补入 rowid 更大的新行，补完行数仍对不上（其他进程删除/替换过）时全量重建。
+    
+    @staticmethod
+    def _table_token(conn: sqlite3.Connection) -> list:
+        """article_cache 的 (行数, 最大rowid)"""
+        count, max_rowid = conn.execute('SELECT COUNT(*), MAX(rowid) FROM article_cache').fetchone()
+        return [count, max_rowid or 0]
+    
+    def _load_filter(self):
+        """加载持久化的过滤器并与数据库同步"""
+        self.filter, token = ScalableCuckooFilter.load(self.filter_path)
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self._sync_filter(conn, token)
+        finally:
+            conn.close()
+    
+    def _sync_filter(self, conn: sqlite3.Connection, token: Optional[list]):
+        """
+        补入 token 之后新增的行，无法对齐时全量重建
+        
+        Args:
+            conn: 数据库连接
+            token: 过滤器对应的 (行数, 最大rowid)，None 表示过滤器不可用
+        """
+        current = self._table_token(conn)
+        
+        if self.filter is not None and token is not None:
+            rows = conn.execute('SELECT hash FROM article_cache WHERE rowid > ?', (token[1],)).fetchall()
+            for (hash_value,) in rows:
+                self.filter.add(hash_value)
+            if token[0] + len(rows) == current[0]:
+                return
+            logger.info("去重过滤器与数据库不一致，重新构建")
+        
+        self.filter = ScalableCuckooFilter(initial_capacity=max(current[0] * 2, 65536))
+        for (hash_value,) in conn.execute('SELECT hash FROM article_cache'):
+            self.filter.add(hash_value)
+    
+    def save_filter(self):
+        """持久化前置过滤器"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            token = self._table_token(conn)
+        finally:
+            conn.close()
+        
+        self.filter.save(self.filter_path, token)
+    
     def exists(self, title: str) -> bool:
         """
         检查标题是否已存在
@@ -61,6 +129,10 @@ class DedupCache:
         """
         hash_value = self._generate_hash(title)
         
+        # 绝大多数新标题在内存中即可判定
+        if hash_value not in self.filter:
+            return False
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
@@ -88,16 +160,69 @@ class DedupCache:
         cursor = conn.cursor()
         
         try:
+            is_new = cursor.execute(
+                'SELECT 1 FROM article_cache WHERE hash = ?', (hash_value,)
+            ).fetchone() is None
             cursor.execute(
                 'INSERT OR REPLACE INTO article_cache (hash, title, url) VALUES (?, ?, ?)',
                 (hash_value, title, url)
             )
             conn.commit()
+            
+            # 过滤器只写入新键，保证删除时一一对应
+            if is_new:
+                self.filter.add(hash_value)
         except sqlite3.Error as e:
             logger.error(f"缓存添加失败: {e}")
         finally:
             conn.close()
     
+    def add_alert(self, title: str):
+        """
+        记录一次实时预警推送
+        
+        Args:
+            title: 预警文章标题
+        """
+        hash_value = self._generate_hash(title)
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                'INSERT OR REPLACE INTO alert_history (hash, title, timestamp) VALUES (?, ?, ?)',
+                (hash_value, title, datetime.now().isoformat())
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"预警记录添加失败: {e}")
+        finally:
+            conn.close()
+    
+    def get_recent_alerts(self, hours: float) -> List[str]:
+        """
+        获取近期已推送预警的标题
+        
+        Args:
+            hours: 回溯小时数
+            
+        Returns:
+            标题列表
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute(
+            'SELECT title FROM alert_history WHERE timestamp > ?',
+            ((datetime.now() - timedelta(hours=hours)).isoformat(),)
+        )
+        titles = [row[0] for row in cursor.fetchall()]
+        
+        conn.close()
+        
+        return titles
+    
     def clean_expired(self):
         """清理过期缓存"""
         expire_date = datetime.now() - timedelta(days=self.expire_days)
@@ -105,12 +230,25 @@ class DedupCache:
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
+        expired = cursor.execute(
+            'SELECT hash FROM article_cache WHERE timestamp < ?',
+            (expire_date.isoformat(),)
+        ).fetchall()
+        for (hash_value,) in expired:
+            self.filter.remove(hash_value)
+        
         cursor.execute(
             'DELETE FROM article_cache WHERE timestamp < ?',
             (expire_date.isoformat(),)
         )
         
         deleted = cursor.rowcount
+        
+        cursor.execute(
+            'DELETE FROM alert_history WHERE timestamp < ?',
+            (expire_date.isoformat(),)
+        )
+        
         conn.commit()
         conn.close()
         
@@ -143,3 +281,109 @@ class DedupCache:
             'cached_today': today,
             'expire_days': self.expire_days
         }
+    
+    # ========== 文本分片导入/导出 ==========
+    # 缓存内容按天导出为纯文本分片（state/<表>/YYYY-MM-DD.tsv，按哈希排序），
+    # 替代把二进制的 dedup.db 提交到git：历史分片基本不变，diff只包含当天新增行；
+    # 并发运行产生的分片可以直接按行合并（.gitattributes 设置 merge=union），
+    # 导入时同一哈希保留最晚时间（与 INSERT OR REPLACE 的语义一致），合并结果与顺序无关。
+    
+    # 表名 → 分片列（article_cache只保存指纹，标题/链接不参与去重判断）
+    SEGMENT_TABLES = {
+        'article_cache': ('hash', 'timestamp'),
+        'alert_history': ('hash', 'timestamp', 'title'),
+    }
+    
+    def import_segments(self, state_dir: str = "state") -> int:
+        """
+        从文本分片批量导入缓存
+        
+        Args:
+            state_dir: 分片根目录
+            
+        Returns:
+            读取的记录数
+        """
+        root = Path(state_dir)
+        if not root.exists():
+            return 0
+        
+        conn = sqlite3.connect(self.db_path)
+        token = self._table_token(conn)
+        total = 0
+        
+        try:
+            for table, columns in self.SEGMENT_TABLES.items():
+                # article_cache 分片不保存标题，title 列以空字符串占位
+                padding = [] if 'title' in columns else ['']
+                rows = []
+                for shard in sorted((root / table).glob('*.tsv')):
+                    with open(shard, 'r', encoding='utf-8') as f:
+                        for line in f:
+                            fields = line.rstrip('\n').split('\t')
+                            if len(fields) == len(columns):
+                                rows.append(fields + padding)
+                
+                conn.executemany(
+                    f'INSERT INTO {table} (hash, timestamp, title) VALUES (?, ?, ?) '
+                    f'ON CONFLICT(hash) DO UPDATE SET timestamp = MAX(timestamp, excluded.timestamp)',
+                    rows
+                )
+                total += len(rows)
+            
+            conn.commit()
+            self._sync_filter(conn, token)
+        finally:
+            conn.close()
+        
+        logger.info(f"从状态分片导入缓存: {total} 条 ({root})")
+        return total
+    
+    def export_segments(self, state_dir: str = "state") -> int:
+        """
+        将缓存导出为按天分片的文本文件
+        
+        只重写内容有变化的分片，并删除已过期日期的分片
+        
+        Args:
+            state_dir: 分片根目录
+            
+        Returns:
+            改写的分片数
+        """
+        root = Path(state_dir)
+        expire_day = (datetime.now() - timedelta(days=self.expire_days)).strftime('%Y-%m-%d')
+        changed = 0
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for table, columns in self.SEGMENT_TABLES.items():
+                cursor = conn.execute(f'SELECT {", ".join(columns)} FROM {table} ORDER BY hash')
+                
+                shards: Dict[str, List[str]] = defaultdict(list)
+                for row in cursor:
+                    fields = [str(v).replace('\t', ' ').replace('\n', ' ') for v in row]
+                    shards[fields[1][:10]].append('\t'.join(fields) + '\n')
+                
+                table_dir = root / table
+                table_dir.mkdir(parents=True, exist_ok=True)
+                
+                for day, lines in shards.items():
+                    shard = table_dir / f"{day}.tsv"
+                    content = ''.join(lines)
+                    if shard.exists() and shard.read_text(encoding='utf-8') == content:
+                        continue
+                    shard.write_text(content, encoding='utf-8')
+                    changed += 1
+                
+                for shard in table_dir.glob('*.tsv'):
+                    if shard.stem < expire_day and shard.stem not in shards:
+                        shard.unlink()
+                        changed += 1
+        finally:
+            conn.close()
+        
+        self.save_filter()
+        
+        logger.info(f"缓存已导出到状态分片: 改写 {changed} 个分片 ({root})")
+        return changed
@@ -0,0 +1,205 @@
+"""
+可扩展布谷鸟过滤器 - 去重查询的内存前置判断
+
+以十六进制哈希（如标题的md5）为键：不在过滤器中的一定没见过，直接返回；
+在过滤器中的才需要查SQLite确认（16位指纹，误判率约万分之一）。
+与布隆过滤器不同，布谷鸟过滤器支持删除，可以跟随缓存过期一起清理。
+装载率达到上限时追加一个容量翻倍的子过滤器，不需要预先知道总量。
+"""
+import json
+import os
+import random
+import sys
+from array import array
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+class CuckooFilter:
+    """固定容量的布谷鸟过滤器（每桶4个16位指纹，0表示空位）"""
+
+    BUCKET_SIZE = 4
+    # 最大踢出次数，超过后视为已满
+    MAX_KICKS = 500
+    # 装载率上限，达到后不再写入（每桶4格时理论上限约95%）
+    MAX_LOAD = 0.9
+
+    def __init__(self, num_buckets: int, slots: Optional[array] = None, count: int = 0):
+        """
+        Args:
+            num_buckets: 桶数（2的幂）
+            slots: 已有指纹数组（反序列化时使用）
+            count: 已有指纹数
+        """
+        self.num_buckets = num_buckets
+        self.mask = num_buckets - 1
+        self.slots = slots if slots is not None else array('H', bytes(2 * num_buckets * self.BUCKET_SIZE))
+        self.count = count
+
+    @property
+    def full(self) -> bool:
+        """是否已达到装载率上限"""
+        return self.count >= self.MAX_LOAD * len(self.slots)
+
+    def _alt_index(self, index: int, fingerprint: int) -> int:
+        """指纹的另一个候选桶（对称，两次得到原桶）"""
+        return (index ^ (fingerprint * 0x5bd1e995)) & self.mask
+
+    def _bucket(self, index: int) -> array:
+        """桶内的指纹"""
+        start = index * self.BUCKET_SIZE
+        return self.slots[start:start + self.BUCKET_SIZE]
+
+    def contains(self, index: int, fingerprint: int) -> bool:
+        """是否可能包含"""
+        index &= self.mask
+        return fingerprint in self._bucket(index) or fingerprint in self._bucket(self._alt_index(index, fingerprint))
+
+    def _put(self, index: int, fingerprint: int) -> bool:
+        """放入桶的空位"""
+        start = index * self.BUCKET_SIZE
+        for slot in range(start, start + self.BUCKET_SIZE):
+            if self.slots[slot] == 0:
+                self.slots[slot] = fingerprint
+                return True
+        return False
+
+    def add(self, index: int, fingerprint: int) -> bool:
+        """
+        写入一个指纹
+
+        Returns:
+            是否写入成功；失败时过滤器内容保持不变
+        """
+        index &= self.mask
+        alt = self._alt_index(index, fingerprint)
+        if self._put(index, fingerprint) or self._put(alt, fingerprint):
+            self.count += 1
+            return True
+
+        # 两个候选桶都满：随机踢出已有指纹到它的另一个桶，失败时按原路径回滚
+        path: List[Tuple[int, int]] = []
+        index = random.choice((index, alt))
+        for _ in range(self.MAX_KICKS):
+            slot = index * self.BUCKET_SIZE + random.randrange(self.BUCKET_SIZE)
+            path.append((slot, self.slots[slot]))
+            fingerprint, self.slots[slot] = self.slots[slot], fingerprint
+            index = self._alt_index(index, fingerprint)
+            if self._put(index, fingerprint):
+                self.count += 1
+                return True
+
+        for slot, previous in reversed(path):
+            self.slots[slot] = previous
+        return False
+
+    def remove(self, index: int, fingerprint: int) -> bool:
+        """删除一个指纹（只能删除确实写入过的键）"""
+        index &= self.mask
+        for bucket in (index, self._alt_index(index, fingerprint)):
+            start = bucket * self.BUCKET_SIZE
+            for slot in range(start, start + self.BUCKET_SIZE):
+                if self.slots[slot] == fingerprint:
+                    self.slots[slot] = 0
+                    self.count -= 1
+                    return True
+        return False
+
+
+class ScalableCuckooFilter:
+    """可扩展布谷鸟过滤器：由容量依次翻倍的子过滤器组成"""
+
+    FILE_VERSION = 1
+
+    def __init__(self, initial_capacity: int = 65536, filters: Optional[List[CuckooFilter]] = None):
+        """
+        Args:
+            initial_capacity: 第一个子过滤器的预期容量
+            filters: 已有子过滤器（反序列化时使用）
+        """
+        if filters:
+            self.filters = filters
+        else:
+            buckets = 1
+            while buckets * CuckooFilter.BUCKET_SIZE * CuckooFilter.MAX_LOAD < initial_capacity:
+                buckets *= 2
+            self.filters = [CuckooFilter(buckets)]
+
+    def __len__(self) -> int:
+        return sum(f.count for f in self.filters)
+
+    @staticmethod
+    def _split(hash_hex: str) -> Tuple[int, int]:
+        """十六进制哈希拆分为桶索引与非零16位指纹"""
+        return int(hash_hex[:8], 16), int(hash_hex[8:12], 16) or 1
+
+    def __contains__(self, hash_hex: str) -> bool:
+        index, fingerprint = self._split(hash_hex)
+        return any(f.contains(index, fingerprint) for f in self.filters)
+
+    def add(self, hash_hex: str):
+        """写入一个键，当前子过滤器已满时追加容量翻倍的子过滤器"""
+        index, fingerprint = self._split(hash_hex)
+        current = self.filters[-1]
+        if current.full or not current.add(index, fingerprint):
+            current = CuckooFilter(current.num_buckets * 2)
+            self.filters.append(current)
+            current.add(index, fingerprint)
+
+    def remove(self, hash_hex: str) -> bool:
+        """删除一个键"""
+        index, fingerprint = self._split(hash_hex)
+        return any(f.remove(index, fingerprint) for f in reversed(self.filters))
+
+    def save(self, path: str, token: list):
+        """
+        持久化：一行JSON头 + 各子过滤器的指纹数组
+
+        Args:
+            path: 文件路径
+            token: 与数据源对应的校验信息，加载时用于判断是否过期
+        """
+        path = Path(path)
+        header = {
+            'version': self.FILE_VERSION,
+            'byteorder': sys.byteorder,
+            'token': token,
+            'filters': [[f.num_buckets, f.count] for f in self.filters]
+        }
+        tmp_path = path.with_suffix('.tmp')
+
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            for sub in self.filters:
+                sub.slots.tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple[Optional['ScalableCuckooFilter'], Optional[list]]:
+        """
+        加载持久化的过滤器
+
+        Returns:
+            (过滤器, 校验信息)，文件不存在或格式不符时为 (None, None)
+        """
+        path = Path(path)
+        if not path.exists():
+            return None, None
+
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                if header.get('version') != cls.FILE_VERSION:
+                    return None, None
+
+                filters = []
+                for num_buckets, count in header['filters']:
+                    slots = array('H')
+                    slots.fromfile(f, num_buckets * CuckooFilter.BUCKET_SIZE)
+                    if header['byteorder'] != sys.byteorder:
+                        slots.byteswap()
+                    filters.append(CuckooFilter(num_buckets, slots, count))
+        except (OSError, ValueError, KeyError, EOFError):
+            return None, None
+
+        return cls(filters=filters), header['token']
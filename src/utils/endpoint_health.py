@@ -0,0 +1,187 @@
+"""
+端点健康度跟踪 - 熔断器、基于p95延迟的自适应超时、采集截止时间
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from .logger import logger
+
+
+class Deadline:
+    """阶段截止时间"""
+
+    def __init__(self, seconds: Optional[float]):
+        """
+        初始化截止时间
+
+        Args:
+            seconds: 时间预算（秒），None 表示不限
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds if seconds else None
+
+    def remaining(self) -> float:
+        """剩余秒数"""
+        if self.expires_at is None:
+            return float('inf')
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        """是否已到期"""
+        return self.remaining() <= 0
+
+
+class EndpointHealth:
+    """端点健康度跟踪器，状态持久化到JSON文件，跨运行保留"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    # 每个端点保留的延迟样本数
+    MAX_SAMPLES = 50
+
+    def __init__(
+        self,
+        state_path: Optional[str] = "data/endpoint_health.json",
+        failure_threshold: int = 3,
+        cooldown_minutes: float = 30,
+        default_timeout: float = 10.0,
+        min_timeout: float = 2.0,
+        max_timeout: float = 10.0,
+        timeout_multiplier: float = 2.0,
+        min_samples: int = 5
+    ):
+        """
+        初始化健康度跟踪器
+
+        Args:
+            state_path: 状态文件路径，None 表示不持久化
+            failure_threshold: 连续失败多少次后熔断
+            cooldown_minutes: 熔断后多久放行一次探测请求
+            default_timeout: 样本不足时的超时（秒）
+            min_timeout: 自适应超时下限（秒）
+            max_timeout: 自适应超时上限（秒）
+            timeout_multiplier: 超时 = p95延迟 × 该系数
+            min_samples: 启用自适应超时所需的最少样本数
+        """
+        self.state_path = Path(state_path) if state_path else None
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_minutes * 60
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+        self.endpoints: Dict[str, dict] = self._load()
+
+    @classmethod
+    def from_config(cls, collection_config: dict,
+                    state_path: Optional[str] = "data/endpoint_health.json") -> 'EndpointHealth':
+        """从 sources.yaml 的 collection_config 构建"""
+        breaker = collection_config.get('circuit_breaker', {})
+        adaptive = collection_config.get('adaptive_timeout', {})
+        default_timeout = collection_config.get('request_timeout', 10)
+
+        return cls(
+            state_path=state_path,
+            failure_threshold=breaker.get('failure_threshold', 3),
+            cooldown_minutes=breaker.get('cooldown_minutes', 30),
+            default_timeout=default_timeout,
+            min_timeout=adaptive.get('min_timeout', 2.0),
+            max_timeout=adaptive.get('max_timeout', default_timeout),
+            timeout_multiplier=adaptive.get('multiplier', 2.0)
+        )
+
+    def _load(self) -> Dict[str, dict]:
+        """加载持久化状态"""
+        if not self.state_path or not self.state_path.exists():
+            return {}
+
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"端点健康状态加载失败，重新统计: {e}")
+            return {}
+
+    def save(self):
+        """持久化状态"""
+        if not self.state_path:
+            return
+
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.endpoints, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def _get(self, endpoint: str) -> dict:
+        return self.endpoints.setdefault(endpoint, {
+            'state': self.CLOSED,
+            'consecutive_failures': 0,
+            'opened_at': 0.0,
+            'latencies': []
+        })
+
+    def allow(self, endpoint: str) -> bool:
+        """
+        是否允许请求该端点
+
+        熔断期内拒绝；冷却结束后进入半开状态放行一次探测
+        """
+        state = self._get(endpoint)
+
+        if state['state'] == self.OPEN:
+            if time.time() - state['opened_at'] < self.cooldown_seconds:
+                return False
+            state['state'] = self.HALF_OPEN
+            logger.info(f"[熔断] {endpoint} 冷却结束，放行探测请求")
+
+        return True
+
+    def latency_percentile(self, endpoint: str, q: float = 0.95) -> Optional[float]:
+        """历史延迟的分位数（秒），样本不足时为None"""
+        latencies = self._get(endpoint)['latencies']
+        if len(latencies) < self.min_samples:
+            return None
+
+        ordered = sorted(latencies)
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+    def timeout_for(self, endpoint: str) -> float:
+        """基于历史p95延迟计算自适应超时"""
+        p95 = self.latency_percentile(endpoint)
+        if p95 is None:
+            return self.default_timeout
+
+        return min(max(p95 * self.timeout_multiplier, self.min_timeout), self.max_timeout)
+
+    def record_success(self, endpoint: str, latency: float):
+        """记录成功请求"""
+        state = self._get(endpoint)
+
+        if state['state'] != self.CLOSED:
+            logger.info(f"[熔断] {endpoint} 已恢复")
+
+        state['state'] = self.CLOSED
+        state['consecutive_failures'] = 0
+        state['latencies'] = (state['latencies'] + [round(latency, 3)])[-self.MAX_SAMPLES:]
+
+    def record_failure(self, endpoint: str):
+        """记录失败请求，连续失败达到阈值或探测失败时熔断"""
+        state = self._get(endpoint)
+        state['consecutive_failures'] += 1
+
+        if state['state'] == self.HALF_OPEN or state['consecutive_failures'] >= self.failure_threshold:
+            if state['state'] != self.OPEN:
+                logger.warning(
+                    f"[熔断] {endpoint} 连续失败 {state['consecutive_failures']} 次，"
+                    f"熔断 {self.cooldown_seconds / 60:.0f} 分钟"
+                )
+            state['state'] = self.OPEN
+            state['opened_at'] = time.time()
@@ -0,0 +1,111 @@
+"""
+网页正文提取 - 基于正则的快速去模板
+
+不构建DOM树：先整段去掉脚本、样式、导航、页眉页脚等区域，再按块级标签切分，
+每块去标签后按长度、链接文字占比与句末标点判断是否为正文段落。
+对新闻详情页足够准确，单页耗时在毫秒级，适合批量抓取后的即时处理。
+"""
+import html
+import re
+from typing import Optional
+
+# 整段丢弃的区域
+DROP_PATTERN = re.compile(
+    r'<(script|style|noscript|template|svg|iframe|form|nav|header|footer|aside|select|button)\b[^>]*>.*?</\1\s*>'
+    r'|<!--.*?-->',
+    re.S | re.I
+)
+
+# 按块级标签切分
+BLOCK_PATTERN = re.compile(r'<(?:/?(?:p|div|section|article|li|ul|ol|h[1-6]|table|tr|td|blockquote)|br\s*/?)\b[^>]*>', re.I)
+
+LINK_PATTERN = re.compile(r'<a\b[^>]*>(.*?)</a\s*>', re.S | re.I)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+SPACE_PATTERN = re.compile(r'\s+')
+
+# 正文段落的句末标点
+SENTENCE_PUNCT = re.compile(r'[。！？；，,.!?;]')
+
+# 页面声明的编码
+META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+# 常见的版权、免责与分享提示
+NOISE_PATTERN = re.compile(r'版权所有|未经授权|免责声明|责任编辑|扫一扫|分享到|点击查看|相关阅读|copyright', re.I)
+
+
+def decode_html(raw: bytes, declared: Optional[str] = None) -> str:
+    """
+    网页字节解码：响应头声明的编码优先，其次页面meta声明，再依次尝试 utf-8、gb18030；
+    末尾被截断的半个字符直接丢弃
+
+    Args:
+        raw: 网页字节
+        declared: 响应头 Content-Type 中的charset
+    """
+    candidates = []
+    if declared:
+        candidates.append(declared)
+    match = META_CHARSET_PATTERN.search(raw[:4096])
+    if match:
+        candidates.append(match.group(1).decode('ascii', errors='ignore'))
+    candidates.extend(['utf-8', 'gb18030'])
+
+    for encoding in candidates:
+        try:
+            return raw.decode(encoding)
+        except LookupError:
+            continue
+        except UnicodeDecodeError as e:
+            # 按字节上限截断的页面末尾可能是半个字符
+            if e.start >= len(raw) - 4:
+                return raw[:e.start].decode(encoding, errors='replace')
+            continue
+    return raw.decode('utf-8', errors='replace')
+
+
+def _strip_tags(fragment: str) -> str:
+    """去标签、反转义并压缩空白"""
+    return SPACE_PATTERN.sub(' ', html.unescape(TAG_PATTERN.sub('', fragment))).strip()
+
+
+def extract_main_text(page: str, max_chars: int = 2000, min_block_chars: int = 20,
+                      max_link_ratio: float = 0.3) -> str:
+    """
+    提取网页正文
+
+    Args:
+        page: 网页HTML
+        max_chars: 正文最大字数
+        min_block_chars: 段落最少字数
+        max_link_ratio: 段落中链接文字占比上限（超过视为导航/推荐列表）
+
+    Returns:
+        正文段落按换行连接，未识别出正文时为空字符串
+    """
+    body_start = page.lower().find('<body')
+    if body_start >= 0:
+        page = page[body_start:]
+    page = DROP_PATTERN.sub(' ', page)
+
+    paragraphs = []
+    total = 0
+    seen = set()
+
+    for block in BLOCK_PATTERN.split(page):
+        text = _strip_tags(block)
+        if len(text) < min_block_chars or text in seen:
+            continue
+
+        link_chars = sum(len(_strip_tags(link)) for link in LINK_PATTERN.findall(block))
+        if link_chars > max_link_ratio * len(text):
+            continue
+        if not SENTENCE_PUNCT.search(text) or NOISE_PATTERN.search(text):
+            continue
+
+        seen.add(text)
+        paragraphs.append(text)
+        total += len(text)
+        if total >= max_chars:
+            break
+
+    return '\n'.join(paragraphs)[:max_chars]
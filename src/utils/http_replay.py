@@ -0,0 +1,238 @@
+"""
+HTTP录制/回放 - 采集层的可复现离线测试与性能基准
+
+录制模式下透传真实请求，并把响应写入gzip压缩的JSON Lines磁带；
+回放模式下从磁带返回响应，可模拟延迟、抖动与错误率。
+所有采集器通过 create_session() 获取会话，无需感知当前模式。
+"""
+import base64
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+import requests
+
+from .logger import logger
+
+
+CASSETTE_FILE = 'cassette.jsonl.gz'
+
+# 全局模式配置，由 configure() 设置
+_settings = {'mode': None}
+
+
+def configure(mode: Optional[str], cassette_dir: Optional[str] = None, latency_ms: Optional[float] = None,
+              jitter_ms: float = 0.0, error_rate: float = 0.0):
+    """
+    设置录制/回放模式
+
+    Args:
+        mode: 'record' / 'replay' / None（直连）
+        cassette_dir: 磁带目录
+        latency_ms: 回放固定延迟（毫秒），None 表示使用录制时的真实延迟
+        jitter_ms: 回放延迟随机抖动（毫秒）
+        error_rate: 回放时随机返回 503 的概率
+    """
+    if mode not in (None, 'record', 'replay'):
+        raise ValueError(f"不支持的HTTP磁带模式: {mode}")
+
+    _settings.update({
+        'mode': mode,
+        'cassette_dir': cassette_dir,
+        'latency_ms': latency_ms,
+        'jitter_ms': jitter_ms,
+        'error_rate': error_rate,
+        'cassette': None
+    })
+
+    if mode:
+        logger.info(f"HTTP磁带模式: {mode} ({cassette_dir})")
+
+
+def configure_from_env():
+    """从环境变量读取配置（HTTP_CASSETTE_MODE/HTTP_CASSETTE_DIR/HTTP_REPLAY_*）"""
+    mode = os.getenv('HTTP_CASSETTE_MODE')
+    if not mode:
+        return
+
+    latency = os.getenv('HTTP_REPLAY_LATENCY_MS')
+    configure(
+        mode,
+        os.getenv('HTTP_CASSETTE_DIR', 'cassettes/default'),
+        latency_ms=float(latency) if latency else None,
+        jitter_ms=float(os.getenv('HTTP_REPLAY_JITTER_MS', 0)),
+        error_rate=float(os.getenv('HTTP_REPLAY_ERROR_RATE', 0))
+    )
+
+
+def is_replaying() -> bool:
+    """当前是否处于回放模式"""
+    return _settings['mode'] == 'replay'
+
+
+def create_session():
+    """按当前模式创建会话：直连 requests.Session / 录制会话 / 回放会话"""
+    mode = _settings['mode']
+    if mode is None:
+        return requests.Session()
+
+    if _settings['cassette'] is None:
+        _settings['cassette'] = Cassette(Path(_settings['cassette_dir']) / CASSETTE_FILE)
+
+    if mode == 'record':
+        return RecordingSession(_settings['cassette'])
+
+    return ReplaySession(
+        _settings['cassette'],
+        latency_ms=_settings['latency_ms'],
+        jitter_ms=_settings['jitter_ms'],
+        error_rate=_settings['error_rate']
+    )
+
+
+def request_key(method: str, url: str, params: Optional[dict] = None) -> str:
+    """请求唯一键：方法 + URL + 排序后的查询参数"""
+    if params:
+        separator = '&' if '?' in url else '?'
+        url = f"{url}{separator}{urlencode(sorted(params.items()))}"
+    return f"{method.upper()} {url}"
+
+
+class Cassette:
+    """磁带文件（gzip压缩的JSON Lines，每行一次请求的响应）"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[dict]] = defaultdict(list)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+
+        if self.path.exists():
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry['key']].append(entry)
+            logger.info(f"加载HTTP磁带: {self.path} ({sum(len(v) for v in self._entries.values())} 条)")
+        else:
+            logger.warning(f"HTTP磁带不存在: {self.path}")
+
+        self._loaded = True
+
+    def append(self, entry: dict):
+        """追加一条录制记录（gzip多成员追加写）"""
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def next_entry(self, key: str) -> Optional[dict]:
+        """取该请求的下一条录制响应，多次请求同一地址时按录制顺序循环"""
+        with self._lock:
+            self._load()
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            index = self._cursor[key] % len(entries)
+            self._cursor[key] += 1
+            return entries[index]
+
+
+class ReplayResponse:
+    """回放响应，提供采集器用到的 requests.Response 接口子集"""
+
+    def __init__(self, url: str, status_code: int, content: bytes, headers: Optional[dict] = None,
+                 encoding: Optional[str] = None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+        self.encoding = encoding or 'utf-8'
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+class RecordingSession(requests.Session):
+    """录制会话：真实请求并把响应写入磁带"""
+
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def get(self, url, params=None, **kwargs):
+        start = time.monotonic()
+        response = super().get(url, params=params, **kwargs)
+
+        self.cassette.append({
+            'key': request_key('GET', url, params),
+            'status': response.status_code,
+            'headers': {'Content-Type': response.headers.get('Content-Type', '')},
+            'encoding': response.encoding,
+            'body': base64.b64encode(response.content).decode('ascii'),
+            'latency': round(time.monotonic() - start, 4)
+        })
+
+        return response
+
+
+class ReplaySession:
+    """回放会话：从磁带返回响应，模拟延迟、抖动与错误"""
+
+    def __init__(self, cassette: Cassette, latency_ms: Optional[float] = None,
+                 jitter_ms: float = 0.0, error_rate: float = 0.0):
+        self.cassette = cassette
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        key = request_key('GET', url, params)
+        entry = self.cassette.next_entry(key)
+
+        if entry is None:
+            raise requests.ConnectionError(f"HTTP磁带中无此请求: {key}")
+
+        latency = entry.get('latency', 0.0) if self.latency_ms is None else self.latency_ms / 1000
+        latency = max(latency + random.uniform(-self.jitter_ms, self.jitter_ms) / 1000, 0.0)
+
+        # 超过调用方超时则按超时处理
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise requests.Timeout(f"回放模拟超时: {key}")
+
+        time.sleep(latency)
+
+        if random.random() < self.error_rate:
+            return ReplayResponse(url, 503, b'', {})
+
+        return ReplayResponse(
+            url,
+            entry['status'],
+            base64.b64decode(entry['body']),
+            entry.get('headers'),
+            entry.get('encoding')
+        )
+
+    def close(self):
+        pass
@@ -1,45 +1,247 @@
 """
 日志模块
+
+日志调用只把记录放入内存队列，由后台监听线程写控制台（及可选的JSON Lines文件），
+采集、分析线程不再因控制台I/O互相等待。入队前按阶段（调用方所在的包：
+collectors/filters/analyzer/reporter/utils，入口模块按文件名）过滤级别，
+并对高频的DEBUG行按调用位置抽样：每个位置前若干条全部保留，之后每N条保留一条。
 """
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Optional
+
+# 按所在包划分的阶段
+STAGE_PACKAGES = ('collectors', 'filters', 'analyzer', 'reporter', 'utils')
+
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+@lru_cache(maxsize=256)
+def stage_of(pathname: str) -> str:
+    """调用方源文件所属的阶段"""
+    path = Path(pathname)
+    for part in reversed(path.parts[:-1]):
+        if part in STAGE_PACKAGES:
+            return part
+    return path.stem
+
+
+def _level(value, default: int) -> int:
+    """级别名或数值转为数值级别"""
+    if value is None:
+        return default
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).upper())
+    return level if isinstance(level, int) else default
+
+
+class StageLevelFilter(logging.Filter):
+    """按阶段过滤级别，并在记录上标注阶段（record.stage）"""
+
+    def __init__(self, default_level: int = logging.INFO, stage_levels: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            default_level: 未单独配置的阶段使用的级别
+            stage_levels: 阶段 → 级别
+        """
+        super().__init__()
+        self.default_level = default_level
+        self.stage_levels = stage_levels or {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.stage = stage_of(record.pathname)
+        return record.levelno >= self.stage_levels.get(record.stage, self.default_level)
+
+
+class SamplingFilter(logging.Filter):
+    """高频日志抽样：按调用位置计数，前 first 条保留，之后每 every 条保留一条"""
+
+    def __init__(self, first: int = 5, every: int = 100, max_level: int = logging.DEBUG):
+        """
+        Args:
+            first: 每个调用位置完整保留的条数
+            every: 超过后每多少条保留一条（<=1 表示不抽样）
+            max_level: 参与抽样的最高级别（默认只抽样DEBUG）
+        """
+        super().__init__()
+        self.first = first
+        self.every = every
+        self.max_level = max_level
+        self.counts: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or self.every <= 1:
+            return True
+
+        site = (record.pathname, record.lineno)
+        with self._lock:
+            count = self.counts.get(site, 0) + 1
+            self.counts[site] = count
+
+        if count <= self.first or (count - self.first) % self.every == 0:
+            if count > self.first:
+                record.msg = f"{record.msg} (抽样: 该位置第 {count} 条)"
+            return True
+        return False
+
+    def suppressed(self) -> Dict[str, int]:
+        """各调用位置被抽样丢弃的条数"""
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            f"{Path(path).name}:{line}": count - self.first - (count - self.first) // self.every
+            for (path, line), count in counts.items()
+            if count > self.first
+        }
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """每条日志一行JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'stage': getattr(record, 'stage', stage_of(record.pathname)),
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _AsyncLogging:
+    """队列日志的全局状态：入队handler、过滤器与后台监听线程"""
+
+    def __init__(self, logger: logging.Logger, level: int):
+        self.logger = logger
+        self.queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self.stage_filter = StageLevelFilter(level)
+        self.sampling = SamplingFilter()
+
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        self.queue_handler.addFilter(self.stage_filter)
+        self.queue_handler.addFilter(self.sampling)
+
+        self.console_handler = logging.StreamHandler(sys.stdout)
+        self.console_handler.setLevel(level)
+        self.console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT, datefmt=DATE_FORMAT))
+        self.file_handler: Optional[logging.Handler] = None
+
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self._start()
+
+        logger.addHandler(self.queue_handler)
+        atexit.register(self.stop)
+
+    def _start(self):
+        """按当前的输出目标启动监听线程"""
+        handlers = [self.console_handler] + ([self.file_handler] if self.file_handler else [])
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        """写完队列中剩余的日志并停止监听线程"""
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
+        if self.file_handler:
+            self.file_handler.flush()
+
+    def configure(self, config: dict, jsonl_path: Optional[str] = None):
+        """按 logging_config 重新配置（见 configure_logging）"""
+        self.stop()
+
+        level = _level(config.get('level'), logging.INFO)
+        jsonl_path = jsonl_path or config.get('jsonl_path')
+        jsonl_level = _level(config.get('jsonl_level'), logging.DEBUG)
+
+        self.console_handler.setLevel(level)
+        if self.file_handler:
+            self.file_handler.close()
+            self.file_handler = None
+        if jsonl_path:
+            Path(jsonl_path).parent.mkdir(parents=True, exist_ok=True)
+            self.file_handler = logging.FileHandler(jsonl_path, encoding='utf-8')
+            self.file_handler.setLevel(jsonl_level)
+            self.file_handler.setFormatter(JsonLinesFormatter())
+
+        # 未单独配置的阶段：取各输出目标中最低的级别
+        default_level = min(level, jsonl_level) if jsonl_path else level
+        stage_levels = {stage: _level(value, default_level) for stage, value in config.get('stage_levels', {}).items()}
+        self.stage_filter.default_level = default_level
+        self.stage_filter.stage_levels = stage_levels
+        self.logger.setLevel(min([default_level] + list(stage_levels.values())))
+
+        sampling = config.get('debug_sampling', {})
+        self.sampling.first = sampling.get('first', 5)
+        self.sampling.every = sampling.get('every', 100)
+
+        self._start()
+
+
+_async_logging: Optional[_AsyncLogging] = None
 
 
 def setup_logger(name: str = "dongfeng_monitor", level: int = logging.INFO) -> logging.Logger:
     """
     配置日志记录器
-    
+
     Args:
         name: 日志记录器名称
         level: 日志级别
-        
+
     Returns:
         配置好的日志记录器
     """
+    global _async_logging
+
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
+
     # 避免重复添加handler
     if logger.handlers:
         return logger
-    
-    # 控制台输出
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    
-    # 日志格式
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
-    
-    logger.addHandler(console_handler)
-    
+
+    # 日志调用只入队，由后台线程输出
+    _async_logging = _AsyncLogging(logger, level)
+
     return logger
 
 
+def configure_logging(config: Optional[dict] = None, jsonl_path: Optional[str] = None):
+    """
+    按 sources.yaml 的 logging_config 配置日志输出
+
+    Args:
+        config: logging_config（level/stage_levels/jsonl_path/jsonl_level/debug_sampling）
+        jsonl_path: JSON Lines 日志文件，优先于配置
+    """
+    if _async_logging is not None:
+        _async_logging.configure(config or {}, jsonl_path)
+
+
+def log_sampling_summary():
+    """输出被抽样丢弃的高频日志条数"""
+    if _async_logging is None:
+        return
+    suppressed = _async_logging.sampling.suppressed()
+    if suppressed:
+        details = ', '.join(f"{site} {count} 条" for site, count in sorted(suppressed.items(), key=lambda x: -x[1]))
+        logger.info(f"高频调试日志抽样丢弃: {details}")
+
+
 # 创建默认日志记录器
 logger = setup_logger()
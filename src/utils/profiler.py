@@ -0,0 +1,159 @@
+"""
+分阶段性能剖析 - 每个阶段独立的cProfile统计 + tracemalloc内存峰值
+
+默认关闭，stage() 仅是一个空的上下文管理器；通过 --profile 开启后，
+每个阶段输出 <序号>_<阶段名>.pstats，顶层阶段另输出 <序号>_<阶段名>.mem.txt
+（内存快照开销较大，子阶段只记录峰值），结束时汇总写入 summary.json。
+
+阶段可以嵌套：进入子阶段时父阶段的cProfile暂停，因此父阶段的pstats
+只包含自身代码；summary.json 中的耗时与内存峰值包含子阶段。
+"""
+import cProfile
+import json
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .logger import logger
+
+
+class StageProfiler:
+    """分阶段剖析器"""
+
+    # 每个阶段内存快照输出的分配位置条数
+    TOP_ALLOCATIONS = 25
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.output_dir: Optional[Path] = None
+        self.records: List[Dict] = []
+        self._stack: List[Dict] = []
+        self._seq = 0
+
+    def enable(self, output_dir: str, memory: bool = True):
+        """
+        开启剖析
+
+        Args:
+            output_dir: 剖析结果目录
+            memory: 是否跟踪内存（tracemalloc会明显拖慢运行）
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.enabled = True
+        self.memory = memory
+
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        logger.info(f"性能剖析已开启，结果输出到: {self.output_dir}")
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        剖析一个阶段
+
+        Args:
+            name: 阶段名，如 collect.trendradar、filter.keyword
+        """
+        if not self.enabled:
+            yield
+            return
+
+        parent = self._stack[-1] if self._stack else None
+        if parent:
+            parent['profile'].disable()
+            if self.memory:
+                parent['peak'] = max(parent['peak'], tracemalloc.get_traced_memory()[1])
+
+        if self.memory:
+            tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0] if self.memory else 0
+
+        self._seq += 1
+        # overhead/cpu_overhead: 子阶段写出剖析结果的耗时，从本阶段耗时中扣除
+        entry = {
+            'seq': self._seq, 'name': name, 'profile': cProfile.Profile(),
+            'peak': 0, 'overhead': 0.0, 'cpu_overhead': 0.0
+        }
+        self._stack.append(entry)
+
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        entry['profile'].enable()
+        try:
+            yield
+        finally:
+            entry['profile'].disable()
+            wall = time.perf_counter() - start_wall - entry['overhead']
+            cpu = time.process_time() - start_cpu - entry['cpu_overhead']
+            self._stack.pop()
+
+            write_start = time.perf_counter()
+            write_start_cpu = time.process_time()
+            self._write_stage(entry, wall, cpu, start_memory, snapshot=parent is None)
+
+            if parent:
+                parent['peak'] = max(parent['peak'], entry['peak'])
+                parent['overhead'] += entry['overhead'] + time.perf_counter() - write_start
+                parent['cpu_overhead'] += entry['cpu_overhead'] + time.process_time() - write_start_cpu
+                parent['profile'].enable()
+
+    def _write_stage(self, entry: Dict, wall: float, cpu: float, start_memory: int, snapshot: bool):
+        """输出单个阶段的pstats、内存快照并记录汇总"""
+        stem = f"{entry['seq']:02d}_{re.sub(r'[^0-9A-Za-z_.-]+', '_', entry['name'])}"
+        entry['profile'].dump_stats(self.output_dir / f"{stem}.pstats")
+
+        record = {
+            'seq': entry['seq'],
+            'stage': entry['name'],
+            'wall_seconds': round(wall, 4),
+            'cpu_seconds': round(cpu, 4),
+        }
+
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            entry['peak'] = max(entry['peak'], peak)
+            record['peak_memory_kb'] = round(entry['peak'] / 1024, 1)
+            record['retained_memory_kb'] = round((current - start_memory) / 1024, 1)
+            if snapshot:
+                self._write_snapshot(self.output_dir / f"{stem}.mem.txt")
+
+        self.records.append(record)
+
+    def _write_snapshot(self, path: Path):
+        """按代码行汇总当前存活的内存分配"""
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+
+        with open(path, 'w', encoding='utf-8') as f:
+            for stat in snapshot.statistics('lineno')[:self.TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+
+    def write_summary(self):
+        """写入 summary.json 并在日志中输出各阶段耗时"""
+        if not self.enabled:
+            return
+
+        records = sorted(self.records, key=lambda r: r['seq'])
+        with open(self.output_dir / 'summary.json', 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, indent=2)
+
+        logger.info("性能剖析汇总:")
+        for record in records:
+            memory = f", 内存峰值 {record['peak_memory_kb']:.0f} KB" if 'peak_memory_kb' in record else ''
+            logger.info(
+                f"  {record['stage']:<28} 耗时 {record['wall_seconds']:.3f}s "
+                f"(CPU {record['cpu_seconds']:.3f}s){memory}"
+            )
+
+
+# 全局剖析器，未开启时 stage() 的开销可以忽略
+profiler = StageProfiler()
@@ -0,0 +1,153 @@
+"""
+按主机的自适应请求节奏控制（AIMD）
+"""
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from .logger import logger
+
+
+class PolitenessController:
+    """
+    AIMD请求节奏控制器
+
+    响应快且无错误时速率加性增加；遇到 429/503、请求失败或延迟明显上升时速率乘性减小。
+    学到的速率持久化到JSON文件，下次运行直接沿用。
+    """
+
+    # 视为服务端压力信号的状态码
+    PRESSURE_STATUS = {429, 503}
+
+    def __init__(
+        self,
+        state_path: Optional[str] = None,
+        initial_delay: float = 2.0,
+        min_delay: float = 0.2,
+        max_delay: float = 30.0,
+        additive_increase: float = 0.05,
+        multiplicative_decrease: float = 0.5,
+        latency_rise_ratio: float = 2.0,
+        jitter: float = 0.2,
+        pacing: bool = True
+    ):
+        """
+        初始化控制器
+
+        Args:
+            state_path: 状态文件路径，None 表示不持久化
+            initial_delay: 未知主机的初始请求间隔（秒）
+            min_delay: 最小请求间隔（秒）
+            max_delay: 最大请求间隔（秒）
+            additive_increase: 每次成功请求速率增加量（次/秒）
+            multiplicative_decrease: 遇到压力信号时速率乘以该系数
+            latency_rise_ratio: 延迟超过平均值该倍数时视为压力上升
+            jitter: 间隔随机抖动比例，避免请求节奏过于规律
+            pacing: 是否实际等待，回放HTTP磁带时关闭（仍会学习速率）
+        """
+        self.state_path = Path(state_path) if state_path else None
+        self.initial_delay = initial_delay
+        self.min_rate = 1.0 / max_delay
+        self.max_rate = 1.0 / min_delay
+        self.additive_increase = additive_increase
+        self.multiplicative_decrease = multiplicative_decrease
+        self.latency_rise_ratio = latency_rise_ratio
+        self.jitter = jitter
+        self.pacing = pacing
+
+        self.hosts: Dict[str, dict] = self._load()
+        self._last_request: Dict[str, float] = {}
+
+    @classmethod
+    def from_config(cls, collection_config: dict,
+                    state_path: Optional[str] = "data/politeness.json") -> 'PolitenessController':
+        """从 sources.yaml 的 collection_config 构建"""
+        politeness = collection_config.get('politeness', {})
+        delay_range = collection_config.get('delay_range', [1, 3])
+
+        return cls(
+            state_path=state_path,
+            initial_delay=politeness.get('initial_delay', sum(delay_range) / 2),
+            min_delay=politeness.get('min_delay', 0.2),
+            max_delay=politeness.get('max_delay', 30.0),
+            additive_increase=politeness.get('additive_increase', 0.05),
+            multiplicative_decrease=politeness.get('multiplicative_decrease', 0.5),
+            latency_rise_ratio=politeness.get('latency_rise_ratio', 2.0),
+            jitter=politeness.get('jitter', 0.2)
+        )
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """提取URL主机名"""
+        return urlparse(url).netloc or url
+
+    def _load(self) -> Dict[str, dict]:
+        """加载持久化的速率"""
+        if not self.state_path or not self.state_path.exists():
+            return {}
+
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"请求节奏状态加载失败，重新学习: {e}")
+            return {}
+
+    def save(self):
+        """持久化速率"""
+        if not self.state_path:
+            return
+
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.hosts, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def _get(self, host: str) -> dict:
+        return self.hosts.setdefault(host, {
+            'rate': 1.0 / self.initial_delay,
+            'latency_ewma': None
+        })
+
+    def delay_for(self, host: str) -> float:
+        """当前请求间隔（秒）"""
+        return 1.0 / self._get(host)['rate']
+
+    def wait(self, host: str):
+        """距离该主机上次请求不足当前间隔时等待"""
+        last = self._last_request.get(host)
+        if last is not None and self.pacing:
+            delay = self.delay_for(host) * random.uniform(1 - self.jitter, 1 + self.jitter)
+            remaining = last + delay - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+
+        self._last_request[host] = time.monotonic()
+
+    def on_success(self, host: str, latency: float):
+        """记录成功响应：延迟明显上升则减速，否则加性提速"""
+        state = self._get(host)
+        ewma = state['latency_ewma']
+
+        if ewma is not None and latency > ewma * self.latency_rise_ratio:
+            self._decrease(host, f"延迟上升 {latency:.2f}s (均值 {ewma:.2f}s)")
+        else:
+            state['rate'] = min(state['rate'] + self.additive_increase, self.max_rate)
+
+        state['latency_ewma'] = latency if ewma is None else round(0.8 * ewma + 0.2 * latency, 4)
+
+    def on_failure(self, host: str, status: Optional[int] = None):
+        """记录失败响应：限流、服务不可用或连接失败时乘性减速"""
+        if status is None or status in self.PRESSURE_STATUS:
+            self._decrease(host, f"HTTP {status}" if status else "请求失败")
+
+    def _decrease(self, host: str, reason: str):
+        state = self._get(host)
+        state['rate'] = max(state['rate'] * self.multiplicative_decrease, self.min_rate)
+        logger.info(f"[节奏] {host} 降速: {reason}，请求间隔调整为 {1.0 / state['rate']:.1f} 秒")
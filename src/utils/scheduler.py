@@ -0,0 +1,117 @@
+"""
+进程内任务调度器
+"""
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from .logger import logger
+
+
+@dataclass(order=True)
+class ScheduledJob:
+    """调度任务"""
+    next_run: float
+    seq: int
+    name: str = field(compare=False)
+    func: Callable[[], None] = field(compare=False)
+    interval: Optional[float] = field(default=None, compare=False)
+    daily_at: Optional[str] = field(default=None, compare=False)
+
+    def schedule_next(self, now: float):
+        """计算下次运行时间"""
+        if self.interval is not None:
+            # 以计划时间为基准推进，任务超时则从当前时间重新起算，避免积压
+            self.next_run = max(self.next_run + self.interval, now)
+        else:
+            self.next_run = _next_daily_run(self.daily_at, now + 1)
+
+
+def _next_daily_run(daily_at: str, after: float) -> float:
+    """计算 after 之后下一次 HH:MM 的时间戳（本地时区）"""
+    hour, minute = map(int, daily_at.split(':'))
+    base = datetime.fromtimestamp(after)
+    candidate = base.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate.timestamp() < after:
+        candidate += timedelta(days=1)
+    return candidate.timestamp()
+
+
+class Scheduler:
+    """基于最小堆的单线程调度器"""
+
+    def __init__(self):
+        self._jobs: List[ScheduledJob] = []
+        self._seq = itertools.count()
+        self._stop_event = threading.Event()
+
+    def every(self, minutes: float, func: Callable[[], None], name: str, run_now: bool = True):
+        """
+        注册固定间隔任务
+
+        Args:
+            minutes: 间隔（分钟）
+            func: 任务函数
+            name: 任务名称
+            run_now: 是否启动后立即执行一次
+        """
+        first_run = time.time() if run_now else time.time() + minutes * 60
+        heapq.heappush(self._jobs, ScheduledJob(first_run, next(self._seq), name, func, interval=minutes * 60))
+        logger.info(f"[调度] 注册任务 {name}: 每 {minutes} 分钟")
+
+    def daily(self, at: str, func: Callable[[], None], name: str):
+        """
+        注册每日定点任务
+
+        Args:
+            at: 时间（本地时区 HH:MM）
+            func: 任务函数
+            name: 任务名称
+        """
+        first_run = _next_daily_run(at, time.time())
+        heapq.heappush(self._jobs, ScheduledJob(first_run, next(self._seq), name, func, daily_at=at))
+        logger.info(f"[调度] 注册任务 {name}: 每日 {at}")
+
+    def run_pending(self) -> int:
+        """
+        执行所有到期任务
+
+        Returns:
+            执行的任务数
+        """
+        executed = 0
+
+        while self._jobs and self._jobs[0].next_run <= time.time():
+            job = heapq.heappop(self._jobs)
+            start = time.monotonic()
+
+            try:
+                job.func()
+                logger.info(f"[调度] 任务 {job.name} 完成，耗时 {time.monotonic() - start:.1f} 秒")
+            except Exception as e:
+                logger.error(f"[调度] 任务 {job.name} 执行失败: {e}")
+
+            job.schedule_next(time.time())
+            heapq.heappush(self._jobs, job)
+            executed += 1
+
+        return executed
+
+    def run_forever(self):
+        """持续运行直到 stop() 被调用"""
+        while not self._stop_event.is_set():
+            self.run_pending()
+
+            if self._jobs:
+                wait = max(self._jobs[0].next_run - time.time(), 0)
+            else:
+                wait = 60
+            self._stop_event.wait(min(wait, 60))
+
+    def stop(self):
+        """停止调度"""
+        self._stop_event.set()
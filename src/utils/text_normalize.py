@@ -0,0 +1,59 @@
+"""
+文本规范化 - 所有匹配器、去重与分析缓存共用的标题规范形式
+
+全角转半角（NFKC）、大小写折叠、去除空白与标点，可选繁体转简体。
+关键词与标题使用同一函数规范化，"ＧＬ８"、"gl8"、"GL 8" 均视为同一写法。
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+from .logger import logger
+
+# 只保留文字与数字
+NON_WORD_PATTERN = re.compile(r'[\W_]+', re.UNICODE)
+
+# 繁体转简体转换器：None 表示未开启，False 表示开启但 opencc 未安装
+_t2s = None
+
+
+def set_traditional_conversion(enabled: bool):
+    """
+    开启/关闭繁体转简体（依赖可选库 opencc）
+
+    Args:
+        enabled: 是否开启
+    """
+    global _t2s
+    _t2s = None
+
+    if enabled:
+        try:
+            from opencc import OpenCC
+            _t2s = OpenCC('t2s').convert
+        except ImportError:
+            logger.warning("opencc库未安装，跳过繁体转简体")
+            _t2s = False
+
+    normalize_text.cache_clear()
+
+
+@lru_cache(maxsize=65536)
+def normalize_text(text: str) -> str:
+    """
+    计算文本的规范形式
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        规范化后的文本（可能为空字符串）
+    """
+    if not text:
+        return ''
+
+    text = unicodedata.normalize('NFKC', text).casefold()
+    if _t2s:
+        text = _t2s(text)
+
+    return NON_WORD_PATTERN.sub('', text)
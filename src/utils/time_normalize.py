@@ -0,0 +1,158 @@
+"""
+时间规范化 - 各采集器统一的发布时间解析
+
+所有时间统一为UTC epoch秒（int）。数据源给出的不带时区的时间按北京时间解释，
+与运行环境的本地时区无关（GitHub Actions runner 为UTC）。
+绝对时间字符串的解析结果做缓存，同一字符串重复出现时直接命中。
+"""
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Optional, Union
+
+# 国内数据源默认时区
+SOURCE_TZ = timezone(timedelta(hours=8))
+
+# 相对时间：刚刚 / X秒前 / X分钟前 / X小时前 / X天前
+RELATIVE_PATTERN = re.compile(r'(刚刚)|(\d+)\s*(秒|分钟|小时|天)前')
+RELATIVE_UNITS = {'秒': 1, '分钟': 60, '小时': 3600, '天': 86400}
+
+# 今天/昨天/前天 HH:MM
+DAY_OFFSET_PATTERN = re.compile(r'(今天|昨天|前天)\s*(\d{1,2}):(\d{2})')
+DAY_OFFSETS = {'今天': 0, '昨天': 1, '前天': 2}
+
+# 2024年11月15日 / 2024-11-15 / 2024/11/15 / 2024.11.15，可带 HH:MM[:SS]
+DATE_PATTERN = re.compile(
+    r'(\d{4})\s*[年\-/.]\s*(\d{1,2})\s*[月\-/.]\s*(\d{1,2})\s*日?'
+    r'(?:[\sT]*(\d{1,2}):(\d{2})(?::(\d{2}))?)?'
+)
+
+# 11月15日 / 11-15 HH:MM（无年份，取最近的过去日期）
+SHORT_DATE_PATTERN = re.compile(r'(\d{1,2})\s*[月\-/]\s*(\d{1,2})\s*日?(?:\s*(\d{1,2}):(\d{2}))?')
+
+# 带时区偏移的ISO 8601：2024-11-15T10:30:00+08:00 / Z
+ISO_OFFSET_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})$')
+
+
+def now_epoch() -> int:
+    """当前UTC epoch秒"""
+    return int(time.time())
+
+
+def epoch_from_timestamp(value: Union[int, float, str, None]) -> Optional[int]:
+    """
+    数值时间戳转epoch秒，自动识别毫秒
+
+    Args:
+        value: 秒或毫秒时间戳
+
+    Returns:
+        epoch秒，无效时为None
+    """
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+
+    if value <= 0:
+        return None
+    if value > 1e11:
+        value /= 1000
+    return int(value)
+
+
+def epoch_from_datetime(value: datetime) -> int:
+    """datetime转epoch秒，不带时区的按运行环境本地时间解释（与 datetime.now() 一致）"""
+    return int(value.timestamp())
+
+
+def to_datetime(epoch: int) -> datetime:
+    """epoch秒转北京时间的datetime（用于展示）"""
+    return datetime.fromtimestamp(epoch, tz=SOURCE_TZ)
+
+
+def parse_time(text: Optional[str], now: Optional[int] = None) -> Optional[int]:
+    """
+    解析时间字符串为UTC epoch秒
+
+    支持相对时间（X小时前/昨天 10:30）、中文/数字日期、RFC 2822（RSS pubDate）、
+    ISO 8601，也接受纯数字时间戳
+
+    Args:
+        text: 时间字符串
+        now: 相对时间的基准（epoch秒），默认当前时间
+
+    Returns:
+        epoch秒，无法解析时为None
+    """
+    if not text:
+        return None
+    text = text.strip()
+
+    if text.isdigit():
+        return epoch_from_timestamp(text)
+
+    # 相对时间依赖当前时刻，不能缓存
+    if '前' in text or '刚刚' in text:
+        match = RELATIVE_PATTERN.search(text)
+        if match:
+            now = now if now is not None else now_epoch()
+            if match.group(1):
+                return now
+            return now - int(match.group(2)) * RELATIVE_UNITS[match.group(3)]
+
+    if '天' in text:
+        match = DAY_OFFSET_PATTERN.search(text)
+        if match:
+            now = now if now is not None else now_epoch()
+            day = to_datetime(now) - timedelta(days=DAY_OFFSETS[match.group(1)])
+            moment = day.replace(hour=int(match.group(2)), minute=int(match.group(3)), second=0, microsecond=0)
+            return int(moment.timestamp())
+
+    return _parse_absolute(text, to_datetime(now if now is not None else now_epoch()).year)
+
+
+@lru_cache(maxsize=4096)
+def _parse_absolute(text: str, current_year: int) -> Optional[int]:
+    """解析绝对时间（结果与当前时刻无关，可缓存；无年份的日期依赖当前年份）"""
+    # ISO 8601 带时区
+    if ISO_OFFSET_PATTERN.match(text):
+        try:
+            return int(datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp())
+        except ValueError:
+            pass
+
+    match = DATE_PATTERN.search(text)
+    if match:
+        year, month, day, hour, minute, second = (int(g) if g else 0 for g in match.groups())
+        try:
+            return int(datetime(year, month, day, hour, minute, second, tzinfo=SOURCE_TZ).timestamp())
+        except ValueError:
+            return None
+
+    # RFC 2822：Mon, 15 Nov 2024 10:30:00 GMT / +0800
+    if ',' in text or text[:3].isalpha():
+        try:
+            parsed = parsedate_to_datetime(text)
+        except (TypeError, ValueError, IndexError):
+            parsed = None
+        if parsed is not None:
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=SOURCE_TZ)
+            return int(parsed.timestamp())
+
+    match = SHORT_DATE_PATTERN.search(text)
+    if match:
+        month, day, hour, minute = (int(g) if g else 0 for g in match.groups())
+        try:
+            moment = datetime(current_year, month, day, hour, minute, tzinfo=SOURCE_TZ)
+        except ValueError:
+            return None
+        # 跨年：日期在未来则属于上一年
+        if moment > datetime.now(tz=SOURCE_TZ) + timedelta(days=1):
+            moment = moment.replace(year=current_year - 1)
+        return int(moment.timestamp())
+
+    return None
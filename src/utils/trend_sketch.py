@@ -0,0 +1,404 @@
+"""
+声量趋势草图 - 按天的Count-Min Sketch + 按车型的Space-Saving热门词
+
+每天一个Count-Min Sketch，记录各车型的提及数（键为车型名）与车型×词的共现数
+（键为 "车型|词"）；每个车型一个Space-Saving结构记录历史上最常与之共现的词，
+作为趋势查询的候选。状态只有固定大小的计数表，90天也只有几十KB。
+
+持久化为按天的文本分片（state/trend_sketches/YYYY-MM-DD.tsv）：每次保存只向当天分片
+追加一行本次新增的计数（非零计数器、车型×词计数与标题指纹），加载时逐行相加。
+历史行不会被改写，并发运行产生的分片按行合并（.gitattributes 的 merge=union）即得到
+两者之和，与 dedup 缓存分片一样可以直接提交到git。
+"""
+import gzip
+import hashlib
+import json
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .logger import logger
+from .text_normalize import normalize_text
+from .time_normalize import now_epoch, to_datetime
+
+
+class CountMinSketch:
+    """Count-Min Sketch（保守更新），估计值只会偏大不会偏小"""
+
+    def __init__(self, width: int = 256, depth: int = 4, table: Optional[List[List[int]]] = None):
+        """
+        Args:
+            width: 每行计数器个数，误差约为 总数 × e / width
+            depth: 行数（独立哈希个数），误差超界的概率约为 e^-depth
+            table: 已有计数表（反序列化时使用）
+        """
+        self.width = width
+        self.depth = depth
+        self.table = table or [[0] * width for _ in range(depth)]
+
+    def _indexes(self, key: str) -> List[int]:
+        """双重哈希得到每行的位置（与进程无关，可跨运行合并）"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key: str, count: int = 1):
+        """计数，只抬高当前估计值所在的最小计数器"""
+        indexes = self._indexes(key)
+        target = min(row[i] for row, i in zip(self.table, indexes)) + count
+        for row, i in zip(self.table, indexes):
+            if row[i] < target:
+                row[i] = target
+
+    def estimate(self, key: str) -> int:
+        """估计计数"""
+        return min(row[i] for row, i in zip(self.table, self._indexes(key)))
+
+    def merge(self, other: 'CountMinSketch'):
+        """逐计数器相加（两者尺寸必须一致）"""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError(f"草图尺寸不一致: {other.width}x{other.depth} != {self.width}x{self.depth}")
+        for row, other_row in zip(self.table, other.table):
+            for i, value in enumerate(other_row):
+                row[i] += value
+
+    def to_dict(self) -> dict:
+        """序列化"""
+        return {'width': self.width, 'depth': self.depth, 'table': self.table}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CountMinSketch':
+        """反序列化"""
+        return cls(data['width'], data['depth'], data['table'])
+
+
+class SpaceSaving:
+    """Space-Saving热门项统计，固定容量，计数上界为 count、下界为 count - error"""
+
+    def __init__(self, capacity: int = 30, counters: Optional[Dict[str, List[int]]] = None):
+        """
+        Args:
+            capacity: 最多跟踪的项数
+            counters: 项 → [计数, 误差]（反序列化时使用）
+        """
+        self.capacity = capacity
+        self.counters: Dict[str, List[int]] = counters or {}
+
+    def add(self, item: str, count: int = 1):
+        """计数，容量已满时替换计数最小的项"""
+        if item in self.counters:
+            self.counters[item][0] += count
+        elif len(self.counters) < self.capacity:
+            self.counters[item] = [count, 0]
+        else:
+            evicted = min(self.counters, key=lambda k: self.counters[k][0])
+            floor = self.counters.pop(evicted)[0]
+            self.counters[item] = [floor + count, floor]
+
+    def merge(self, other: 'SpaceSaving'):
+        """合并另一份统计：一方未跟踪的项按该方的最小计数补齐，再保留计数最大的项"""
+        floor_self = self._floor()
+        floor_other = other._floor()
+        merged = {}
+
+        for item in set(self.counters) | set(other.counters):
+            count, error = self.counters.get(item, [floor_self, floor_self])
+            other_count, other_error = other.counters.get(item, [floor_other, floor_other])
+            merged[item] = [count + other_count, error + other_error]
+
+        top = sorted(merged.items(), key=lambda kv: -kv[1][0])[:self.capacity]
+        self.counters = dict(top)
+
+    def _floor(self) -> int:
+        """未跟踪项可能的最大计数：未满时为0，已满时为最小计数"""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        """计数最大的n项"""
+        items = sorted(self.counters.items(), key=lambda kv: (-kv[1][0], kv[0]))
+        return [(item, count) for item, (count, _) in items[:n]]
+
+
+class TrendSketches:
+    """按车型的长期声量趋势"""
+
+    def __init__(self, state_dir: Optional[str] = "state/trend_sketches",
+                 terms: Iterable[str] = (), width: int = 256, depth: int = 4,
+                 top_k: int = 30, retention_days: int = 90, dedup_days: int = 3,
+                 legacy_path: Optional[str] = "data/trend_sketches.json.gz"):
+        """
+        初始化趋势草图
+
+        Args:
+            state_dir: 按天文本分片目录，None 表示不持久化
+            terms: 参与统计的词表（与规范化标题比较）
+            width: Count-Min Sketch 宽度
+            depth: Count-Min Sketch 深度
+            top_k: 每个车型跟踪的热门词个数
+            retention_days: 按天草图保留天数
+            dedup_days: 同一标题在多少天内只计一次（采集时间窗口会让同一文章跨天重复出现）
+            legacy_path: 旧版gzip状态文件，存在时导入并在保存为分片后删除
+        """
+        self.state_dir = Path(state_dir) if state_dir else None
+        self.legacy_path = Path(legacy_path) if legacy_path and state_dir else None
+        self.terms = sorted({normalize_text(t) for t in terms} - {''})
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self.retention_days = retention_days
+        self.dedup_days = dedup_days
+
+        self.days: Dict[str, CountMinSketch] = {}
+        self.heavy: Dict[str, SpaceSaving] = {}
+        self.seen: Dict[str, set] = {}
+        # 上次保存后新增、尚未写入分片的计数：日期 → {cms, heavy: {车型: {词: 次数}}, seen}
+        self.pending: Dict[str, dict] = {}
+        self._load()
+
+    @classmethod
+    def from_config(cls, sources_config: dict, models_config: dict,
+                    state_dir: Optional[str] = "state/trend_sketches",
+                    legacy_path: Optional[str] = "data/trend_sketches.json.gz") -> 'TrendSketches':
+        """从 sources.yaml 的 trend_config 构建，词表为汽车领域关键词 + 配置的补充词"""
+        config = sources_config.get('trend_config', {})
+        terms = list(models_config.get('automotive_keywords', [])) + list(config.get('extra_terms', []))
+
+        return cls(
+            state_dir=state_dir,
+            terms=terms,
+            width=config.get('width', 256),
+            depth=config.get('depth', 4),
+            top_k=config.get('top_k', 30),
+            retention_days=config.get('retention_days', 90),
+            dedup_days=config.get('dedup_days', 3),
+            legacy_path=legacy_path
+        )
+
+    @staticmethod
+    def _day(offset: int = 0) -> str:
+        """北京时间的日期，offset 为往前的天数"""
+        return (to_datetime(now_epoch()) - timedelta(days=offset)).strftime('%Y-%m-%d')
+
+    def _pending(self, day: str) -> dict:
+        """某天尚未保存的增量"""
+        return self.pending.setdefault(day, {
+            'cms': CountMinSketch(self.width, self.depth), 'heavy': {}, 'seen': set()
+        })
+
+    def _load(self):
+        """加载保留期内的按天分片，存在旧版状态文件时一并导入"""
+        if not self.state_dir:
+            return
+
+        oldest = self._day(self.retention_days - 1)
+        oldest_seen = self._day(self.dedup_days - 1)
+        lines = 0
+
+        for shard in sorted(self.state_dir.glob('*.tsv')):
+            day = shard.stem
+            if day < oldest:
+                continue
+            try:
+                with open(shard, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        _, _, payload = line.rstrip('\n').partition('\t')
+                        if payload and self._apply(day, json.loads(payload), load_seen=day >= oldest_seen):
+                            lines += 1
+            except (OSError, ValueError) as e:
+                logger.warning(f"趋势草图分片 {shard.name} 加载失败，已跳过: {e}")
+
+        logger.debug(f"趋势草图加载 {lines} 行增量 ({self.state_dir})")
+
+        if self.legacy_path and self.legacy_path.exists():
+            self._import_legacy()
+
+    def _apply(self, day: str, delta: dict, load_seen: bool = True) -> bool:
+        """
+        把一行增量加到内存中的状态
+
+        Returns:
+            尺寸与配置一致、已计入时为True
+        """
+        if (delta.get('w'), delta.get('d')) != (self.width, self.depth):
+            logger.warning(f"趋势草图 {day} 的增量尺寸与配置不一致，已丢弃")
+            return False
+
+        sketch = self.days.setdefault(day, CountMinSketch(self.width, self.depth))
+        for row, col, value in delta.get('cells', []):
+            sketch.table[row][col] += value
+
+        for model, counts in delta.get('heavy', {}).items():
+            # 早期分片把多车型文章记在 "车型A,车型B" 这样的组合键下，不作为车型展示
+            if ',' in model:
+                continue
+            heavy = self.heavy.setdefault(model, SpaceSaving(self.top_k))
+            for term, count in counts.items():
+                heavy.add(term, count)
+
+        if load_seen and delta.get('seen'):
+            self.seen.setdefault(day, set()).update(delta['seen'])
+        return True
+
+    def _import_legacy(self):
+        """导入旧版gzip状态（整份计数表），作为增量在下次保存时写入分片"""
+        try:
+            with gzip.open(self.legacy_path, 'rt', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"旧版趋势草图 {self.legacy_path} 加载失败，已忽略: {e}")
+            return
+
+        for day, data in state.get('days', {}).items():
+            sketch = CountMinSketch.from_dict(data)
+            if (sketch.width, sketch.depth) != (self.width, self.depth):
+                logger.warning(f"旧版趋势草图 {day} 尺寸与配置不一致，已丢弃")
+                continue
+            self.days.setdefault(day, CountMinSketch(self.width, self.depth)).merge(sketch)
+            self._pending(day)['cms'].merge(sketch)
+
+        # 热门词没有按天区分，计入今天的增量
+        today_heavy = self._pending(self._day())['heavy']
+        for model, counters in state.get('heavy', {}).items():
+            if ',' in model:
+                continue
+            heavy = self.heavy.setdefault(model, SpaceSaving(self.top_k))
+            model_heavy = today_heavy.setdefault(model, {})
+            for term, (count, _) in counters.items():
+                heavy.add(term, count)
+                model_heavy[term] = count
+
+        for day, fingerprints in state.get('seen', {}).items():
+            self.seen.setdefault(day, set()).update(fingerprints)
+            self._pending(day)['seen'].update(fingerprints)
+
+        logger.info(f"已导入旧版趋势草图 {self.legacy_path}，保存后改为文本分片")
+
+    def save(self):
+        """向各天分片追加本次新增的计数，删除过期分片"""
+        if not self.state_dir:
+            return
+
+        oldest = self._day(self.retention_days - 1)
+        self.days = {day: sketch for day, sketch in self.days.items() if day >= oldest}
+        oldest_seen = self._day(self.dedup_days - 1)
+        self.seen = {day: fps for day, fps in self.seen.items() if day >= oldest_seen}
+
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        for shard in self.state_dir.glob('*.tsv'):
+            if shard.stem < oldest:
+                shard.unlink()
+
+        # 行首的批次号保证各行互不相同，合并时不会把两次运行的相同增量当成一行
+        batch = f"{now_epoch()}-{uuid.uuid4().hex[:8]}"
+        for day, delta in sorted(self.pending.items()):
+            if day < oldest:
+                continue
+            cells = [
+                [r, c, value]
+                for r, row in enumerate(delta['cms'].table)
+                for c, value in enumerate(row) if value
+            ]
+            if not cells and not delta['heavy'] and not delta['seen']:
+                continue
+            payload = {
+                'w': self.width, 'd': self.depth, 'cells': cells,
+                'heavy': delta['heavy'], 'seen': sorted(delta['seen'])
+            }
+            with open(self.state_dir / f"{day}.tsv", 'a', encoding='utf-8') as f:
+                f.write(f"{batch}\t{json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))}\n")
+        self.pending.clear()
+
+        if self.legacy_path and self.legacy_path.exists():
+            self.legacy_path.unlink()
+            self.legacy_path = None
+
+    def add(self, articles: list):
+        """
+        统计一批已过滤的文章（category 为匹配到的车型，多个车型以逗号分隔、分别计入），近几天已计入的标题跳过
+
+        Args:
+            articles: 文章列表
+        """
+        today = self._day()
+        sketch = self.days.setdefault(today, CountMinSketch(self.width, self.depth))
+        seen_today = self.seen.setdefault(today, set())
+        delta = self._pending(today)
+        counted = 0
+
+        for article in articles:
+            models = [m.strip() for m in (article.category or '').split(',') if m.strip()]
+            if not models:
+                continue
+
+            fingerprint = hashlib.md5(article.normalized_title.encode('utf-8')).hexdigest()[:12]
+            if any(fingerprint in fps for fps in self.seen.values()):
+                continue
+            seen_today.add(fingerprint)
+            delta['seen'].add(fingerprint)
+
+            # 内存中的草图与待保存的增量分别计数（保守更新的结果不能事后相减得到增量）
+            terms = [term for term in self.terms if term in article.normalized_title]
+            for model in models:
+                sketch.add(model)
+                delta['cms'].add(model)
+                heavy = self.heavy.setdefault(model, SpaceSaving(self.top_k))
+                heavy_delta = delta['heavy'].setdefault(model, {})
+                for term in terms:
+                    sketch.add(f"{model}|{term}")
+                    delta['cms'].add(f"{model}|{term}")
+                    heavy.add(term)
+                    heavy_delta[term] = heavy_delta.get(term, 0) + 1
+            counted += 1
+
+        logger.debug(f"趋势草图计入 {counted} 条")
+
+    def count(self, key: str, days: int, offset: int = 0) -> int:
+        """
+        估计某个键在一段时间内的计数
+
+        Args:
+            key: 车型名或 "车型|词"
+            days: 天数
+            offset: 窗口结束于多少天前（0 表示含今天）
+        """
+        total = 0
+        for i in range(offset, offset + days):
+            sketch = self.days.get(self._day(i))
+            if sketch:
+                total += sketch.estimate(key)
+        return total
+
+    def summary(self, top_terms: int = 3) -> List[Dict]:
+        """
+        各车型的今日提及、30/90天提及与热门词，按近30天提及数排序
+
+        Returns:
+            [{model, today, last_30, last_90, baseline, history_days, terms: [(词, 近30天次数)]}]
+            baseline 为今天之前30天（有记录的天）的日均提及数，history_days 为其中有记录的天数
+        """
+        rows = []
+        history_days = sum(1 for i in range(1, 31) if self._day(i) in self.days)
+
+        for model, heavy in self.heavy.items():
+            last_30 = self.count(model, 30)
+            if last_30 == 0:
+                continue
+
+            terms = [(term, self.count(f"{model}|{term}", 30)) for term, _ in heavy.top(top_terms * 2)]
+            terms = sorted([t for t in terms if t[1] > 0], key=lambda t: -t[1])[:top_terms]
+
+            rows.append({
+                'model': model,
+                'today': self.count(model, 1),
+                'last_30': last_30,
+                'last_90': self.count(model, 90),
+                'baseline': self.count(model, 30, offset=1) / max(history_days, 1),
+                'history_days': history_days,
+                'terms': terms
+            })
+
+        return sorted(rows, key=lambda r: -r['last_30'])
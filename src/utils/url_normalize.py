@@ -0,0 +1,128 @@
+"""
+URL规范化 - 同一篇文章的不同链接写法归为同一个键
+
+去掉跟踪参数（通用的 utm_*/spm 等，以及按站点配置的分享/来源参数）与锚点，
+展开跳转包装链接，移动版/桌面版主机统一，剩余查询参数排序。只用于去重比较，推送与展示仍使用原始链接。
+"""
+from functools import lru_cache
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+# 各站点通用的跟踪参数（按名称与前缀）：只收录公认只用于统计归因、不影响页面内容的参数
+TRACKING_PARAMS = {
+    'gclid', 'fbclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', '_hsenc', '_hsmi',
+    'isappinstalled', 'share_token', 'sharesource', 'sudaref', 'tt_from', 'ivk_sa',
+}
+TRACKING_PREFIXES = ('utm_', 'spm')
+
+# 站点专属的跟踪参数：from/src/source/mod/display/timestamp/scene 等在多数站点上携带内容
+# （分类、栏目、分页、版本），只在确认其为分享/来源统计的站点上去掉。键为规范化后的主机后缀
+HOST_TRACKING_PARAMS = {
+    'mp.weixin.qq.com': {
+        'scene', 'subscene', 'srcid', 'sharer_sharetime', 'sharer_shareid', 'clicktime', 'enterid',
+        'from', 'ascene', 'devicetype', 'version', 'nettype', 'lang', 'pass_ticket', 'exportkey',
+        'sessionid', 'wx_header',
+    },
+    'sina.com.cn': {'from', 'fr', 'vt', 'cre', 'mod', 'loc', 'wfr', 'r', 'pos'},
+    'weibo.com': {'from', 'display', 'retcode', 'sourcetype'},
+    'weibo.cn': {'from', 'display', 'retcode', 'sourcetype'},
+    'baidu.com': {'wfr', 'for', 'from'},
+    'toutiao.com': {'source', 'timestamp', 'app', 'share_uid', 'upstream_biz', 'req_id'},
+    'bilibili.com': {
+        'from', 'share_source', 'share_medium', 'share_plat', 'share_session_id', 'share_from',
+        'share_tag', 'timestamp', 'unique_k', 'vd_source', 'bbid', 'ts',
+    },
+    'zhihu.com': {'share_code', 'hybrid_search_source', 'hybrid_search_extra'},
+}
+
+# 跳转包装链接中携带目标地址的参数
+REDIRECT_PARAMS = ('url', 'u', 'target', 'redirect', 'redirect_url', 'to', 'link', 'dest')
+
+# 移动版/桌面版等价主机：按后缀改写
+HOST_SUFFIX_ALIASES = {
+    '.sina.cn': '.sina.com.cn',
+}
+
+# 可去掉的主机前缀（移动版、www）
+HOST_PREFIXES = ('www.', 'm.', 'wap.', '3g.', 'mobile.')
+
+# 展开跳转的最大层数
+MAX_UNWRAP = 3
+
+
+def _normalize_host(host: str) -> str:
+    """主机名小写，去掉默认端口、移动版前缀，并统一等价域名"""
+    host = host.lower().rstrip('.')
+    if host.endswith(':80') or host.endswith(':443'):
+        host = host.rsplit(':', 1)[0]
+
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+
+    for suffix, replacement in HOST_SUFFIX_ALIASES.items():
+        dotted = '.' + host
+        if dotted.endswith(suffix):
+            host = (dotted[:-len(suffix)] + replacement).lstrip('.')
+            break
+
+    return host
+
+
+def _host_tracking_params(host: str) -> frozenset:
+    """规范化主机适用的站点专属跟踪参数"""
+    names = set()
+    dotted = '.' + host
+    for suffix, params in HOST_TRACKING_PARAMS.items():
+        if dotted.endswith('.' + suffix):
+            names |= params
+    return frozenset(names)
+
+
+def _is_tracking(name: str, host_params: frozenset = frozenset()) -> bool:
+    """是否为跟踪参数（通用跟踪参数或该站点专属的跟踪参数）"""
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES) or name in host_params
+
+
+@lru_cache(maxsize=65536)
+def canonicalize_url(url: str) -> str:
+    """
+    计算URL的规范形式
+
+    Args:
+        url: 原始链接
+
+    Returns:
+        规范化后的链接（无scheme，形如 host/path?query），无法解析时为空字符串
+    """
+    if not url:
+        return ''
+
+    for _ in range(MAX_UNWRAP + 1):
+        parts = urlsplit(url.strip())
+        if parts.scheme not in ('http', 'https', ''):
+            return ''
+
+        params = parse_qsl(parts.query, keep_blank_values=True)
+
+        # 跳转包装：参数里带着完整的目标地址
+        target = next(
+            (unquote(value) for name, value in params
+             if name.lower() in REDIRECT_PARAMS and unquote(value).startswith(('http://', 'https://'))),
+            None
+        )
+        if target:
+            url = target
+            continue
+        break
+
+    host = _normalize_host(parts.netloc)
+    if not host:
+        return ''
+
+    path = parts.path.rstrip('/') or ''
+    host_params = _host_tracking_params(host)
+    query = urlencode(sorted((name, value) for name, value in params if not _is_tracking(name, host_params)))
+
+    return urlunsplit(('', host, path, query, '')).lstrip('/')